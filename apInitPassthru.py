@@ -11,10 +11,17 @@
 # Does this:
 # - opens serial passthrough in ArduPilot flight controller
 # - sets receiver into bootloader mode
+# - keeps one session per flight controller, which holds the link, its sysid/compid, and the parameters read
+# - uses a slim pregenerated MAVLink dialect, and loads pymavlink only when a passthrough is opened
 #************************************************************
 
 import os, sys, time
 import argparse
+import threading
+import types
+import struct
+
+import serialPorts as serialports
 
 
 #--------------------------------------------------
@@ -22,10 +29,25 @@ import argparse
 #--------------------------------------------------
 
 sys.path.append(os.path.join('thirdparty','mavlink'))
-from pymavlink import mavutil
-from pymavlink import mavparm
-os.environ['MAVLINK20'] = '1'
-mavutil.set_dialect("all")
+
+# slim dialect with only the messages used here, the module is pregenerated by tools/build_mavlink_dialect.py,
+# so pymavlink does not need to generate one from the xml files when it is loaded
+MAVLINK_DIALECT = 'mlrs_flasher'
+
+mavutil = None
+
+# pymavlink is loaded when it is first needed, not when this module is imported
+# mavutil loads the dialect given in the environment when it is imported, so this is set before, otherwise it would
+# generate ardupilotmega for MAVLink 1
+def load_mavlink():
+    global mavutil
+    if mavutil == None:
+        os.environ['MAVLINK20'] = '1'
+        os.environ['MAVLINK_DIALECT'] = MAVLINK_DIALECT
+        from pymavlink import mavutil as _mavutil
+        _mavutil.set_dialect(MAVLINK_DIALECT) # in case mavutil was imported before
+        mavutil = _mavutil
+    return mavutil
 
 
 #--------------------------------------------------
@@ -49,43 +71,12 @@ def find_ardupilot_serial_ports():
         manufacturer = ArduPilot
         product = speedybeef4v3, BlitzWingH743, and so on
     '''
-    try:
-        from serial.tools.list_ports import comports
-        portList = list(comports())
-    except:
-        print('ERROR: find_radio_serial_port() (pyserial missing?) [1]')
+    # the ports are classified by serialPorts, SLCAN ports of composite USB are rejected there
+    apportList = serialports.find_ports([serialports.KIND_ARDUPILOT])
+    if apportList == None:
         return []
-    '''
-    for port in portList:
-        print('*',port.device)
-        print('  ',port.name)
-        print('  ',port.description)
-        print('  ',port.hwid)
-        print('  ',port.vid, port.pid)
-        print('  ',port.serial_number)
-        print('  ',port.location)
-        print('  ',port.manufacturer)
-        print('  ',port.product)
-        print('  ',port.interface)
-    '''
-    apportList = []
-    for port in portList:
-        if port.manufacturer and 'ardupilot' in port.manufacturer.lower(): # seems to be so for all boards and OSses
-            # composite USB
-            if ((port.vid == 0x1209 and port.pid == 0x5740) or
-                (port.vid == 0x2DAE and (port.pid == 0x1016 or port.pid == 0x1012)) or # Hex Cube Orange, Yellow
-                (port.vid == 0x1209 and port.pid == 0x004B)): # Holybro Durandal
-                # AP creates two COM ports, reject if it is for SLCAN
-                if 'slcan' in port.description.lower(): # works for Win
-                    continue
-                apportList.append(port.device)
-            # single USB
-            elif ((port.vid == 0x1209 and port.pid == 0x5741) or # AP standard VID/PID
-                  (port.vid == 0x2DAE) or # Hex Cube
-                  (port.vid == 0x3612)): # Holybro
-                apportList.append(port.device)
     # TODO: on Lin/Mac we have to clean up the list to reject composite USB
-    if os.name == 'posix':
+    if os.name == 'posix' and apportList:
         apportList.sort() # sort should allow us to grab the lowest interface
         apportList = [apportList[0]] # let's just grab the first and hope for the best
     #print(apportList)
@@ -112,117 +103,280 @@ def do_error(msg):
 #-- Connect to ArduPilot flight controller via MAVLink
 #--------------------------------------------------
 
-# link.recv_match(type = 'PARAM_VALUE', blocking = False, timeout=1.0) seems not to work
-def mav_recv_match(link, msg_type, timeout=1.0):
-    tstart = time.time()
-    msgd = None
-    while True:
-        time.sleep(0.01)
-        msg = link.recv_match(type = msg_type)
-        if msg is not None and msg.get_type() == msg_type:
-            msgd = msg.to_dict()
-            #print(msgd)
-            if msg_type != 'HEARTBEAT':
-                break
-            elif msgd['type'] == 1 and msgd['autopilot'] == 3: # we ask for HEARTBEAT, so want it to be from the autopilot
+# reads the link in a thread, which blocks on the serial port, and hands messages to who waits for them
+# a waiter is registered for a message type with a predicate, and is woken as soon as a matching message arrives
+# register with expect() before sending a request, so the answer can't be missed, and then wait()
+class MavReceiver:
+
+    def __init__(self, link):
+        self.link = link
+        self.lock = threading.Lock()
+        self.waiterDict = {} # message type -> list of waiters
+        self.running = True
+        self.link.port.timeout = 0.1 # read() blocks until data arrives, but not forever
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        port = self.link.port
+        while self.running:
+            try:
+                data = port.read(max(1, port.in_waiting))
+                if not data:
+                    continue
+                msgList = self.link.mav.parse_buffer(data)
+            except Exception: # port closed, or parser choked
+                if not self.running:
+                    break
+                time.sleep(0.1)
+                continue
+            if not msgList:
+                continue
+            with self.lock:
+                for msg in msgList:
+                    waiterList = self.waiterDict.get(msg.get_type())
+                    if not waiterList:
+                        continue
+                    for waiter in list(waiterList):
+                        if waiter.predicate == None or waiter.predicate(msg):
+                            waiter.msg = msg
+                            waiter.event.set()
+                            waiterList.remove(waiter)
+
+    def stop(self):
+        self.running = False
+        self.thread.join(timeout=1.0)
+        try:
+            self.link.port.timeout = 0 # as mavutil has it
+        except:
+            pass
+
+    def expect(self, msg_type, predicate=None):
+        waiter = types.SimpleNamespace(predicate=predicate, msg=None, event=threading.Event())
+        with self.lock:
+            self.waiterDict.setdefault(msg_type, []).append(waiter)
+        return (msg_type, waiter)
+
+    # returns the message, or None on timeout
+    def wait(self, expected, timeout=1.0):
+        msg_type, waiter = expected
+        waiter.event.wait(timeout)
+        with self.lock:
+            if waiter in self.waiterDict.get(msg_type, []):
+                self.waiterDict[msg_type].remove(waiter)
+        return waiter.msg
+
+    def recv_match(self, msg_type, predicate=None, timeout=1.0):
+        return self.wait(self.expect(msg_type, predicate), timeout)
+
+
+# parameter values go as float32 over MAVLink
+def _as_float32(value):
+    return struct.unpack('<f', struct.pack('<f', float(value)))[0]
+
+
+# we ask for HEARTBEAT, so want it to be from the autopilot
+def _is_autopilot_heartbeat(msg):
+    return msg.type == 1 and msg.autopilot == 3
+
+
+# keeps one MAVLink link to the flight controller, and what we learned about it
+# - the link is opened once, and its baudrate is changed in place
+# - sysid and compid of the autopilot are found once, reconnecting then needs only one heartbeat
+# - parameters which were read or set are cached while the link is open, the flight controller on the port may be
+#   another one after that, they all are 1/1, so sysid and compid can't tell
+class ArduPilotSession:
+
+    def __init__(self, uart, baud):
+        self.uart = uart
+        self.baud = baud
+        self.link = None
+        self.rx = None
+        self.target_system = None
+        self.target_component = None
+        self.paramDict = {}
+
+    def connect(self, timeout=10.0):
+        if self.link:
+            return True
+        print('connect to flight controller...')
+        load_mavlink()
+        self.paramDict = {} # a new link may be to another flight controller
+        self.link = mavutil.mavlink_connection(self.uart, self.baud)
+        if not self.link:
+            return False
+        self.rx = MavReceiver(self.link)
+        print('  wait for heartbeat...')
+        msg = self.rx.recv_match('HEARTBEAT', _is_autopilot_heartbeat, timeout=timeout)
+        if not msg:
+            self.close()
+            return False
+        print(' ', msg)
+        if (msg.get_srcSystem(), msg.get_srcComponent()) != (self.target_system, self.target_component):
+            # needs to be set, if system is only a fc link targets come out as (1,0), if it has more components as (0,0)!!
+            self.target_system = msg.get_srcSystem()
+            self.target_component = msg.get_srcComponent()
+            # let's wait for a 2nd one to be sure
+            if not self.rx.recv_match('HEARTBEAT', _is_autopilot_heartbeat, timeout=2.5):
+                self.close()
+                return False
+        self.link.target_system = self.target_system
+        self.link.target_component = self.target_component
+        print('  received (sysid %u compid %u)' % (self.target_system, self.target_component))
+        print('connected to flight controller')
+        return True
+
+    def close(self):
+        if self.rx:
+            self.rx.stop()
+        if self.link:
+            self.link.close()
+        self.rx = None
+        self.link = None
+        self.paramDict = {}
+
+    # changes the baudrate of the open link, a heartbeat confirms that the flight controller is still there
+    def set_baud(self, baud):
+        if baud == self.baud and self.link:
+            return True
+        self.baud = baud
+        if not self.link:
+            return self.connect()
+        print('change link to baudrate', baud)
+        self.rx.stop() # not while the reader is in read()
+        self.link.set_baudrate(baud)
+        self.link.port.reset_input_buffer()
+        self.rx = MavReceiver(self.link)
+        if self.rx.recv_match('HEARTBEAT', _is_autopilot_heartbeat, timeout=2.5):
+            return True
+        self.close() # try the hard way
+        return self.connect()
+
+    # sends the requests for all names back-to-back, and collects the PARAM_VALUE answers as they arrive, matched
+    # by param_id, only names which got no answer are requested again
+    # so on a lossy link a lost message costs one timeout for the batch, not one per parameter
+    # returns a dict name -> PARAM_VALUE message, names which never got an answer are missing
+    def _param_batch(self, nameList, send, retries=3, timeout=1.0):
+        msgDict = {}
+        missingList = list(nameList)
+        for i in range(retries):
+            expectedDict = {}
+            for name in missingList: # all waiters before the first request, so no answer can be missed
+                expectedDict[name] = self.rx.expect('PARAM_VALUE', lambda msg, name=name: msg.param_id == name)
+            for name in missingList:
+                send(name)
+            tend = time.time() + timeout
+            for name in missingList:
+                msg = self.rx.wait(expectedDict[name], max(0.0, tend - time.time()))
+                if msg:
+                    msgDict[name] = msg
+            missingList = [name for name in missingList if name not in msgDict.keys()]
+            if not missingList:
                 break
-        tnow = time.time()
-        if tnow - tstart > timeout:
-            break
-    return msg, msgd
-
-
-def ardupilot_connect(uart, baud):
-    print('connect to flight controller...')
-
-    link = mavutil.mavlink_connection(uart, baud)
-    if not link:
-        return None
-    print('  wait for heartbeat...')
-    #msg = link.recv_match(type = 'HEARTBEAT', blocking = True)
-    #print(' ', msg)
-    #print(msg.to_dict())
-    msg, msgd = mav_recv_match(link, 'HEARTBEAT', timeout=10.0)
-    if not msgd:
-        link.close()
-        return None
-    print(' ', msg)
-    # needs to be set, if system is only a fc link targets come out as (1,0), if it has more components as (0,0)!!
-    link.target_system = msg.get_srcSystem()
-    link.target_component = msg.get_srcComponent()
-    msg, msgd = mav_recv_match(link, 'HEARTBEAT', timeout=2.5) # let's wait for a 2nd one to be sure
-    if not msgd:
-        link.close()
-        return None
-    print('  received (sysid %u compid %u)' % (link.target_system, link.target_component))
-    print('connected to flight controller')
-    return link
-
-
-def ardupilot_find_serialx_baud(link, serialx):
-    print('find SERIALx, receiver baud rate...')
-
-    param_str = 'SERIAL'+str(serialx)+'_PROTOCOL'
-    link.mav.param_request_read_send(
-        link.target_system, link.target_component,
-        param_str.encode(), #b'SERIAL1_PROTOCOL',
-        -1)
-    _, msgd = mav_recv_match(link, 'PARAM_VALUE', timeout=1.0)
-    if not msgd or (msgd['param_value'] != 2.0 and msgd['param_value'] != 28.0):
-        link.close()
-        return None # something went wrong
-    # we do have that SRIALx, and it's MAVLink2 or scripting which may be leftover from previous attempts
-    param_str = 'SERIAL'+str(serialx)+'_BAUD'
-    link.mav.param_request_read_send(
-        link.target_system, link.target_component,
-        param_str.encode(),
-        -1)
-    _, msgd = mav_recv_match(link, 'PARAM_VALUE', timeout=1.0)
-    #print(msgd)
-    if not msgd:
-        link.close()
-        return None # something went wrong
-    baud = msgd['param_value']
-    if baud == 38:
-        baud = 38400
-    elif baud == 57:
-        baud = 57600
-    elif baud == 115:
-        baud = 115200
-    elif baud == 230:
-        baud = 230400
-    #print(baud)
-    return baud
-
-
-def ardupilot_open_passthrough(link, serialx, passthru_timeout=0):
-    print('open serial passthrough...')
-
-    # restore protocol to MAVLink2 in case it was changed to scripting, takes effect only after reboot
-    param_str = 'SERIAL'+str(serialx)+'_PROTOCOL'
-    print('  set '+param_str+' = MAVLink2')
-    mavparm.MAVParmDict().mavset(link, param_str, 2)
-    # set up passthrough with no timeout, power cycle to exit
-    print('  set SERIAL_PASSTIMO = '+str(passthru_timeout))
-    mavparm.MAVParmDict().mavset(link, "SERIAL_PASSTIMO", passthru_timeout)
-    print('  set SERIAL_PASS2 =', serialx)
-    mavparm.MAVParmDict().mavset(link, "SERIAL_PASS2", serialx)
-    time.sleep(1.5) # wait for passthrough to start, AP starts pt after 1 secs, which is so to allow the PARAM_SET to be seen
-    print('serial passthrough opened')
-
-
-def ardupilot_set_scripting(link, serialx):
-    print('set scripting...')
-
-    # set protocol to scripting to prevent MAVLink output from confusing the bootloader
-    param_str = 'SERIAL'+str(serialx)+'_PROTOCOL'
-    print('  set '+param_str+' = scripting')
-    mavparm.MAVParmDict().mavset(link, param_str, 28)
-    time.sleep(0.5) # wait a bit
-    link.close()
-    do_msg(
-        '\r\nPlease unplug USB and hold receiver boot button down while plugging in USB.\r\n' + 
-        'Wait until USB is re-enumerated and flight controller has booted up (typically 10-20 secs).')
+        return msgDict
+
+    # returns a dict name -> value of the parameters, the value is None if it could not be read
+    def get_params(self, nameList, retries=3, timeout=1.0):
+        requestList = [name for name in nameList if name not in self.paramDict.keys()]
+        if requestList:
+            send = lambda name: self.link.mav.param_request_read_send(
+                self.target_system, self.target_component, name.encode(), -1)
+            msgDict = self._param_batch(requestList, send, retries, timeout)
+            for name, msg in msgDict.items():
+                self.paramDict[name] = msg.param_value
+        return {name: self.paramDict.get(name) for name in nameList}
+
+    # returns the value of the parameter, or None
+    def get_param(self, name, retries=3, timeout=1.0):
+        return self.get_params([name], retries, timeout)[name]
+
+    # sets the parameters given as list of (name, value), a parameter is skipped if it is known to have the value
+    # already, unless force is True
+    # the flight controller answers each with PARAM_VALUE, returns True if all were answered
+    def set_params(self, paramList, force=False, retries=3, timeout=1.0):
+        valueDict = {}
+        for name, value in paramList:
+            print('  set '+name+' =', value)
+            if not force and self.paramDict.get(name) == _as_float32(value):
+                continue
+            self.paramDict.pop(name, None)
+            valueDict[name] = value
+        if not valueDict:
+            return True
+        send = lambda name: self.link.param_set_send(name, float(valueDict[name]))
+        msgDict = self._param_batch(list(valueDict.keys()), send, retries, timeout)
+        ok = True
+        for name in valueDict.keys():
+            if name not in msgDict.keys():
+                print('  timeout setting', name)
+                ok = False
+                continue
+            # the echo tells what the flight controller has, it may have clamped or rounded the value
+            self.paramDict[name] = msgDict[name].param_value
+            if msgDict[name].param_value != _as_float32(valueDict[name]):
+                print('  failed setting', name, ', is', msgDict[name].param_value)
+                ok = False
+        return ok
+
+    def set_param(self, name, value, force=False, retries=3, timeout=1.0):
+        return self.set_params([(name, value)], force, retries, timeout)
+
+    def find_serialx_baud(self, serialx):
+        print('find SERIALx, receiver baud rate...')
+        valueDict = self.get_params(['SERIAL'+str(serialx)+'_PROTOCOL', 'SERIAL'+str(serialx)+'_BAUD'])
+        protocol = valueDict['SERIAL'+str(serialx)+'_PROTOCOL']
+        if protocol != 2.0 and protocol != 28.0:
+            return None # something went wrong
+        # we do have that SRIALx, and it's MAVLink2 or scripting which may be leftover from previous attempts
+        baud = valueDict['SERIAL'+str(serialx)+'_BAUD']
+        if baud == None:
+            return None # something went wrong
+        if baud == 38:
+            baud = 38400
+        elif baud == 57:
+            baud = 57600
+        elif baud == 115:
+            baud = 115200
+        elif baud == 230:
+            baud = 230400
+        #print(baud)
+        return baud
+
+    def open_passthrough(self, serialx, passthru_timeout=0):
+        print('open serial passthrough...')
+        # restore protocol to MAVLink2 in case it was changed to scripting, takes effect only after reboot
+        # set up passthrough with no timeout, power cycle to exit
+        self.set_params([
+            ('SERIAL'+str(serialx)+'_PROTOCOL', 2),
+            ('SERIAL_PASSTIMO', passthru_timeout)])
+        self.set_param('SERIAL_PASS2', serialx, force=True) # this starts it, so comes last and on its own
+        time.sleep(1.5) # wait for passthrough to start, AP starts pt after 1 secs, which is so to allow the PARAM_SET to be seen
+        print('serial passthrough opened')
+
+    def set_scripting(self, serialx):
+        print('set scripting...')
+        # set protocol to scripting to prevent MAVLink output from confusing the bootloader
+        self.set_param('SERIAL'+str(serialx)+'_PROTOCOL', 28)
+        time.sleep(0.5) # wait a bit
+        self.close()
+        do_msg(
+            '\r\nPlease unplug USB and hold receiver boot button down while plugging in USB.\r\n' +
+            'Wait until USB is re-enumerated and flight controller has booted up (typically 10-20 secs).')
+
+
+# sessions by port, so that the sysid and compid of a flight controller are kept from one flashing to the next
+g_sessionDict = {}
+
+def ardupilot_session(uart, baud):
+    if uart not in g_sessionDict.keys():
+        g_sessionDict[uart] = ArduPilotSession(uart, baud)
+    session = g_sessionDict[uart]
+    if session.baud != baud:
+        if session.link:
+            session.set_baud(baud)
+        else:
+            session.baud = baud # connect() then opens the link at this baudrate
+    return session
 
 
 #--------------------------------------------------
@@ -231,49 +385,38 @@ def ardupilot_set_scripting(link, serialx):
 #--------------------------------------------------
 
 # confirmation, send 0 to ping, send 1 to arm, then 2 to execute
-def mlrs_cmd_preflight_reboot_shutdown(link, cmd_confirmation, cmd_action, sysid=51, compid=68, tries=0):
-    cmd_tlast = 0
+def mlrs_cmd_preflight_reboot_shutdown(session, cmd_confirmation, cmd_action, sysid=51, compid=68, tries=0):
+    def is_ack(msg):
+        return (msg.command == mavutil.mavlink.MAV_CMD_PREFLIGHT_REBOOT_SHUTDOWN and
+                msg.result_param2 == 1234321)
+
     tries_cnt = 0
-    while True:
-        time.sleep(0.01)
-
-        msg = link.recv_match(type = 'COMMAND_ACK')
-        if msg is not None and msg.get_type() != 'BAD_DATA':
-            #print(msg)
-            msgd = msg.to_dict()
-            if (msgd['mavpackettype'] == 'COMMAND_ACK' and
-                msgd['command'] == mavutil.mavlink.MAV_CMD_PREFLIGHT_REBOOT_SHUTDOWN and
-                msgd['result_param2'] == 1234321):
-                #print('  ACK:', msgd)
-                print(' ', msg)
-                #print(mavutil.mavlink.enums['MAV_RESULT'][msgd['result']].description)
-                return True
-
-        tnow = time.time()
-        if tnow - cmd_tlast >= 0.5:
-            if tries > 0 and tries_cnt >= tries:
-                link.close()
-                return False
-            cmd_tlast = tnow
-            print('  send probe')
-            link.mav.command_long_send(
-                sysid, compid,
-                mavutil.mavlink.MAV_CMD_PREFLIGHT_REBOOT_SHUTDOWN,
-                cmd_confirmation, # confirmation, send 0 to ping, send 1 to arm, then 2 to execute
-                0, 0,
-                cmd_action, # param 3: Component action
-                68, # param 4: Component ID
-                0, 0,
-                1234321)
-            tries_cnt += 1
-
-    link.close()
+    while tries == 0 or tries_cnt < tries:
+        expected = session.rx.expect('COMMAND_ACK', is_ack)
+        print('  send probe')
+        session.link.mav.command_long_send(
+            sysid, compid,
+            mavutil.mavlink.MAV_CMD_PREFLIGHT_REBOOT_SHUTDOWN,
+            cmd_confirmation, # confirmation, send 0 to ping, send 1 to arm, then 2 to execute
+            0, 0,
+            cmd_action, # param 3: Component action
+            68, # param 4: Component ID
+            0, 0,
+            1234321)
+        tries_cnt += 1
+        msg = session.rx.wait(expected, timeout=0.5)
+        if msg:
+            print(' ', msg)
+            #print(mavutil.mavlink.enums['MAV_RESULT'][msg.result].description)
+            return True
+
+    session.close()
     return False
 
 
-def mlrs_put_into_systemboot(link, sysid=51, compid=68):
+def mlrs_put_into_systemboot(session, sysid=51, compid=68):
     print('check connection to mLRS receiver...')
-    res = mlrs_cmd_preflight_reboot_shutdown(link, 0, 0, sysid=sysid, compid=compid, tries=10)
+    res = mlrs_cmd_preflight_reboot_shutdown(session, 0, 0, sysid=sysid, compid=compid, tries=10)
     if not res:
         do_error('Sorry, something went wrong.')
     print('mLRS receiver connected')
@@ -281,7 +424,7 @@ def mlrs_put_into_systemboot(link, sysid=51, compid=68):
     # Arm reboot
 
     print('arm mLRS receiver for reboot shutdown...')
-    res = mlrs_cmd_preflight_reboot_shutdown(link, 1, 3, sysid=sysid, compid=compid, tries=3)
+    res = mlrs_cmd_preflight_reboot_shutdown(session, 1, 3, sysid=sysid, compid=compid, tries=3)
     if not res:
         do_error('Sorry, something went wrong.')
     print('mLRS receiver armed for reboot shutdown')
@@ -289,7 +432,7 @@ def mlrs_put_into_systemboot(link, sysid=51, compid=68):
     # Reboot shutdown
 
     print('mLRS receiver reboot shutdown...')
-    mlrs_cmd_preflight_reboot_shutdown(link, 2, 3, sysid=sysid, compid=compid, tries=3) # probably ok if ot fails
+    mlrs_cmd_preflight_reboot_shutdown(session, 2, 3, sysid=sysid, compid=compid, tries=3) # probably ok if ot fails
     print('mLRS receiver reboot shutdown DONE')
 
     print('mLRS receiver jumps to system bootloader in 5 seconds')
@@ -308,11 +451,11 @@ def mlrs_find_apport():
 
 
 def mlrs_find_receiver_baud(apport, baudrate, serialx):
-    link = ardupilot_connect(apport, baudrate)
-    if not link:
+    session = ardupilot_session(apport, baudrate)
+    if not session.connect():
         do_error('Sorry, something went wrong.')
-    receiver_baud = ardupilot_find_serialx_baud(link, serialx)
-    link.close()
+    receiver_baud = session.find_serialx_baud(serialx)
+    session.close()
     if not receiver_baud:
         do_error('Sorry, something went wrong.')
     print('mLRS receiver baudrate is', receiver_baud)
@@ -330,29 +473,27 @@ def mlrs_open_passthrough(comport, baudrate, serialx, options=[]):
     print('Baud rate:', baudrate)
     print('SERIALx number:', serialx)
     print('------------------------------------------------------------')
-    link = ardupilot_connect(apport, baudrate)
-    if not link:
+    session = ardupilot_session(apport, baudrate)
+    if not session.connect():
         do_error('Sorry, something went wrong.')
     print('------------------------------------------------------------')
-    receiver_baud = ardupilot_find_serialx_baud(link, serialx)
+    receiver_baud = session.find_serialx_baud(serialx)
     if not receiver_baud:
-        link.close()
+        session.close()
+        do_error('Sorry, something went wrong.')
+    if not session.set_baud(receiver_baud):
         do_error('Sorry, something went wrong.')
-    if baudrate != receiver_baud:
-        print('Receiver baudrate is ', receiver_baud, ', change link to it')
-        link.close()
-        link = ardupilot_connect(apport, receiver_baud)
-        time.sleep(0.5) # can't hurt
     if 'scripting' in options:
-        ardupilot_set_scripting(link, serialx) # also closes link
-        link = ardupilot_connect(apport, receiver_baud)
+        session.set_scripting(serialx) # also closes link, flight controller is power cycled
+        if not session.connect():
+            do_error('Sorry, something went wrong.')
     print('------------------------------------------------------------')
-    ardupilot_open_passthrough(link, serialx)
+    session.open_passthrough(serialx)
     print('------------------------------------------------------------')
     if not 'nosysboot' in options:
-        mlrs_put_into_systemboot(link)
+        mlrs_put_into_systemboot(session)
         print('------------------------------------------------------------')
-    link.close()
+    session.close()
     print('')
     print('PASSTHROUGH READY FOR PROGRAMMING TOOL')
 
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+#************************************************************
+# Copyright (c) MLRS project
+# GPL3
+# https://www.gnu.org/licenses/gpl-3.0.de.html
+# OlliW @ www.olliw.eu
+#************************************************************
+# USB Devices for mLRS Flasher Desktop App
+# 18. Oct. 2026
+#************************************************************
+
+
+# tells what kind of device a serial port is, from its usb vid/pid, manufacturer and description
+#
+# vid, pid: pid None is for any pid of this vid, vid None is for any usb device
+# kind: stlink, edgetx, stm32vcp, ardupilot, ardupilot-other, cp210x, usbttl
+# manufacturer, description: if given, the port's one must contain it, case is ignored
+# os: if given, the rule is only for this os.name
+#
+# rules for a vid/pid are tried before those for the vid, and these before those for any device, each in the
+# order given here, the first whose conditions hold wins
+# usb ports which match no rule are usbttl, other ports are serial
+# https://ardupilot.org/dev/docs/USB-IDs.html
+
+g_usbDeviceList = [
+    # STLink
+    { 'vid' : 0x0483, 'pid' : 0x374E, 'kind' : 'stlink' },
+
+    # EdgeTx/OpenTx radio, we do have more info on posix
+    { 'vid' : 0x0483, 'pid' : 0x5740, 'kind' : 'edgetx', 'os' : 'nt' },
+    { 'vid' : 0x0483, 'pid' : 0x5740, 'kind' : 'edgetx', 'manufacturer' : 'EdgeTX' },
+    { 'vid' : 0x0483, 'pid' : 0x5740, 'kind' : 'stm32vcp' },
+
+    # ArduPilot, the manufacturer seems to be so for all boards and OSses
+    # composite USB, AP creates two COM ports, one is for SLCAN, this works for Win
+    { 'vid' : 0x1209, 'pid' : 0x5740, 'kind' : 'ardupilot-other', 'manufacturer' : 'ardupilot', 'description' : 'slcan' },
+    { 'vid' : 0x1209, 'pid' : 0x5740, 'kind' : 'ardupilot', 'manufacturer' : 'ardupilot' },
+    { 'vid' : 0x2DAE, 'pid' : 0x1016, 'kind' : 'ardupilot-other', 'manufacturer' : 'ardupilot', 'description' : 'slcan' }, # Hex Cube Orange
+    { 'vid' : 0x2DAE, 'pid' : 0x1016, 'kind' : 'ardupilot', 'manufacturer' : 'ardupilot' },
+    { 'vid' : 0x2DAE, 'pid' : 0x1012, 'kind' : 'ardupilot-other', 'manufacturer' : 'ardupilot', 'description' : 'slcan' }, # Hex Cube Yellow
+    { 'vid' : 0x2DAE, 'pid' : 0x1012, 'kind' : 'ardupilot', 'manufacturer' : 'ardupilot' },
+    { 'vid' : 0x1209, 'pid' : 0x004B, 'kind' : 'ardupilot-other', 'manufacturer' : 'ardupilot', 'description' : 'slcan' }, # Holybro Durandal
+    { 'vid' : 0x1209, 'pid' : 0x004B, 'kind' : 'ardupilot', 'manufacturer' : 'ardupilot' },
+    # single USB
+    { 'vid' : 0x1209, 'pid' : 0x5741, 'kind' : 'ardupilot', 'manufacturer' : 'ardupilot' }, # AP standard VID/PID
+    { 'vid' : 0x2DAE, 'pid' : None,   'kind' : 'ardupilot', 'manufacturer' : 'ardupilot' }, # Hex Cube
+    { 'vid' : 0x3612, 'pid' : None,   'kind' : 'ardupilot', 'manufacturer' : 'ardupilot' }, # Holybro
+    # ArduPilot's VID/PID, but not known to be ArduPilot
+    { 'vid' : 0x1209, 'pid' : 0x5740, 'kind' : 'ardupilot-other' },
+    { 'vid' : 0x1209, 'pid' : 0x5741, 'kind' : 'ardupilot-other' },
+
+    # CP210x usb-ttl adapters, RadioMaster Bandit, BetaFPV1WMicro seem to use one
+    { 'vid' : 0x10C4, 'pid' : 0xEA60, 'kind' : 'cp210x' },
+    { 'vid' : 0x10C4, 'pid' : 0xEA70, 'kind' : 'cp210x' },
+    { 'vid' : None,   'pid' : None,   'kind' : 'cp210x', 'description' : 'CP210' }, # was 'Silicon Labs CP210x', gave issues on nix
+]
@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+#************************************************************
+# Copyright (c) MLRS project
+# GPL3
+# https://www.gnu.org/licenses/gpl-3.0.de.html
+# OlliW @ www.olliw.eu
+#************************************************************
+# Flash many devices from a manifest, without GUI
+# 18. Oct. 2026
+#************************************************************
+# Does this:
+# - reads a manifest with the devices to flash
+# - finds the firmware file for each device, and flashes it with the same tools as the app
+# - prints a status report, exit code is 0 only if all devices were flashed successfully
+#************************************************************
+
+import os, sys, time
+import argparse
+import json
+import multiprocessing
+
+
+#--------------------------------------------------
+#-- Manifest
+#--------------------------------------------------
+'''
+The manifest is a json file with a list of devices, or a dict with the list in the field 'devices'.
+Each device is a dict with the fields:
+- 'role': 'tx', 'rx' or 'txint'
+- 'device_type': as in the 'Device Type' menu of the app, e.g. 'MatekSys'
+- 'version': e.g. 'v1.3.04', or the dev version as in the 'Firmware Version' menu
+- 'firmware': optional, part of the firmware filename, needed if there are several files for the device type
+- 'flashmethod': optional, 'dfu', 'stlink', 'uart', 'esptool' or 'appassthru', needed if the target has several
+- 'port': com port, needed for 'uart' and 'esptool'
+  for esp devices and stm32 'uart' this can also be a list of com ports, or 'all', these are then flashed all at once
+  'all' are all CP210x ports for 'tx', and all usb-ttl adapters for 'rx'
+- 'serialx': ArduPilot SERIALx, e.g. 'serial2', needed for 'appassthru'
+- 'name': optional, used in the report
+- 'count': optional, flash this many devices with this entry, one after the other, before each next one the operator
+  is asked to connect it
+
+example:
+[
+    { "role": "rx", "device_type": "MatekSys", "version": "v1.3.04",
+      "firmware": "rx-matek-mr24-30-g431kb", "flashmethod": "uart", "port": "COM5", "count": 10 },
+    { "role": "tx", "device_type": "RadioMaster", "version": "v1.3.04",
+      "firmware": "tx-radiomaster-bandit", "port": "COM7" }
+]
+'''
+
+def load_manifest(filename):
+    try:
+        F = open(filename, 'r')
+        manifest = json.load(F)
+        F.close()
+    except Exception as e:
+        print('ERROR: load_manifest()', e)
+        return None
+    if isinstance(manifest, dict):
+        manifest = manifest.get('devices')
+    if not isinstance(manifest, list):
+        print('ERROR: load_manifest() no list of devices')
+        return None
+    deviceList = []
+    for entry in manifest:
+        count = int(entry.get('count', 1))
+        name = entry.get('name', entry.get('device_type', '?'))
+        for i in range(count):
+            if count > 1:
+                deviceList.append(dict(entry, name=name+' #'+str(i+1), repeat=(i > 0)))
+            else:
+                deviceList.append(entry)
+    return deviceList
+
+
+#--------------------------------------------------
+#-- Flash
+#--------------------------------------------------
+
+flasher = None
+
+# the flasher expects to run in its folder, so this changes into it
+def load_flasher():
+    global flasher
+    if flasher == None:
+        os.chdir(os.path.dirname(os.path.realpath(__file__)))
+        sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+        import mLRS_Flasher # no Tk window is created by importing, but pillow and customtkinter must be installed
+        mLRS_Flasher.allow_run_as_script(False) # we want the results, and no console windows
+        flasher = mLRS_Flasher
+    return flasher
+
+# finds firmware file, programmer and baudrate for a manifest entry
+# returns a dict with the arguments for flashDevice(), or an error string
+def resolve_device(entry, firmwareVersionDict):
+    load_flasher()
+    role = entry.get('role')
+    device_type = entry.get('device_type')
+    version = entry.get('version')
+    if role not in flasher.g_deviceTypeDicts.keys():
+        return 'unknown role ' + str(role)
+    if device_type not in flasher.g_deviceTypeDicts[role].keys():
+        return 'unknown device type ' + str(device_type)
+    if version not in firmwareVersionDict.keys():
+        return 'unknown version ' + str(version)
+
+    device_type_f = flasher.g_deviceTypeDicts[role][device_type]['fname']
+    filesList = flasher.downloadFilesListFromTree(role, firmwareVersionDict[version]['gitUrl'], device_type_f, version)
+    if filesList == None:
+        return 'download of files list failed'
+    firmware = entry.get('firmware', '')
+    filesList = [key for key in filesList if firmware in os.path.basename(key['path'])]
+    if len(filesList) == 0:
+        return 'no firmware file found'
+    if len(filesList) > 1:
+        return 'firmware not unique: ' + ', '.join([os.path.basename(key['path']) for key in filesList])
+    key = filesList[0]
+    firmware_filename = os.path.basename(key['path'])
+
+    chipset, flashmethod, description, wireless = flasher.get_device_metadata(role, device_type, firmware_filename)
+    if not flashmethod: flashmethod = 'default' # can be None
+    if 'flashmethod' in entry.keys():
+        if flashmethod != 'default' and entry['flashmethod'] not in flashmethod.split(','):
+            return 'flashmethod ' + entry['flashmethod'] + ' not supported, use ' + flashmethod
+        flashmethod = entry['flashmethod']
+    elif ',' in flashmethod:
+        return 'flashmethod needed, use one of ' + flashmethod
+    programmer, baudrate = flasher.get_programmer(role, chipset, flashmethod, entry.get('serialx'))
+    if not programmer:
+        return 'flashing of ' + str(chipset) + ' not supported'
+    if 'appassthru' in programmer and not entry.get('serialx'):
+        return 'serialx needed'
+    comport = None
+    if baudrate:
+        comport = entry.get('port')
+        if not comport:
+            return 'port needed'
+        if comport == 'all':
+            if role == 'tx':
+                comport = flasher.find_serial_ports_esp_tx_devices()
+            else:
+                comport = flasher.find_serial_ports_usbttl_devices()
+            if not comport:
+                return 'no ports found'
+        if isinstance(comport, list) and 'esp' not in programmer and programmer != 'stm32 uart':
+            return 'several ports only supported for esp devices and stm32 uart'
+    return {
+        'programmer' : programmer,
+        'url' : key['url'],
+        'filename' : firmware_filename,
+        'comport' : comport,
+        'baudrate' : baudrate,
+        'sha' : key['sha'],
+        }
+
+
+def flash_devices(deviceList, dry_run=False, stop_on_error=False):
+    load_flasher()
+    print('downloading versions...')
+    firmwareVersionDict = flasher.downloadVersionsDict()
+    if not firmwareVersionDict:
+        print('ERROR: flash_devices() download failed')
+        return None
+
+    report = []
+    for no, entry in enumerate(deviceList):
+        name = entry.get('name', entry.get('device_type', '?'))
+        print()
+        print('*** '+str(no+1)+'/'+str(len(deviceList))+': '+str(name)+' ***')
+        tstart = time.time()
+        res = resolve_device(entry, firmwareVersionDict)
+        if isinstance(res, str):
+            print('ERROR:', res)
+            report.append((name, '', 'ERROR', res, 0.0))
+            if stop_on_error: break
+            continue
+        if dry_run:
+            report.append((name, res['filename'], 'ok', 'dry run, ' + res['programmer'] + ' ' + str(res['comport']), 0.0))
+            continue
+        if entry.get('repeat'): # it's the same port, so there must be another device on it
+            print('Please connect the next device, and press Enter to continue')
+            input()
+            tstart = time.time()
+        if isinstance(res['comport'], list): # flash all ports at once
+            resDict = flasher.flashDeviceMultiPort(res['programmer'], res['url'], res['filename'],
+                                                   res['comport'], res['baudrate'], res['sha'])
+            if resDict == None:
+                resDict = {}
+            for comport in res['comport']:
+                ok = resDict.get(comport, False)
+                report.append((name+'@'+comport, res['filename'], 'ok' if ok else 'FAILED', '', time.time() - tstart))
+            if not all(resDict.get(comport, False) for comport in res['comport']) and stop_on_error: break
+            continue
+        try:
+            ok = flasher.flashDevice(res['programmer'], res['url'], res['filename'],
+                                     res['comport'], res['baudrate'], res['sha'])
+            msg = ''
+        except (Exception, SystemExit) as e: # do_error() of the passthrough tools calls sys.exit()
+            ok = False
+            msg = repr(e)
+        report.append((name, res['filename'], 'ok' if ok else 'FAILED', msg, time.time() - tstart))
+        if not ok and stop_on_error: break
+    return report
+
+
+def print_report(report):
+    print()
+    print('------------------------------------------------------------')
+    print('Report')
+    print('------------------------------------------------------------')
+    for no, (name, filename, status, msg, dt) in enumerate(report):
+        print('%3d  %-6s %-20s %-50s %5.0fs  %s' % (no+1, status, name, filename, dt, msg))
+    ok_cnt = len([r for r in report if r[2] == 'ok'])
+    print('------------------------------------------------------------')
+    print(str(ok_cnt)+' of '+str(len(report))+' ok')
+
+
+#--------------------------------------------------
+#-- Main
+#--------------------------------------------------
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support() # worker processes of the multi port flasher
+    parser = argparse.ArgumentParser(
+        description = 'Flash mLRS devices listed in a manifest'
+        )
+    parser.add_argument("manifest", help="Manifest json file")
+    parser.add_argument("-dryrun", action='store_true', help = 'Find firmware files, but do not flash')
+    parser.add_argument("-stoponerror", action='store_true', help = 'Stop at the first device which fails')
+    args = parser.parse_args()
+
+    deviceList = load_manifest(os.path.abspath(args.manifest))
+    if deviceList == None:
+        sys.exit(1)
+
+    report = flash_devices(deviceList, args.dryrun, args.stoponerror)
+    if report == None:
+        sys.exit(1)
+    print_report(report)
+    if len(report) < len(deviceList) or any(r[2] != 'ok' for r in report):
+        sys.exit(1)
+    sys.exit(0)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+#************************************************************
+# Copyright (c) MLRS project
+# GPL3
+# https://www.gnu.org/licenses/gpl-3.0.de.html
+# OlliW @ www.olliw.eu
+#************************************************************
+# Cache for compressed firmware images
+# 18. Oct. 2026
+#************************************************************
+# Does this:
+# - compresses an image for the esp deflate write only once, and keeps result and md5 on disk
+# - is keyed by the sha256 of the image content, so it is shared by all devices and all processes
+# - checks entries on read, and removes least recently used entries when it gets too large
+# - keeps the last few entries in memory, for a batch which flashes the same image again and again
+#************************************************************
+
+import os
+import hashlib
+import zlib
+import threading
+
+
+class DeflateCache:
+
+    def __init__(self, path, max_size=64*1024*1024, level=9, max_mem_entries=8):
+        self.path = path
+        self.max_size = max_size
+        self.level = level
+        self.lock = threading.Lock()
+        self.memDict = {} # key -> (compressed, md5), saves reading the disk in a batch, in order of last use
+        self.max_mem_entries = max_mem_entries
+
+    def _entry_path(self, key):
+        return os.path.join(self.path, key + '.z')
+
+    def _load(self, key):
+        entry_path = self._entry_path(key)
+        try:
+            F = open(entry_path, 'rb')
+            md5 = F.read(32).decode('ascii')
+            compressed = F.read()
+            F.close()
+        except:
+            return None
+        try:
+            ok = hashlib.sha256(zlib.decompress(compressed)).hexdigest() == key
+        except:
+            ok = False
+        if not ok:
+            print('ERROR: DeflateCache._load() corrupted entry', key)
+            try:
+                os.remove(entry_path)
+            except:
+                pass
+            return None
+        try:
+            os.utime(entry_path, None) # mtime is used as last use time
+        except:
+            pass
+        return compressed, md5
+
+    def _store(self, key, compressed, md5):
+        entry_path = self._entry_path(key)
+        tmp_path = entry_path + '.tmp' + str(os.getpid()) + '-' + str(threading.get_ident())
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            F = open(tmp_path, 'wb')
+            F.write(md5.encode('ascii'))
+            F.write(compressed)
+            F.close()
+            os.replace(tmp_path, entry_path)
+        except:
+            print('ERROR: DeflateCache._store()')
+            return
+        self.gc()
+
+    # returns the compressed data and the md5 of data
+    def compress(self, data):
+        key = hashlib.sha256(data).hexdigest()
+        with self.lock:
+            if key in self.memDict.keys():
+                entry = self.memDict.pop(key)
+                self.memDict[key] = entry # most recently used goes last
+                return entry
+        entry = self._load(key)
+        if entry:
+            print('* deflate cached', key[:16])
+        else:
+            entry = (zlib.compress(data, self.level), hashlib.md5(data).hexdigest())
+            self._store(key, entry[0], entry[1])
+        with self.lock:
+            self.memDict[key] = entry
+            while len(self.memDict) > self.max_mem_entries:
+                del self.memDict[next(iter(self.memDict))] # least recently used
+        return entry
+
+    # remove least recently used entries until we are below max_size
+    def gc(self):
+        with self.lock:
+            try:
+                names = os.listdir(self.path)
+            except:
+                return
+            entries = []
+            total_size = 0
+            for name in names:
+                if not name.endswith('.z'): # also skips writes in progress
+                    continue
+                try:
+                    st = os.stat(os.path.join(self.path, name))
+                except:
+                    continue
+                entries.append((st.st_mtime, st.st_size, name))
+                total_size += st.st_size
+            entries.sort()
+            for _, size, name in entries:
+                if total_size <= self.max_size:
+                    break
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except:
+                    pass
+                total_size -= size
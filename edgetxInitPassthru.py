@@ -9,10 +9,12 @@
 #************************************************************
 # Comment: does not work with OpenTx
 
-import os, sys, time
+import sys, time
 import argparse
 import serial
 
+import serialPorts as serialports
+
 
 #--------------------------------------------------
 #-- Internal Tx Module Flashing Tools
@@ -22,20 +24,9 @@ def find_radio_serial_ports():
     '''
     EdgeTx/OpenTx radio serial port is known to have vid == 0x0483, pid = 0x5740
     '''
-    try:
-        from serial.tools.list_ports import comports
-        portList = list(comports())
-    except:
-        print('ERROR: find_radio_serial_port() (pyserial missing?) [1]')
+    radioportList = serialports.find_ports([serialports.KIND_EDGETX]) # on posix also checks manufacturer
+    if radioportList == None:
         return []
-    radioportList = []
-    for port in portList:
-        if port.vid == 0x0483 and port.pid == 0x5740:
-            if os.name == 'posix': # we do have more info on this os
-                if port.manufacturer == 'EdgeTX':
-                    radioportList.append(port.device)
-            else:
-                radioportList.append(port.device)
     return radioportList
 
 
@@ -0,0 +1,418 @@
+#!/usr/bin/env python
+#************************************************************
+# Copyright (c) MLRS project
+# GPL3
+# https://www.gnu.org/licenses/gpl-3.0.de.html
+# OlliW @ www.olliw.eu
+#************************************************************
+# Flash ESP devices using the esptool package in-process
+# 18. Oct. 2026
+#************************************************************
+# Does this:
+# - connects, runs the stub, changes baudrate, and writes the regions like esptool write_flash does
+# - reports progress as dicts through a callback
+# - verifies each region by md5, and returns a result dict instead of an exit code
+# - can step up the baudrate as far as the usb adapter allows, and remembers the best baudrate per adapter
+# - takes compressed images from a cache, so an image is compressed only once for many devices
+# - in differential mode, skips regions whose content on the chip already matches, and for the others
+#   writes only the 4 KiB sectors which differ
+#************************************************************
+
+import os, sys, time
+import hashlib
+import zlib
+import types
+import json
+
+sys.path.insert(0, os.path.join('thirdparty','esptool')) # must come first, a pip installed esptool may differ
+from esptool.loader import ESPLoader, DEFAULT_TIMEOUT, ERASE_WRITE_TIMEOUT_PER_MB, timeout_per_mb
+from esptool.cmds import detect_chip, detect_flash_size, _update_image_flash_params
+from esptool.targets import CHIP_DEFS
+from esptool.util import FatalError, NotImplementedInROMError, flash_size_bytes, pad_to, print_overwrite
+
+import deflateCache as deflatecache
+import serialPorts as serialports
+
+
+# compressed images, keyed by content
+g_deflateCache = deflatecache.DeflateCache(os.path.join('temp','cache','deflate'))
+
+
+#--------------------------------------------------
+#-- Helper
+#--------------------------------------------------
+
+def _read_file(filename):
+    F = open(filename, 'rb')
+    data = F.read()
+    F.close()
+    return data
+
+
+def _connect(port, chip, before):
+    if chip == 'auto':
+        return detect_chip(port, ESPLoader.ESP_ROM_BAUD, before)
+    esp = CHIP_DEFS[chip](port, ESPLoader.ESP_ROM_BAUD)
+    esp.connect(before)
+    return esp
+
+
+# connects, runs the stub, and changes to baudrate
+def _connect_stub(port, chip, before, baudrate):
+    esp = _connect(port, chip, before)
+    print('Chip is', esp.CHIP_NAME)
+    if not esp.secure_download_mode and not esp.stub_is_disabled:
+        esp = esp.run_stub()
+    if baudrate and baudrate > ESPLoader.ESP_ROM_BAUD:
+        try:
+            esp.change_baud(baudrate)
+        except NotImplementedInROMError:
+            print('WARNING: ROM doesn\'t support changing baud rate')
+    return esp
+
+
+# returns the image as it is written, i.e., padded and with the flash settings put into the bootloader
+# esp can also be the chip class, as only class attributes are used
+def _prepare_image(esp, address, data, flash_mode, flash_freq, flash_size):
+    # _update_image_flash_params() takes the flash settings from an args object
+    args = types.SimpleNamespace(
+        chip = esp.CHIP_NAME.lower().replace('-',''),
+        flash_mode = flash_mode, flash_freq = flash_freq, flash_size = flash_size)
+    data = pad_to(data, 4)
+    return _update_image_flash_params(esp, address, args, data)
+
+
+def _set_flash_size(esp, flash_size):
+    if flash_size in ['keep', 'detect']:
+        flash_size = detect_flash_size(esp) # is None in secure download mode
+    if flash_size:
+        esp.flash_set_parameters(flash_size_bytes(flash_size))
+
+
+# checks if the region on the chip already holds data, by comparing the md5 computed on the chip
+def _region_matches(esp, address, data):
+    if esp.secure_download_mode:
+        return False
+    try:
+        return esp.flash_md5sum(address, len(data)) == hashlib.md5(data).hexdigest()
+    except NotImplementedInROMError:
+        return False
+
+
+# writes data at address, compressed
+# progress is reported relative to the region, which starts at region_address and has region_size,
+# with done bytes of the region already written before
+# returns the number of bytes sent on the wire
+def _write_compressed(esp, address, data, report, region_address, region_size, done=0, compressed=None):
+    uncsize = len(data)
+    if compressed == None:
+        compressed = zlib.compress(data, 9)
+    decompress = zlib.decompressobj()
+    blocks = esp.flash_defl_begin(uncsize, len(compressed), address)
+
+    tstart = time.time()
+    timeout = DEFAULT_TIMEOUT
+    bytes_written = 0
+    for seq in range(blocks):
+        block = compressed[seq * esp.FLASH_WRITE_SIZE : (seq + 1) * esp.FLASH_WRITE_SIZE]
+        percent = 100 * (done + bytes_written) // region_size
+        print_overwrite('Writing at 0x%08x... (%d %%)' % (address + bytes_written, percent))
+        # feeding the block into the decompressor tells how much will be written, which gives the timeout
+        block_uncompressed = len(decompress.decompress(block))
+        block_timeout = max(DEFAULT_TIMEOUT, timeout_per_mb(ERASE_WRITE_TIMEOUT_PER_MB, block_uncompressed))
+        if not esp.IS_STUB:
+            timeout = block_timeout # ROM code writes block to flash before ACKing
+        esp.flash_defl_block(block, seq, timeout=timeout)
+        if esp.IS_STUB:
+            timeout = block_timeout # stub ACKs when block is received, and then writes to flash
+        bytes_written += block_uncompressed
+        dt = max(time.time() - tstart, 0.001)
+        report(address=region_address, written=done + bytes_written, size=region_size,
+               percent=100 * (done + bytes_written) // region_size, rate=bytes_written / dt)
+    if esp.IS_STUB:
+        # the last block is written only after the ACK, a dummy read waits for it
+        esp.read_reg(ESPLoader.CHIP_DETECT_MAGIC_REG_ADDR, timeout=timeout)
+    dt = time.time() - tstart
+    print_overwrite('Wrote %d bytes (%d compressed) at 0x%08x in %.1f seconds...' % (uncsize, len(compressed), address, dt),
+                    last_line=True)
+    return len(compressed)
+
+
+def _verify_region(esp, address, data, md5=None):
+    if esp.secure_download_mode:
+        return
+    if not md5:
+        md5 = hashlib.md5(data).hexdigest()
+    try:
+        if esp.flash_md5sum(address, len(data)) != md5:
+            raise FatalError('MD5 of file does not match data in flash!')
+        print('Hash of data verified.')
+    except NotImplementedInROMError:
+        pass
+
+
+# writes one region, and verifies it
+# returns the number of bytes sent on the wire
+def _write_region(esp, address, data, report):
+    compressed, md5 = g_deflateCache.compress(data)
+    sent = _write_compressed(esp, address, data, report, address, len(data), compressed=compressed)
+    _verify_region(esp, address, data, md5)
+    return sent
+
+
+# finds the sectors of the region which differ from what is on the chip, by their md5 computed on the chip
+# returns a list of (offset, length) of runs of differing sectors, gaps of up to max_gap sectors are merged
+# returns None if too many sectors differ, then writing the whole region is faster than asking sector by sector
+def _changed_sector_runs(esp, address, data, max_gap=1, min_checked=16, max_changed_ratio=0.5):
+    sector_size = esp.FLASH_SECTOR_SIZE
+    runs = []
+    checked = 0
+    changed = 0
+    for offset in range(0, len(data), sector_size):
+        chunk = data[offset : offset + sector_size]
+        checked += 1
+        if esp.flash_md5sum(address + offset, len(chunk)) == hashlib.md5(chunk).hexdigest():
+            continue
+        changed += 1
+        if checked >= min_checked and changed > max_changed_ratio * checked:
+            return None
+        if runs and offset - (runs[-1][0] + runs[-1][1]) <= max_gap * sector_size:
+            runs[-1] = (runs[-1][0], offset + len(chunk) - runs[-1][0]) # extend run, includes the gap
+        else:
+            runs.append((offset, len(chunk)))
+    return runs
+
+
+# writes only the sectors of the region which differ from what is on the chip, and verifies the region
+# falls back to writing the whole region if sectors can't be compared, or if too many differ
+# returns the number of bytes sent on the wire
+def _write_region_delta(esp, address, data, report):
+    sector_size = esp.FLASH_SECTOR_SIZE
+    if esp.secure_download_mode or address % sector_size != 0:
+        return _write_region(esp, address, data, report)
+    try:
+        runs = _changed_sector_runs(esp, address, data)
+    except NotImplementedInROMError:
+        runs = None
+    if runs == None:
+        return _write_region(esp, address, data, report)
+    changed = sum([length for _, length in runs])
+    print('Writing %d of %d bytes at 0x%08x, in %d runs of changed sectors' % (changed, len(data), address, len(runs)))
+    sent = 0
+    done = 0
+    for offset, length in runs:
+        sent += _write_compressed(esp, address + offset, data[offset : offset + length], report, address, changed, done)
+        done += length
+    _verify_region(esp, address, data)
+    return sent
+
+
+#--------------------------------------------------
+#-- Baudrate negotiation
+#--------------------------------------------------
+
+# baudrates which are tried above the requested baudrate, in this order
+g_negotiateBaudrateList = [1500000, 2000000, 3000000]
+
+# best baudrate found per usb adapter, 'VID:PID serial port' -> baudrate
+g_baudrateFile = os.path.join('temp','esp_baudrates.json')
+
+
+# returns 'VID:PID serial port' of the usb adapter of the port, or None if it is not a usb port
+# adapters of one type differ in how fast they go, e.g. by their cable, and clones may all have the same serial number,
+# so the port is part of it too
+def _usb_id(port):
+    info = serialports.port_info(port)
+    if info == None or info.vid == None:
+        return None
+    return '%04X:%04X %s %s' % (info.vid, info.pid, info.serial_number or '', info.device)
+
+
+def _load_baudrates():
+    try:
+        F = open(g_baudrateFile, 'r')
+        baudrateDict = json.load(F)
+        F.close()
+        return baudrateDict
+    except:
+        return {}
+
+
+def _store_baudrate(usb_id, baudrate):
+    baudrateDict = _load_baudrates()
+    baudrateDict[usb_id] = baudrate
+    tmp_path = g_baudrateFile + '.tmp' + str(os.getpid()) # workers of the multi port flasher may write at the same time
+    try:
+        os.makedirs(os.path.dirname(g_baudrateFile), exist_ok=True)
+        F = open(tmp_path, 'w')
+        json.dump(baudrateDict, F, indent=1)
+        F.close()
+        os.replace(tmp_path, g_baudrateFile)
+    except:
+        print('ERROR: _store_baudrate()')
+
+
+# checks that the link works at the current baudrate, by reading back flash and comparing with the md5 computed on the chip
+def _check_link(esp, size=0x4000):
+    data = esp.read_flash(0, size)
+    return hashlib.md5(data).hexdigest() == esp.flash_md5sum(0, size)
+
+
+# changes to baudrate, and checks the link
+# returns True if the link works at baudrate, else goes back to fallback_baudrate and returns False
+def _try_baud(esp, baudrate, fallback_baudrate):
+    try:
+        # the driver may not support the baudrate, find out before the chip is changed
+        esp._set_port_baudrate(baudrate)
+        esp._set_port_baudrate(fallback_baudrate)
+    except FatalError:
+        print('Baud rate %d not supported by driver' % baudrate)
+        return False
+    try:
+        esp.change_baud(baudrate)
+        if _check_link(esp):
+            return True
+        print('Baud rate %d failed read-back' % baudrate)
+    except Exception as e: # FatalError, SerialException
+        print('Baud rate %d failed:' % baudrate, e)
+    # we don't know if the chip did change, so try both
+    for rate in [baudrate, fallback_baudrate]:
+        try:
+            esp._set_port_baudrate(rate)
+            esp.flush_input()
+            if rate != fallback_baudrate:
+                esp.change_baud(fallback_baudrate)
+            if _check_link(esp):
+                return False
+        except Exception:
+            pass
+    raise FatalError('Lost connection when changing baud rate to %d' % baudrate)
+
+
+# steps up from the current baudrate through the candidates, and stays at the highest which works
+# the result is remembered per usb adapter, so next time the best baudrate is tried first
+# returns the baudrate in use, raises FatalError if the link was lost, then the chip must be reconnected
+def _negotiate_baud(esp, port, baudrate):
+    usb_id = _usb_id(port)
+    known_best = _load_baudrates().get(usb_id) if usb_id else None
+    if known_best != None and known_best <= baudrate: # adapter is known to not go faster
+        return baudrate
+    rateList = [rate for rate in g_negotiateBaudrateList if rate > baudrate]
+    best = baudrate
+    try:
+        if known_best in rateList:
+            if _try_baud(esp, known_best, baudrate):
+                best = known_best
+                rateList = []
+            else:
+                rateList = [rate for rate in rateList if rate < known_best]
+        for rate in rateList:
+            if not _try_baud(esp, rate, best):
+                break
+            best = rate
+    finally:
+        if usb_id: # also when the link was lost, so we don't try again
+            _store_baudrate(usb_id, best)
+    print('Using baud rate %d' % best)
+    return best
+
+
+#--------------------------------------------------
+#-- API
+#--------------------------------------------------
+
+# regions: list of (address, filename or bytes)
+# chip: 'auto', 'esp32', 'esp32c3', 'esp8266', ...
+# before: 'default_reset', 'no_reset', after: 'hard_reset', 'soft_reset', 'no_reset'
+# flash_mode, flash_freq, flash_size: as for esptool write_flash, 'keep' leaves them as in the image
+# differential: regions which are already on the chip are not written, and of the others only the changed sectors
+# negotiate: step up from baudrate to the highest baudrate which works, must not be used through a passthrough
+# callback(progress) is called with a dict, with fields 'text' or 'address', 'written', 'size', 'percent', 'rate'
+# returns a dict with the fields:
+#   'ok' : True/False, 'error' : error message or None, 'chip' : chip name, 'time' : secs, 'baudrate' : baudrate used,
+#   'regions' : list of dicts with 'address', 'size', 'sent', 'md5', 'skipped'
+def flash(port, baudrate, regions, chip='auto', before='default_reset', after='hard_reset',
+          flash_mode='keep', flash_freq='keep', flash_size='keep', differential=False, negotiate=False, callback=None):
+    def report(**kwargs):
+        if callback:
+            callback(kwargs)
+
+    result = { 'ok' : False, 'error' : None, 'chip' : None, 'time' : 0.0, 'baudrate' : ESPLoader.ESP_ROM_BAUD, 'regions' : [] }
+    tstart = time.time()
+    esp = None
+    try:
+        report(text='connecting...')
+        esp = _connect_stub(port, chip, before, baudrate)
+        result['chip'] = esp.CHIP_NAME
+        if negotiate and esp.IS_STUB and not esp.secure_download_mode and esp._port.baudrate > ESPLoader.ESP_ROM_BAUD:
+            report(text='negotiating baudrate...')
+            try:
+                _negotiate_baud(esp, port, esp._port.baudrate)
+            except FatalError as e:
+                if before == 'no_reset': # chip can't be put into bootloader again
+                    raise
+                print('WARNING:', e)
+                report(text='reconnecting...')
+                esp._port.close()
+                esp = _connect_stub(port, chip, before, baudrate)
+        result['baudrate'] = esp._port.baudrate
+        _set_flash_size(esp, flash_size)
+
+        for address, data in regions:
+            if isinstance(data, str):
+                data = _read_file(data)
+            if len(data) == 0:
+                continue
+            if not esp.secure_download_mode and not esp.get_secure_boot_enabled():
+                data = _prepare_image(esp, address, data, flash_mode, flash_freq, flash_size)
+            else:
+                data = pad_to(data, 4)
+            skipped = differential and _region_matches(esp, address, data)
+            if skipped:
+                print('Skipping 0x%08x, %d bytes are unchanged' % (address, len(data)))
+                report(address=address, written=len(data), size=len(data), percent=100, rate=0.0, skipped=True)
+                sent = 0
+            elif differential:
+                sent = _write_region_delta(esp, address, data, report)
+            else:
+                sent = _write_region(esp, address, data, report)
+            result['regions'].append({
+                'address' : address, 'size' : len(data), 'sent' : sent, 'md5' : hashlib.md5(data).hexdigest(),
+                'skipped' : skipped })
+
+        print('Leaving...')
+        if esp.IS_STUB:
+            # skip sending flash_finish to ROM loader, as it causes the loader to exit and run user code
+            esp.flash_begin(0, 0)
+            esp.flash_defl_finish(False)
+        if after == 'hard_reset':
+            esp.hard_reset()
+        elif after == 'soft_reset':
+            esp.soft_reset(False)
+        elif esp.IS_STUB: # 'no_reset'
+            esp.soft_reset(True) # exit stub back to ROM loader
+        result['ok'] = True
+    except Exception as e: # FatalError, SerialException, OSError
+        print('ERROR: espFlasher.flash()', e)
+        result['error'] = str(e)
+    finally:
+        if esp:
+            try:
+                esp._port.close()
+            except:
+                pass
+    result['time'] = time.time() - tstart
+    return result
+
+
+# compresses the regions into the cache, so that workers which flash many devices at once find them there
+# takes the same arguments as flash(), port, baudrate, etc. are ignored
+def precompress(regions, chip='auto', flash_mode='keep', flash_freq='keep', flash_size='keep', **kwargs):
+    if chip not in CHIP_DEFS.keys(): # the chip class is needed to prepare the bootloader
+        return
+    for address, data in regions:
+        if isinstance(data, str):
+            data = _read_file(data)
+        if len(data) == 0:
+            continue
+        g_deflateCache.compress(_prepare_image(CHIP_DEFS[chip], address, data, flash_mode, flash_freq, flash_size))
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+#************************************************************
+# Copyright (c) MLRS project
+# GPL3
+# https://www.gnu.org/licenses/gpl-3.0.de.html
+# OlliW @ www.olliw.eu
+#************************************************************
+# Flash ESP devices on several com ports at once
+# 18. Oct. 2026
+#************************************************************
+# Does this:
+# - runs espFlasher in one worker process per com port, so all ports are flashed in parallel
+# - can run stm32Bootloader instead, for STM32 devices flashed through the UART system bootloader
+# - collects output and progress of the workers through a queue, and reports progress and result per port
+# - a worker which hangs or dies is detected, and its port is reported as failed
+#************************************************************
+
+import sys, time
+import multiprocessing
+import queue
+import importlib
+
+
+#--------------------------------------------------
+#-- Worker process
+#--------------------------------------------------
+
+# takes what esptool prints, and puts it line by line into the events queue
+class _QueueWriter:
+    def __init__(self, events, port):
+        self.events = events
+        self.port = port
+        self.line = ''
+
+    def write(self, s):
+        for c in s:
+            if c == '\r' or c == '\n':
+                if self.line:
+                    self.events.put(('line', self.port, self.line))
+                    self.line = ''
+                continue
+            self.line += c
+        return len(s)
+
+    def flush(self):
+        if self.line:
+            self.events.put(('line', self.port, self.line))
+            self.line = ''
+
+    def isatty(self):
+        return False # so progress is printed as lines
+
+
+def _flash_worker(flasher, port, params, events):
+    writer = _QueueWriter(events, port)
+    sys.stdout = writer
+    sys.stderr = writer
+    ok = False
+    try:
+        module = importlib.import_module(flasher)
+        res = module.flash(port, callback=lambda progress: events.put(('progress', port, progress)), **params)
+        ok = res['ok']
+    except Exception as e:
+        print('ERROR:', e)
+    writer.flush()
+    events.put(('done', port, ok))
+
+
+#--------------------------------------------------
+#-- API
+#--------------------------------------------------
+
+# flasher: module whose flash() is called, 'espFlasher' or 'stm32Bootloader'
+# paramsDict: com port -> dict of arguments for flash(), i.e. baudrate, regions, chip, ...
+# callback(port, progress) is called with a dict, which has the field 'line' for a printed line,
+# 'done' : True/False when finished, or else is the progress dict of flash()
+# a port which does not finish within timeout secs is stopped and reported as failed
+# returns a dict com port -> True/False
+def flash_ports(paramsDict, callback=None, timeout=300.0, flasher='espFlasher'):
+    ctx = multiprocessing.get_context('spawn') # the same on all platforms, and safe with threads
+    events = ctx.Queue()
+    procDict = {}
+    for port, params in paramsDict.items():
+        proc = ctx.Process(target=_flash_worker, args=(flasher, port, params, events), daemon=True)
+        proc.start()
+        procDict[port] = proc
+
+    def report(port, **kwargs):
+        if callback:
+            callback(port, kwargs)
+
+    resDict = {}
+
+    def handle(kind, port, value):
+        if kind == 'line':
+            print('['+port+']', value)
+            report(port, line=value)
+        elif kind == 'progress':
+            report(port, **value)
+        elif kind == 'done' and port not in resDict:
+            resDict[port] = value
+            report(port, done=value)
+
+    tstart = time.time()
+    while len(resDict) < len(procDict):
+        try:
+            handle(*events.get(timeout=0.1))
+            continue
+        except queue.Empty:
+            pass
+        # a worker may have put its 'done' and ended just after the get() timed out, a worker which ended has its
+        # messages in the pipe, so these are read before it is taken as died
+        deadList = [port for port, proc in procDict.items() if port not in resDict and proc.exitcode != None]
+        tend = time.time() + 0.5
+        while deadList and time.time() < tend:
+            try:
+                handle(*events.get(timeout=max(0.0, tend - time.time())))
+            except queue.Empty:
+                break
+        for port in deadList:
+            if port not in resDict:
+                print('ERROR: flash_ports() worker died', port)
+                resDict[port] = False
+                report(port, done=False)
+        if time.time() - tstart > timeout:
+            for port, proc in procDict.items():
+                if port not in resDict:
+                    print('ERROR: flash_ports() timeout', port)
+                    proc.terminate()
+                    resDict[port] = False
+                    report(port, done=False)
+
+    for proc in procDict.values():
+        proc.join(timeout=1.0)
+    return resDict
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+#************************************************************
+# Copyright (c) MLRS project
+# GPL3
+# https://www.gnu.org/licenses/gpl-3.0.de.html
+# OlliW @ www.olliw.eu
+#************************************************************
+# Catalog of the firmware files in a github tree
+# 18. Oct. 2026
+#************************************************************
+# Does this:
+# - sorts the files of a tree once into indices by role, version, device and chipset
+# - answers the queries of the menus by dict lookups
+# - file names are parsed by firmwareName
+#************************************************************
+
+import firmwareName as fwname
+
+
+class FirmwareCatalog:
+
+    # tree: list of the entries of a recursive github tree
+    # device_fnames: the 'fname' of all device types, which are used as keys of the device index
+    def __init__(self, tree, device_fnames=None):
+        self.device_fnames = list(device_fnames) if device_fnames else []
+        self.index = {} # (role, version, device) -> list of entries
+        self.chipsetIndex = {} # (role, chipset) -> list of entries
+        self.roleIndex = {} # role -> list of entries, for queries which can't be answered by the index
+        self.unindexed = {} # role -> list of entries whose version or device could not be determined
+        self.versions = set()
+        self.lua = []
+        for entry in tree:
+            self._add(entry)
+
+    # tx and rx files are not distinguished, the device fname (tx-xxx or rx-xxx) does that
+    def _role(self, name):
+        if not name.role or not name.chipset: # only accept tx and rx files for stm32 or esp
+            return None
+        if name.role == 'txint':
+            return 'txint' if name.chipset == 'esp' else None
+        return 'txrx'
+
+    def _add(self, entry):
+        if entry['type'] != 'blob':
+            return
+        path = entry['path']
+        if 'lua/' in path:
+            if '.lua' in path: # only accept files with '.lua' extension
+                self.lua.append(entry)
+            return
+        name = fwname.parse(path)
+        role = self._role(name)
+        if not role:
+            return
+        self.chipsetIndex.setdefault((role, name.chipset), []).append(entry)
+        self.roleIndex.setdefault(role, []).append(entry)
+        devices = [device for device in self.device_fnames if name.filename.startswith(device)]
+        if not name.version or not devices:
+            self.unindexed.setdefault(role, []).append(entry)
+            return
+        versions = [name.version_str]
+        if name.commit: # dev version, can be asked for with or without commit
+            versions.append(name.version_str + '-@' + name.commit)
+        self.versions.update(versions)
+        for version in versions:
+            for device in devices:
+                self.index.setdefault((role, version, device), []).append(entry)
+
+    # role is 'tx', 'rx', 'txint' or 'lua'
+    # returns the list of matching entries, in the order of the tree
+    def files(self, role, device='', version=''):
+        if role == 'lua':
+            return list(self.lua)
+        if role != 'txint':
+            role = 'txrx'
+        if device not in self.device_fnames or version not in self.versions:
+            # not a known device or version, so we need to search
+            resList = []
+            for entry in self.roleIndex.get(role, []):
+                if version in entry['path'] and device in entry['path']:
+                    resList.append(entry)
+            return resList
+        resList = list(self.index.get((role, version, device), []))
+        for entry in self.unindexed.get(role, []):
+            if version in entry['path'] and device in entry['path']:
+                resList.append(entry)
+        return resList
+
+    def files_by_chipset(self, role, chipset):
+        if role != 'txint':
+            role = 'txrx'
+        return list(self.chipsetIndex.get((role, chipset), []))
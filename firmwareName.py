@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+#************************************************************
+# Copyright (c) MLRS project
+# GPL3
+# https://www.gnu.org/licenses/gpl-3.0.de.html
+# OlliW @ www.olliw.eu
+#************************************************************
+# Firmware file name parser
+# 18. Oct. 2026
+#************************************************************
+# Does this:
+# - splits the path of a firmware file into a record of role, vendor, board, mcu, frequency band, version, commit
+#   and extension
+# - a path is parsed only once, the records are kept, so parsing a tree a second time costs lookups only
+#************************************************************
+
+import os
+import re
+import collections
+
+
+# firmware_filename looks like rx-E77-MBLKit-wle5cc-400-tcxo-v1.3.01-@ae667b78.hex or tx-matek-mr24-30-g431kb-v1.3.04.hex
+# and is in a folder like firmware/pre-release-stm32/
+g_version_regex = re.compile(r'-(v(\d+)\.(\d+)\.(\d+))(?:-@([A-Za-z0-9]+))?\.')
+
+# a version like v1.3.05, also as 'v1.3.05 (release)' or 'v1.3.05-@ae667b78'
+g_version_str_regex = re.compile(r'v(\d+)\.(\d+)\.(\d+)')
+
+# mcus as they appear in file names, g431kb, wle5cc, l433cb, f103c8, esp32, esp8285, ...
+g_stm32_mcu_regex = re.compile(r'(wle5|wl55|[fghlu]\d{3})[a-z0-9]{2}$')
+g_esp_mcu_regex = re.compile(r'esp(32|8266|8285)(c3|s3)?$')
+
+BANDS = ['2400', '900', '915', '868', '433', '400']
+
+
+# path: as given
+# filename: the file name without folders
+# role: 'tx', 'rx', 'txint', or None if the file name does not start with tx- or rx-
+# target: the part of the file name before the version, e.g. rx-matek-mr900-22-wle5cc
+# vendor, board: e.g. matek and mr900-22, board is without mcu and band, and None if nothing is left
+# mcu, band: e.g. wle5cc and 900, or None
+# chipset: 'stm32' or 'esp' as given by the folder, or as found from the mcu, or None
+# version: tuple like (1, 3, 5), or None
+# version_str: like v1.3.05, as in the file name, or None
+# commit: the commit of a dev version, or None
+# extension: like 'hex', in lower case
+FirmwareName = collections.namedtuple('FirmwareName', [
+    'path', 'filename', 'role', 'target', 'vendor', 'board', 'mcu', 'band', 'chipset',
+    'version', 'version_str', 'commit', 'extension'])
+
+
+# parsed names, path -> FirmwareName
+g_nameDict = {}
+
+def parse(path):
+    if path in g_nameDict.keys():
+        return g_nameDict[path]
+    _, filename = os.path.split(path)
+    extension = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
+    version = version_str = commit = None
+    f = g_version_regex.search(filename)
+    if f:
+        version_str = f.group(1)
+        version = (int(f.group(2)), int(f.group(3)), int(f.group(4)))
+        commit = f.group(5)
+        target = filename[:f.start()]
+    else:
+        target = filename.rsplit('.', 1)[0] if '.' in filename else filename
+    tokenList = target.split('-')
+    role = None
+    if tokenList[0] in ['tx', 'rx']:
+        role = tokenList[0]
+        if role == 'tx' and 'internal' in tokenList[1:]:
+            role = 'txint'
+    vendor = tokenList[1] if role and len(tokenList) > 1 else None
+    mcu = band = None
+    boardList = []
+    for token in tokenList[2:] if role else []:
+        if mcu == None and (g_stm32_mcu_regex.match(token.lower()) or g_esp_mcu_regex.match(token.lower())):
+            mcu = token
+        elif band == None and token in BANDS:
+            band = token
+        elif token != 'internal':
+            boardList.append(token)
+    # the folder tells, otherwise the mcu
+    if '-stm32' in path:
+        chipset = 'stm32'
+    elif '-esp' in path:
+        chipset = 'esp'
+    elif mcu and g_stm32_mcu_regex.match(mcu.lower()):
+        chipset = 'stm32'
+    elif mcu:
+        chipset = 'esp'
+    else:
+        chipset = None
+    name = FirmwareName(
+        path, filename, role, target, vendor, '-'.join(boardList) if boardList else None, mcu, band, chipset,
+        version, version_str, commit, extension)
+    g_nameDict[path] = name
+    return name
+
+
+# returns the version tuple of a string like 'v1.3.05 (release)', or None
+def parse_version(v_str):
+    f = g_version_str_regex.match(v_str)
+    if not f:
+        return None
+    return (int(f.group(1)), int(f.group(2)), int(f.group(3)))
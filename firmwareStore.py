@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+#************************************************************
+# Copyright (c) MLRS project
+# GPL3
+# https://www.gnu.org/licenses/gpl-3.0.de.html
+# OlliW @ www.olliw.eu
+#************************************************************
+# Content-addressed store for firmware files
+# 18. Oct. 2026
+#************************************************************
+# Does this:
+# - stores firmware files on disk keyed by their git blob sha, as given in the github tree
+# - checks the git blob sha on write and on read, so a corrupted file is never flashed
+# - removes files which were not used for some time, or when the store gets too large
+#************************************************************
+
+import os, time
+import hashlib
+import threading
+
+
+# git computes the sha of a blob over a header plus the content
+def git_blob_sha(data):
+    h = hashlib.sha1()
+    h.update(b'blob ' + str(len(data)).encode('ascii') + b'\0')
+    h.update(data)
+    return h.hexdigest()
+
+
+class FirmwareStore:
+
+    def __init__(self, path, max_age=30*24*3600, max_size=256*1024*1024):
+        self.path = path
+        self.max_age = max_age # in secs
+        self.max_size = max_size
+        self.lock = threading.Lock()
+
+    def _blob_path(self, sha):
+        return os.path.join(self.path, sha.lower())
+
+    def has(self, sha):
+        return os.path.isfile(self._blob_path(sha))
+
+    # returns the content as bytes, or None if not in store
+    def get(self, sha):
+        blob_path = self._blob_path(sha)
+        try:
+            F = open(blob_path, 'rb')
+            data = F.read()
+            F.close()
+        except:
+            return None
+        if git_blob_sha(data) != sha.lower():
+            print('ERROR: FirmwareStore.get() corrupted entry', sha)
+            try:
+                os.remove(blob_path)
+            except:
+                pass
+            return None
+        try:
+            os.utime(blob_path, None) # mtime is used as last use time
+        except:
+            pass
+        return data
+
+    # returns False if data does not match sha
+    def put(self, sha, data):
+        if git_blob_sha(data) != sha.lower():
+            print('ERROR: FirmwareStore.put() sha mismatch', sha)
+            return False
+        blob_path = self._blob_path(sha)
+        tmp_path = blob_path + '.tmp' + str(threading.get_ident())
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            F = open(tmp_path, 'wb')
+            F.write(data)
+            F.close()
+            os.replace(tmp_path, blob_path)
+        except:
+            print('ERROR: FirmwareStore.put()')
+            return False
+        self.gc()
+        return True
+
+    # remove entries not used within max_age, then least recently used ones until below max_size
+    def gc(self):
+        with self.lock:
+            try:
+                names = os.listdir(self.path)
+            except:
+                return
+            tnow = time.time()
+            entries = []
+            total_size = 0
+            for name in names:
+                blob_path = os.path.join(self.path, name)
+                try:
+                    st = os.stat(blob_path)
+                    if tnow - st.st_mtime > self.max_age:
+                        os.remove(blob_path)
+                        continue
+                except:
+                    continue
+                if '.tmp' in name: # write in progress
+                    continue
+                entries.append((st.st_mtime, st.st_size, blob_path))
+                total_size += st.st_size
+            entries.sort()
+            for _, size, blob_path in entries:
+                if total_size <= self.max_size:
+                    break
+                try:
+                    os.remove(blob_path)
+                except:
+                    pass
+                total_size -= size
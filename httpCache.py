@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+#************************************************************
+# Copyright (c) MLRS project
+# GPL3
+# https://www.gnu.org/licenses/gpl-3.0.de.html
+# OlliW @ www.olliw.eu
+#************************************************************
+# Persistent cache for http downloads
+# 18. Oct. 2026
+#************************************************************
+# Does this:
+# - stores responses on disk, keyed by url
+# - revalidates with ETag/Last-Modified, 304 responses don't count against the GitHub API rate limit
+# - urls of git objects (trees, blobs by sha) never change, so these are served without asking
+# - serves the stored response if the network is not available
+# - bounds the size by evicting the least recently used entries
+#************************************************************
+
+import os, time
+import json
+import hashlib
+import re
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# git objects addressed by a sha are immutable
+g_immutable_url_regex = re.compile(r'/git/(trees|blobs)/[0-9a-fA-F]{7,40}(\?|$)')
+
+
+class HttpCache:
+
+    def __init__(self, path, max_size=64*1024*1024, max_connections=8):
+        self.path = path
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        # one session shared by all threads, so connections to github are kept alive and reused
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_connections)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _entry_paths(self, url):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.path, key+'.meta'), os.path.join(self.path, key+'.data')
+
+    def _load(self, url):
+        meta_path, data_path = self._entry_paths(url)
+        try:
+            F = open(meta_path, 'r')
+            meta = json.load(F)
+            F.close()
+            F = open(data_path, 'rb')
+            data = F.read()
+            F.close()
+        except:
+            return None, None
+        if meta.get('url') != url: # should not happen, play it safe
+            return None, None
+        return meta, data
+
+    def _touch(self, url):
+        _, data_path = self._entry_paths(url)
+        try:
+            os.utime(data_path, None) # mtime is used as last access time for LRU eviction
+        except:
+            pass
+
+    def _write_file(self, path, data, mode):
+        # write to a temporary file first, so that a crash never leaves a truncated entry
+        tmp_path = path + '.tmp' + str(threading.get_ident())
+        F = open(tmp_path, mode)
+        F.write(data)
+        F.close()
+        os.replace(tmp_path, path)
+
+    def _store(self, url, res):
+        meta = {
+            'url' : url,
+            'etag' : res.headers.get('ETag'),
+            'last_modified' : res.headers.get('Last-Modified'),
+            'time' : time.time(),
+        }
+        meta_path, data_path = self._entry_paths(url)
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            self._write_file(data_path, res.content, 'wb')
+            self._write_file(meta_path, json.dumps(meta), 'w')
+        except:
+            print('ERROR: HttpCache._store()')
+            return
+        self.evict()
+
+    def evict(self):
+        # remove least recently used entries until we are below max_size
+        with self.lock:
+            try:
+                names = os.listdir(self.path)
+            except:
+                return
+            entries = []
+            total_size = 0
+            for name in names:
+                if not name.endswith('.data'):
+                    continue
+                try:
+                    st = os.stat(os.path.join(self.path, name))
+                except:
+                    continue
+                entries.append((st.st_mtime, st.st_size, name[:-5]))
+                total_size += st.st_size
+            if total_size <= self.max_size:
+                return
+            entries.sort()
+            for _, size, key in entries:
+                for ext in ('.data', '.meta'):
+                    try:
+                        os.remove(os.path.join(self.path, key+ext))
+                    except:
+                        pass
+                total_size -= size
+                if total_size <= self.max_size:
+                    break
+
+    def clear(self):
+        with self.lock:
+            try:
+                names = os.listdir(self.path)
+            except:
+                return
+            for name in names:
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except:
+                    pass
+
+    # returns the content as bytes
+    # returns False if the GitHub API rate limit is exceeded and nothing is cached
+    # returns None if the download failed and nothing is cached
+    # store = False does not put the response into the cache, for content which is cached elsewhere
+    def get(self, url, timeout=(2,4), store=True):
+        meta, data = self._load(url)
+        if meta and g_immutable_url_regex.search(url):
+            print('* cached', url)
+            self._touch(url)
+            return data
+        headers = {}
+        if meta:
+            if meta['etag']: headers['If-None-Match'] = meta['etag']
+            if meta['last_modified']: headers['If-Modified-Since'] = meta['last_modified']
+        print('* request', url)
+        try:
+            res = self.session.get(url, headers=headers, allow_redirects=True, timeout=timeout)
+        except:
+            if meta:
+                print('* offline, using cached', url)
+                self._touch(url)
+                return data
+            return None
+        if res.status_code == 304 and meta:
+            print('* not modified', url)
+            self._touch(url)
+            return data
+        if b'API rate limit exceeded' in res.content:
+            if meta:
+                print('* rate limit exceeded, using cached', url)
+                self._touch(url)
+                return data
+            print(res.content)
+            return False
+        if res.status_code != 200:
+            if meta:
+                self._touch(url)
+                return data
+            return None
+        if store:
+            self._store(url, res)
+        return res.content
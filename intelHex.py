@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+#************************************************************
+# Copyright (c) MLRS project
+# GPL3
+# https://www.gnu.org/licenses/gpl-3.0.de.html
+# OlliW @ www.olliw.eu
+#************************************************************
+# Intel hex parser and firmware image
+# 18. Oct. 2026
+#************************************************************
+# Does this:
+# - parses Intel hex files line by line, checks record checksums
+# - keeps the image as a sorted list of segments, adjacent data is coalesced into one segment
+# - gives the pages touched by the image, and aligned blocks which do not cross a block boundary, for flashing and
+#   verifying, these are computed once per image
+# - loaded images are kept by file name, size and mtime, so a file is parsed only once
+#************************************************************
+
+import os
+import bisect
+import hashlib
+import binascii
+
+
+class IntelHexError(Exception):
+    pass
+
+
+class HexImage:
+
+    def __init__(self):
+        self.segmentList = [] # sorted list of [address, bytearray], not adjacent and not overlapping
+        self.start_address = None
+        self.pageDict = {} # (base, page_size) -> list of page numbers
+        self.blockDict = {} # (block_size, align, fill) -> list of blocks
+
+    def _addresses(self):
+        return [address for address, _ in self.segmentList]
+
+    # adds data at address, is fast if data follows the last segment, as it does in hex files
+    def add(self, address, data):
+        self.pageDict = {}
+        self.blockDict = {}
+        if len(data) == 0:
+            return
+        if self.segmentList:
+            last = self.segmentList[-1]
+            if last[0] + len(last[1]) == address:
+                last[1].extend(data)
+                return
+        i = bisect.bisect_left(self._addresses(), address)
+        if i > 0:
+            prev = self.segmentList[i-1]
+            if prev[0] + len(prev[1]) > address:
+                raise IntelHexError('overlapping data at 0x%08X' % address)
+        if i < len(self.segmentList) and self.segmentList[i][0] < address + len(data):
+            raise IntelHexError('overlapping data at 0x%08X' % self.segmentList[i][0])
+        if i > 0 and prev[0] + len(prev[1]) == address:
+            prev[1].extend(data)
+        else:
+            self.segmentList.insert(i, [address, bytearray(data)])
+            i += 1
+        # merge with the next segment if it follows now
+        prev = self.segmentList[i-1]
+        if i < len(self.segmentList) and prev[0] + len(prev[1]) == self.segmentList[i][0]:
+            prev[1].extend(self.segmentList[i][1])
+            del self.segmentList[i]
+
+    def segments(self):
+        return [(address, bytes(data)) for address, data in self.segmentList]
+
+    def size(self):
+        return sum([len(data) for _, data in self.segmentList])
+
+    def min_address(self):
+        return self.segmentList[0][0] if self.segmentList else None
+
+    def max_address(self): # address of the last byte
+        if not self.segmentList:
+            return None
+        return self.segmentList[-1][0] + len(self.segmentList[-1][1]) - 1
+
+    def sha256(self):
+        h = hashlib.sha256()
+        for address, data in self.segmentList:
+            h.update(address.to_bytes(4, 'little'))
+            h.update(len(data).to_bytes(4, 'little'))
+            h.update(data)
+        return h.hexdigest()
+
+    # returns the sorted list of numbers of the pages which hold data, page n starts at base + n * page_size
+    def pages(self, base, page_size):
+        key = (base, page_size)
+        if key not in self.pageDict.keys():
+            pageSet = set()
+            for address, data in self.segmentList:
+                if address < base:
+                    raise IntelHexError('address 0x%08X below 0x%08X' % (address, base))
+                pageSet.update(range((address - base) // page_size, (address - base + len(data) - 1) // page_size + 1))
+            self.pageDict[key] = sorted(pageSet)
+        return self.pageDict[key]
+
+    # returns a list of (address, data) of the image in blocks, which do not cross multiples of block_size
+    # start and end of each block are aligned to align, gaps are filled with fill, as needed for flash which is
+    # programmed in words or double words
+    def blocks(self, block_size, align=1, fill=0xFF):
+        key = (block_size, align, fill)
+        if key not in self.blockDict.keys():
+            extentDict = {} # block number -> [start, end]
+            for address, data in self.segmentList:
+                end = address + len(data)
+                for n in range(address // block_size, (end - 1) // block_size + 1):
+                    start_n = max(address, n * block_size)
+                    end_n = min(end, (n + 1) * block_size)
+                    if n in extentDict.keys():
+                        extentDict[n][1] = end_n
+                    else:
+                        extentDict[n] = [start_n, end_n]
+            blockList = []
+            for n in sorted(extentDict.keys()):
+                start = (extentDict[n][0] // align) * align
+                end = ((extentDict[n][1] + align - 1) // align) * align
+                blockList.append((start, self.read(start, end - start, fill)))
+            self.blockDict[key] = blockList
+        return self.blockDict[key]
+
+    # returns the data from address to address + size, gaps are filled with fill
+    def read(self, address, size, fill=0xFF):
+        res = bytearray([fill]) * size
+        i = bisect.bisect_right(self._addresses(), address)
+        if i > 0:
+            i -= 1
+        for seg_address, data in self.segmentList[i:]:
+            if seg_address >= address + size:
+                break
+            start = max(address, seg_address)
+            end = min(address + size, seg_address + len(data))
+            if start < end:
+                res[start - address : end - address] = data[start - seg_address : end - seg_address]
+        return bytes(res)
+
+
+#--------------------------------------------------
+#-- Parser
+#--------------------------------------------------
+
+# parses the lines of an Intel hex file, lines can be str or bytes, and come from any iterable, e.g. an open file
+# data records which follow each other are collected, and are added to the image as one piece
+def parse(lines, image=None):
+    if image == None:
+        image = HexImage()
+    base = 0
+    pending_address = 0
+    pending = bytearray()
+    unhexlify = binascii.unhexlify
+    for no, line in enumerate(lines):
+        line = line.strip()
+        if not line:
+            continue
+        if line[0] not in (':', 58): # also for bytes
+            raise IntelHexError('line %d: no record' % (no+1))
+        try:
+            record = unhexlify(line[1:])
+        except (binascii.Error, ValueError):
+            raise IntelHexError('line %d: not hex' % (no+1))
+        if len(record) < 5 or len(record) != record[0] + 5:
+            raise IntelHexError('line %d: wrong length' % (no+1))
+        if sum(record) & 0xFF:
+            raise IntelHexError('line %d: checksum error' % (no+1))
+        rectype = record[3]
+        if rectype == 0x00:
+            address = base + ((record[1] << 8) | record[2])
+            if address != pending_address + len(pending):
+                image.add(pending_address, pending)
+                pending_address = address
+                pending = bytearray()
+            pending += record[4:-1]
+        elif rectype == 0x01:
+            break
+        elif rectype == 0x02: # extended segment address
+            base = ((record[4] << 8) | record[5]) << 4
+        elif rectype == 0x04: # extended linear address
+            base = ((record[4] << 8) | record[5]) << 16
+        elif rectype == 0x03: # start segment address, cs:ip
+            image.start_address = (((record[4] << 8) | record[5]) << 4) + ((record[6] << 8) | record[7])
+        elif rectype == 0x05: # start linear address
+            image.start_address = int.from_bytes(record[4:8], 'big')
+        else:
+            raise IntelHexError('line %d: unknown record type %d' % (no+1, rectype))
+    image.add(pending_address, pending)
+    return image
+
+
+def from_bin(data, address):
+    image = HexImage()
+    image.add(address, data)
+    return image
+
+
+#--------------------------------------------------
+#-- API
+#--------------------------------------------------
+
+# loaded images, (filename, size, mtime, address) -> HexImage
+g_imageCacheDict = {}
+
+# returns the image of a .hex file, or of a .bin file which is put at bin_address
+# an image is parsed only once, so it must not be changed by the caller
+def load(filename, bin_address=0x08000000):
+    global g_imageCacheDict
+    filename = os.path.abspath(filename)
+    st = os.stat(filename)
+    key = (filename, st.st_size, st.st_mtime, bin_address)
+    if key in g_imageCacheDict.keys():
+        return g_imageCacheDict[key]
+    if filename.lower().endswith('.hex'):
+        F = open(filename, 'rb')
+        image = parse(F)
+        F.close()
+    else:
+        F = open(filename, 'rb')
+        image = from_bin(F.read(), bin_address)
+        F.close()
+    g_imageCacheDict = {k: v for k, v in g_imageCacheDict.items() if k[0] != filename} # drop old versions
+    g_imageCacheDict[key] = image
+    return image
@@ -11,7 +11,6 @@
 app_version = '3.05.2025-001'
 
 import os, sys, time
-import subprocess
 import re
 
 from PIL import Image, ImageTk
@@ -19,15 +18,27 @@ import customtkinter as ctk
 from customtkinter import ThemeManager, filedialog
 import configparser
 
-import requests
 import json
 import base64
-import serial
 import copy
+import queue
+import threading
+import concurrent.futures
+import multiprocessing
 
 import assets.mLRS_metadata as mlrs_md
 import apInitPassthru as appassthru
 import edgetxInitPassthru as radio
+import httpCache as httpcache
+import firmwareStore as fwstore
+import firmwareCatalog as fwcatalog
+import espFlasher as espflasher
+import espMultiFlasher as espmulti
+import stm32Bootloader as stm32boot
+import serialPorts as serialports
+import targetMetadata as targetmd
+import firmwareName as fwname
+import processRunner as processrunner
 
 
 ctk.set_default_color_theme("blue")  # Themes: "blue" (standard), "green", "dark-blue"
@@ -45,35 +56,61 @@ def create_dir(path):
     if not os.path.exists(path):
         make_dir(path)
 
-def os_system(arg):
-    res = os.system(arg)
-    if res != 0:
-        print("ERROR: os system res =", res)
+# progress reports, is called with a dict from the thread which does the work
+g_progress_callback = None
 
-def os_popen(arg):
-    subprocess.Popen(arg, creationflags=subprocess.CREATE_NEW_CONSOLE)    
+def set_progress_callback(callback):
+    global g_progress_callback
+    g_progress_callback = callback
+
+def report_progress(**kwargs):
+    if g_progress_callback:
+        g_progress_callback(kwargs)
+
+# runs the program supervised, with its progress lines reported, returns True if it succeeded
+# args is the list of the program and its arguments
+def os_run(args, timeout=None, idle_timeout=None):
+    res = processrunner.run(args, callback=lambda progress: report_progress(**progress),
+                            timeout=timeout, idle_timeout=idle_timeout)
+    return res['ok']
+
+# stops all programs which are running
+def os_run_cancel():
+    return processrunner.cancel_all()
+
+# the passthrough setups ask the user to do things, so on Windows they run as a script in a console window, which
+# needs someone to look at it, set to False when running headless
+g_allow_run_as_script = True
+
+def allow_run_as_script(flag):
+    global g_allow_run_as_script
+    g_allow_run_as_script = flag
 
 def os_system_run_as_script():
     #return False
     #return True
+    if not g_allow_run_as_script: return False
     if os.name == 'posix': return False
     if getattr(sys, 'frozen', False): return False # don't do as it conflicts with pyinstaller
     return True
 
+# runs the call, a string like "flashEspToolProgrammer('esp32 appassthru serial2', 'firmware.bin', None, None)", in a
+# new python in a console window, supervised, so we learn the result, and it can be cancelled
+def os_run_as_script(call):
+    script = (
+        'import os, sys\n' +
+        'import mLRS_Flasher as flasher\n' +
+        'flasher.allow_run_as_script(False)\n' +
+        'res = flasher.' + call + '\n' +
+        'os.system("pause")\n' +
+        'sys.exit(0 if res else 1)\n'
+        )
+    res = processrunner.run([sys.executable, '-c', script], console=True)
+    return res['ok']
+
+# the ports are enumerated once and kept by serialPorts, so this is fast and can be called on any menu event
 def find_serial_ports():
-    try:
-        from serial.tools.list_ports import comports
-        portList = list(comports())
-    except:
-        print('ERROR: find_serial_ports() (pyserial missing?) [1]')
-        return None
-    deviceportList = []
-    for port in portList:
-        #print('*',port.device, port.name, port.description)
-        #print(' ',port.hwid, port.vid, port.pid)
-        #print(' ',port.manufacturer, port.location, port.product, port.interface)
-        deviceportList.append(port.device)
-    return deviceportList
+    return serialports.find_ports()
 
 
 '''
@@ -82,38 +119,16 @@ STM32 Flashing Tools
 --------------------------------------------------
 '''
 
-# helper
-def _cvtstr(s):
-    if not s: return str(s)
-    return '"' + s.replace('\\','\\\\') + '"'
-
-
-def _flash_stm32cubeprogrammer_argstr(programmer, firmware, comport, baudrate):
+def _flash_stm32cubeprogrammer_args(programmer, firmware, comport, baudrate):
     if 'dfu' in programmer:
-        args = '-c port=usb1 -w "'+firmware+'" -v -g'
+        args = ['-c', 'port=usb1', '-w', firmware, '-v', '-g']
     elif 'uart' in programmer:
-        args = ' -c port="'+comport+'" br='+str(baudrate)+' -w "' + firmware +'" -v -g'
+        args = ['-c', 'port='+comport, 'br='+str(baudrate), '-w', firmware, '-v', '-g']
     else:
-        args = '-c port=SWD freq=3900 -w "'+firmware+'" -v -g'
+        args = ['-c', 'port=SWD', 'freq=3900', '-w', firmware, '-v', '-g']
     return args
 
 
-def flash_stm32cubeprogrammer_win_as_script(programmer, firmware, comport, baudrate):
-    F = open(os.path.join('mlrs_flasher_runner.py'), 'w')
-    F.write('import os\n')
-    F.write('from mLRS_Flasher import _flash_stm32cubeprogrammer_argstr\n')
-    F.write("ST_Programmer = os.path.join('thirdparty','STM32CubeProgrammer','win','bin','STM32_Programmer_CLI.exe')\n")
-    F.write('args = _flash_stm32cubeprogrammer_argstr('+_cvtstr(programmer)+', '+_cvtstr(firmware)+', '+_cvtstr(comport)+', '+str(baudrate)+')\n')
-    F.write('os.system(ST_Programmer + \' \' + args)\n')
-    F.write('print()\n')
-    F.write('print("*** DONE ***")\n')
-    F.write('print()\n')
-    F.write('print("Cheers, and have fun.")\n')
-    F.write('os.system("pause")\n')
-    F.close()
-    os_popen(['python','mlrs_flasher_runner.py'])
-
-
 def flash_stm32cubeprogrammer(programmer, firmware, comport, baudrate):
     if sys.platform.lower() == 'darwin':
         ST_Programmer = os.path.join('thirdparty','STM32CubeProgrammer','mac','bin','STM32_Programmer_CLI')
@@ -121,30 +136,18 @@ def flash_stm32cubeprogrammer(programmer, firmware, comport, baudrate):
         ST_Programmer = os.path.join('thirdparty','STM32CubeProgrammer','linux','bin','STM32_Programmer_CLI')
     else:
         ST_Programmer = os.path.join('thirdparty','STM32CubeProgrammer','win','bin','STM32_Programmer_CLI.exe')
-    args = _flash_stm32cubeprogrammer_argstr(programmer, firmware, comport, baudrate)
-    os_system(ST_Programmer + ' ' + args)
-
-
-def flash_stm32cubeprogrammer_appassthru_win_as_script(serialx_no, firmware):
-    F = open(os.path.join('mlrs_flasher_runner.py'), 'w')
-    F.write('import os, time\n')
-    F.write('from mLRS_Flasher import _flash_stm32cubeprogrammer_argstr\n')
-    F.write('import apInitPassthru as appassthru\n')
-    F.write("print('opening passthru...')\n")
-    F.write('comport, baudrate = appassthru.mlrs_open_passthrough(None, 57600, ' + str(serialx_no) + ')\n')
-    F.write("print('waiting for 5 secs...')\n")
-    F.write('time.sleep(5.0)\n')
-    F.write("print('flashing...')\n")
-    F.write("ST_Programmer = os.path.join('thirdparty','STM32CubeProgrammer','win','bin','STM32_Programmer_CLI.exe')\n")
-    F.write('args = _flash_stm32cubeprogrammer_argstr("uart", '+_cvtstr(firmware)+', comport, baudrate)\n')
-    F.write('os.system(ST_Programmer + \' \' + args)\n')
-    F.write('print()\n')
-    F.write('print("*** DONE ***")\n')
-    F.write('print()\n')
-    F.write('print("Cheers, and have fun.")\n')
-    F.write('os.system("pause")\n')
-    F.close()
-    os_popen(['python','mlrs_flasher_runner.py'])
+    args = _flash_stm32cubeprogrammer_args(programmer, firmware, comport, baudrate)
+    # no idle timeout, its output to a pipe may be buffered, so it can seem silent for long when erasing or writing
+    # a large part, stopping it then would leave the target half programmed, so it only gets a generous total time
+    return os_run([ST_Programmer] + args, timeout=300.0)
+
+
+# talks to the UART system bootloader in-process, which saves starting STM32_Programmer_CLI, and gives us progress
+def flash_stm32_uart(firmware, comport, baudrate):
+    res = stm32boot.flash(comport, baudrate, firmware, callback=lambda progress: report_progress(**progress))
+    if not res['ok']:
+        print('ERROR: flash_stm32_uart()', res['error'])
+    return res['ok']
 
 
 def flash_stm32cubeprogrammer_appassthru(serialx_no, firmware):
@@ -154,7 +157,7 @@ def flash_stm32cubeprogrammer_appassthru(serialx_no, firmware):
     print('waiting for 5 secs...')
     time.sleep(5.0)
     print('flashing...')
-    flash_stm32cubeprogrammer('uart', firmware, comport, baudrate)
+    return flash_stm32_uart(firmware, comport, baudrate)
 
 
 def flashSTM32CubeProgrammer(programmer, firmware, comport, baudrate):
@@ -164,22 +167,42 @@ def flashSTM32CubeProgrammer(programmer, firmware, comport, baudrate):
     if f:
         serialx_no = f.group(1)
 
-    if os_system_run_as_script():
+    if 'appassthru' in programmer and os_system_run_as_script(): # the passthrough setup asks the user to do things
         #print('run as script file')
-        if 'appassthru' in programmer:
-            flash_stm32cubeprogrammer_appassthru_win_as_script(serialx_no, firmware)
-        else:
-            flash_stm32cubeprogrammer_win_as_script(programmer, firmware, comport, baudrate)
-        return # done
+        return os_run_as_script('flashSTM32CubeProgrammer(%r, %r, None, None)' % (programmer, firmware))
 
     if 'appassthru' in programmer:
-        flash_stm32cubeprogrammer_appassthru(serialx_no, firmware)
+        res = flash_stm32cubeprogrammer_appassthru(serialx_no, firmware)
+    elif 'uart' in programmer:
+        res = flash_stm32_uart(firmware, comport, baudrate)
     else:
-        flash_stm32cubeprogrammer(programmer, firmware, comport, baudrate)
+        res = flash_stm32cubeprogrammer(programmer, firmware, comport, baudrate)
     print()
-    print('*** DONE ***')
+    print('*** DONE ***' if res else '*** FAILED ***')
     print()
     print('Cheers, and have fun.')
+    return res
+
+
+# prints the result of each port, and DONE only if all were flashed, returns True then
+def _report_multiport(comports, resDict):
+    print()
+    for comport in comports:
+        print(comport, 'DONE' if resDict.get(comport) else 'FAILED')
+    ok = all(resDict.get(comport, False) for comport in comports)
+    print()
+    print('*** DONE ***' if ok else '*** FAILED ***')
+    return ok
+
+
+# flashes all comports at once through the UART system bootloader, each in its own worker process
+# returns True if all were flashed, and a dict comport -> True/False
+def flashSTM32UartMultiPort(firmware, comports, baudrate):
+    paramsDict = {}
+    for comport in comports:
+        paramsDict[comport] = { 'baudrate' : baudrate, 'firmware' : firmware }
+    resDict = espmulti.flash_ports(paramsDict, lambda port, progress: report_progress(port=port, **progress), flasher='stm32Bootloader')
+    return _report_multiport(comports, resDict), resDict
 
 
 #flashSTM32CubeProgrammer('stm32 stlink', 'temp/rx-R9MX-l433cb-v1.3.05-@28fe6be0.hex')
@@ -196,155 +219,68 @@ ESP32/ESP82XX Flashing Tools
 
 # RadioMaster Bandit, BetaFPV1WMicro seem to use a CP210x usb-ttl adapter
 def find_serial_ports_esp_tx_devices():
-    try:
-        from serial.tools.list_ports import comports
-        portList = list(comports())
-    except:
-        print('ERROR: find_serial_ports_esp_tx_devices() (pyserial missing?) [1]')
-        return None
-    deviceportList = []
-    for port in portList:
-        if not 'USB' in port.hwid.upper():
-            continue
-        if port.vid == 0x0483 and port.pid == 0x374E: # this is STLink
-            continue
-        if port.vid == 0x0483 and port.pid == 0x5740: # this is EdgeTx/OpenTx
-            continue
-        if port.vid == 0x1209 and (port.pid == 0x5740 or port.pid == 0x5741): # this is ArduPilot
-            continue
-        if 'CP210' not in port.description: # was 'Silicon Labs CP210x', gave issues on nix
-            continue
-        deviceportList.append(port.device)
-    return deviceportList
+    return serialports.find_ports([serialports.KIND_CP210X])
 
 
+# usb ports which are not STLink, EdgeTx/OpenTx or ArduPilot
 def find_serial_ports_usbttl_devices():
-    try:
-        from serial.tools.list_ports import comports
-        portList = list(comports())
-    except:
-        print('ERROR: find_serial_ports_usbttl_devices() (pyserial missing?) [1]')
-        return None
-    deviceportList = []
-    for port in portList:
-        if not 'USB' in port.hwid.upper():
-            continue
-        if port.vid == 0x0483 and port.pid == 0x374E: # this is STLink
-            continue
-        if port.vid == 0x0483 and port.pid == 0x5740: # this is EdgeTx/OpenTx
-            continue
-        if port.vid == 0x1209 and (port.pid == 0x5740 or port.pid == 0x5741): # this is ArduPilot
-            continue
-        deviceportList.append(port.device)
-    return deviceportList
-
-
-def _flash_esptool_argstr(programmer, firmware, comport, baudrate):
+    return serialports.find_ports(serialports.KINDS_USBTTL)
+
+
+# returns chip, reset modes, flash settings and the regions to write, for the given programmer
+def _flash_esptool_params(programmer, firmware):
     assets_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'assets')
     if 'esp32c3' in programmer: # must come before we test for 'eps32'!
-        args = (
-            '--chip esp32c3 ' +
-            '--port "' + comport + '" ' +
-            '--baud ' + str(baudrate) + ' ' +
-            '--before default_reset --after hard_reset ' +
-            'write_flash ' +
-            '-z ' +
-            '--flash_mode dio --flash_freq 40m --flash_size 4MB ' +
-            '0x0000 ' +
-            '"' + os.path.join(assets_path,'esp32c3','bootloader.bin') + '" ' +
-            '0x8000 ' +
-            '"' + os.path.join(assets_path,'esp32c3','partitions.bin') + '" ' +
-            '0xe000 ' +
-            '"' + os.path.join(assets_path,'esp32c3','boot_app0.bin') + '" ' +
-            '0x10000 ' +
-            '"' + firmware + '"'
-            )
+        return {
+            'chip' : 'esp32c3',
+            'before' : 'default_reset', 'after' : 'hard_reset',
+            'flash_mode' : 'dio', 'flash_freq' : '40m', 'flash_size' : '4MB',
+            'regions' : [
+                (0x0000, os.path.join(assets_path,'esp32c3','bootloader.bin')),
+                (0x8000, os.path.join(assets_path,'esp32c3','partitions.bin')),
+                (0xe000, os.path.join(assets_path,'esp32c3','boot_app0.bin')),
+                (0x10000, firmware),
+                ],
+            }
     elif 'esp32' in programmer:
-        args = (
-            '--chip esp32 ' +
-            '--port "' + comport + '" ' +
-            '--baud ' + str(baudrate) + ' ' +
-            '--before default_reset --after hard_reset ' +
-            'write_flash ' +
-            '-z ' +
-            '--flash_mode dio --flash_freq 40m --flash_size 4MB ' +
-            '0x1000  ' +
-            '"' + os.path.join(assets_path,'esp32','bootloader.bin') + '" ' +
-            '0x8000 ' +
-            '"' + os.path.join(assets_path,'esp32','partitions.bin') + '" ' +
-            '0xe000 ' +
-            '"' + os.path.join(assets_path,'esp32','boot_app0.bin') + '" ' +
-            '0x10000 ' +
-            '"' + firmware + '"'
-            )
+        return {
+            'chip' : 'esp32',
+            'before' : 'default_reset', 'after' : 'hard_reset',
+            'flash_mode' : 'dio', 'flash_freq' : '40m', 'flash_size' : '4MB',
+            'regions' : [
+                (0x1000, os.path.join(assets_path,'esp32','bootloader.bin')),
+                (0x8000, os.path.join(assets_path,'esp32','partitions.bin')),
+                (0xe000, os.path.join(assets_path,'esp32','boot_app0.bin')),
+                (0x10000, firmware),
+                ],
+            }
     elif ('esp8266' in programmer or 'esp8285' in programmer) and 'no dtr' in programmer:
-        args = (
-            '--chip esp8266 ' +
-            '--port "' + comport + '" ' +
-            '--baud ' + str(baudrate) + ' ' +
-            '--before no_reset --after soft_reset ' +
-            'write_flash ' +
-            '0x0 ' +
-            '"' + firmware + '"'
-            )
+        return {
+            'chip' : 'esp8266',
+            'before' : 'no_reset', 'after' : 'soft_reset',
+            'flash_mode' : 'keep', 'flash_freq' : 'keep', 'flash_size' : 'keep',
+            'regions' : [ (0x0, firmware) ],
+            }
     elif ('esp8266' in programmer or 'esp8285' in programmer): # 'dtr'
-        args = (
-            '--chip esp8266 ' +
-            '--port "' + comport + '" ' +
-            '--baud ' + str(baudrate) + ' ' +
-            '--before default_reset --after hard_reset ' +
-            'write_flash ' +
-            '0x0 ' +
-            '"' + firmware + '"'
-            )
-    #print(args)
-    #args = '--port "' + radioport + '" ' + '--baud ' + str(baudrate) + ' ' + 'flash_id'
-    return args
-
-
-def flash_esptool_win_as_script(programmer, firmware, comport, baudrate):
-    F = open(os.path.join('mlrs_flasher_runner.py'), 'w')
-    F.write('import os\n')
-    F.write('from mLRS_Flasher import _flash_esptool_argstr\n')
-    F.write("ESP_Programmer = os.path.join('thirdparty','esptool','esptool.py')\n")
-    F.write('args = _flash_esptool_argstr('+_cvtstr(programmer)+', '+_cvtstr(firmware)+', '+_cvtstr(comport)+', '+str(baudrate)+')\n')
-    F.write('os.system(ESP_Programmer + \' \' + args)\n')
-    F.write('print()\n')
-    F.write('print("*** DONE ***")\n')
-    F.write('print()\n')
-    F.write('print("Cheers, and have fun.")\n')
-    F.write('os.system("pause")\n')
-    F.close()
-    os_popen(['python','mlrs_flasher_runner.py'])
-
-
-def flash_esptool(programmer, firmware, comport, baudrate):
-    ESP_Programmer = os.path.join('thirdparty','esptool','esptool.py')
-    args = _flash_esptool_argstr(programmer, firmware, comport, baudrate)
-    # TODO: can we catch if this was succesful?
-    os_system(ESP_Programmer + ' ' + args)
-
-
-def flash_esptool_appassthru_win_as_script(programmer, serialx_no, firmware):
-    F = open(os.path.join('mlrs_flasher_runner.py'), 'w')
-    F.write('import os, time\n')
-    F.write('from mLRS_Flasher import _flash_esptool_argstr\n')
-    F.write('import apInitPassthru as appassthru\n')
-    F.write("print('opening passthru...')\n")
-    F.write('comport, baudrate = appassthru.mlrs_open_passthrough(None, 57600, ' + str(serialx_no) + ', ["nosysboot", "scripting"])\n')
-    F.write("print('waiting for 5 secs...')\n")
-    F.write('time.sleep(5.0)\n')
-    F.write("print('flashing...')\n")
-    F.write("ESP_Programmer = os.path.join('thirdparty','esptool','esptool.py')\n")
-    F.write('args = _flash_esptool_argstr('+_cvtstr(programmer)+', '+_cvtstr(firmware)+', comport, baudrate)\n')
-    F.write('os.system(ESP_Programmer + \' \' + args)\n')
-    F.write('print()\n')
-    F.write('print("*** DONE ***")\n')
-    F.write('print()\n')
-    F.write('print("Cheers, and have fun.")\n')
-    F.write('os.system("pause")\n')
-    F.close()
-    os_popen(['python','mlrs_flasher_runner.py'])
+        return {
+            'chip' : 'esp8266',
+            'before' : 'default_reset', 'after' : 'hard_reset',
+            'flash_mode' : 'keep', 'flash_freq' : 'keep', 'flash_size' : 'keep',
+            'regions' : [ (0x0, firmware) ],
+            }
+    return None
+
+
+# runs esptool in-process, which saves starting python, and gives us progress and result
+# negotiate steps up the baudrate as far as the usb adapter allows, must be False when going through a passthrough
+def flash_esptool(programmer, firmware, comport, baudrate, negotiate=False):
+    params = _flash_esptool_params(programmer, firmware)
+    # bootloader, partitions and boot_app0 hardly ever change, so only write what is different
+    res = espflasher.flash(comport, baudrate, differential=True, negotiate=negotiate,
+                           callback=lambda progress: report_progress(**progress), **params)
+    if not res['ok']:
+        print('ERROR: flash_esptool()', res['error'])
+    return res['ok']
 
 
 def flash_esptool_appassthru(programmer, serialx_no, firmware):
@@ -354,7 +290,7 @@ def flash_esptool_appassthru(programmer, serialx_no, firmware):
     print('waiting for 5 secs...')
     time.sleep(5.0)
     print('flashing...')
-    flash_esptool(programmer, firmware, comport, baudrate)
+    return flash_esptool(programmer, firmware, comport, baudrate)
 
 
 def flashEspToolProgrammer(programmer, firmware, comport, baudrate):
@@ -363,23 +299,37 @@ def flashEspToolProgrammer(programmer, firmware, comport, baudrate):
     if f:
         serialx_no = f.group(1)
 
-    if os_system_run_as_script():
+    if 'appassthru' in programmer and os_system_run_as_script(): # the passthrough setup asks the user to do things
         #print('run as script file')
-        if 'appassthru' in programmer:
-            flash_esptool_appassthru_win_as_script(programmer, serialx_no, firmware)
-        else:
-            flash_esptool_win_as_script(programmer, firmware, comport, baudrate)
-        return # done
+        return os_run_as_script('flashEspToolProgrammer(%r, %r, None, None)' % (programmer, firmware))
 
     if 'appassthru' in programmer:
-        flash_esptool_appassthru(programmer, serialx_no, firmware)
+        res = flash_esptool_appassthru(programmer, serialx_no, firmware)
     else:
-        flash_esptool(programmer, firmware, comport, baudrate)
+        res = flash_esptool(programmer, firmware, comport, baudrate, negotiate=True) # port is on an usb adapter
     print()
-    print('*** DONE ***')
+    print('*** DONE ***' if res else '*** FAILED ***')
     print()
     print('Please remove the USB cable.')
     print('Cheers, and have fun.')
+    return res
+
+
+# flashes all comports at once, each in its own worker process
+# returns True if all were flashed, and a dict comport -> True/False
+def flashEspToolProgrammerMultiPort(programmer, firmware, comports, baudrate):
+    if 'appassthru' in programmer or 'internal' in programmer: # these need a passthrough, so only one at a time
+        print('ERROR: flashEspToolProgrammerMultiPort() [1]')
+        return False, None
+    paramsDict = {}
+    for comport in comports:
+        paramsDict[comport] = _flash_esptool_params(programmer, firmware)
+        paramsDict[comport]['baudrate'] = baudrate
+        paramsDict[comport]['differential'] = True
+        paramsDict[comport]['negotiate'] = True
+    espflasher.precompress(**paramsDict[comports[0]]) # so that the workers don't all compress at the same time
+    resDict = espmulti.flash_ports(paramsDict, lambda port, progress: report_progress(port=port, **progress))
+    return _report_multiport(comports, resDict), resDict
 
 
 #flashEspToolProgrammer('esp8285 appassthru serial2', 'temp/rx-bayck-nano-pro-900-v1.3.05-@28fe6be0.bin', None, None)
@@ -392,32 +342,6 @@ Internal Tx Module Flashing Tools
 --------------------------------------------------
 '''
 
-def flash_internal_elrs_tx_module_win_as_script(programmer, firmware, baudrate, wirelessbridge):
-    F = open(os.path.join('mlrs_flasher_runner.py'), 'w')
-    F.write('import os, time\n')
-    F.write('from mLRS_Flasher import _flash_esptool_argstr\n')
-    F.write('import edgetxInitPassthru as radio\n')
-    F.write('radioport = radio.open_passthrough(comport = None, baudrate = '+str(baudrate)+', wirelessbridge = '+str(wirelessbridge)+')\n')
-    F.write('print()\n')
-    F.write('print("*** 3. Flashing the internal Tx Module ***")\n')
-    F.write('print()\n')
-    F.write('print("The firmware to flash is:",'+_cvtstr(firmware)+')\n')
-    F.write("ESP_Programmer = os.path.join('thirdparty','esptool','esptool.py')\n")
-    F.write('args = _flash_esptool_argstr('+_cvtstr(programmer)+', '+_cvtstr(firmware)+', radioport, '+str(baudrate)+')\n')
-    F.write('os.system(ESP_Programmer + \' \' + args)\n')
-    F.write('print()\n')
-    F.write('print("*** DONE ***")\n')
-    F.write('print()\n')
-    F.write('print("Please remove the USB cable.")\n')
-    F.write('print("Cheers, and have fun.")\n')
-    F.write('os.system("pause")\n')
-    F.close()
-    os_popen(['python','mlrs_flasher_runner.py'])
-
-#flash_internal_elrs_tx_module_win_as_script('temp/tx-jumper-internal-900-v1.3.05-@28fe6be0.bin')
-#exit(1)
-
-
 def flash_internal_elrs_tx_module(programmer, firmware, baudrate, wirelessbridge):
     # firmware filename gives the complete path
     #print(filename)
@@ -429,32 +353,30 @@ def flash_internal_elrs_tx_module(programmer, firmware, baudrate, wirelessbridge
     print()
     print('The firmware to flash is:', firmware)
 
-    # TODO: can we catch if this was succesfull?
-    flash_esptool(programmer, firmware, radioport, baudrate)
+    res = flash_esptool(programmer, firmware, radioport, baudrate)
 
     print()
-    print('*** DONE ***')
+    print('*** DONE ***' if res else '*** FAILED ***')
     print()
     print('Please remove the USB cable.')
     print('Cheers, and have fun.')
+    return res
 
 
 def flashInternalElrsTxModule(programmer, firmware):
     if os_system_run_as_script():
         #print('run as script file')
-        flash_internal_elrs_tx_module_win_as_script('esp32', firmware, baudrate = 921600, wirelessbridge = False)
-        return # done
+        return os_run_as_script('flashInternalElrsTxModule(%r, %r)' % (programmer, firmware))
 
-    flash_internal_elrs_tx_module('esp32', firmware, 921600, False)
+    return flash_internal_elrs_tx_module('esp32', firmware, 921600, False)
 
 
 def flashInternalElrsTxModuleWirelessBridge(programmer, firmware):
     if os_system_run_as_script():
         #print('run as script file')
-        flash_internal_elrs_tx_module_win_as_script('esp8266', firmware, baudrate = 115200, wirelessbridge = True)
-        return # done
+        return os_run_as_script('flashInternalElrsTxModuleWirelessBridge(%r, %r)' % (programmer, firmware))
 
-    flash_internal_elrs_tx_module('esp8266', firmware, 115200, True)
+    return flash_internal_elrs_tx_module('esp8266', firmware, 115200, True)
 
 
 '''
@@ -480,57 +402,61 @@ g_wirelessbridge_path_url = 'https://raw.githubusercontent.com/olliw42/mLRS/refs
 # cache for github downloads
 g_jsonCacheDict = {}
 
+# persistent cache for github downloads, survives app restarts
+g_httpCache = httpcache.HttpCache(os.path.join('temp','cache','http'))
+
+# firmware files keyed by git blob sha, so that repeated flashes need no download
+g_firmwareStore = fwstore.FirmwareStore(os.path.join('temp','cache','blobs'))
+
 def requestJsonDict(url, extension='', error_msg=''):
     if url in g_jsonCacheDict.keys():
         print('* cached', url)
         return copy.deepcopy(g_jsonCacheDict[url])
-    print('* request', url)
-    res = None
+    content = None
     tries = 4
     while tries > 0:
-        try:
-            res = requests.get(url + extension, allow_redirects=True, timeout=(2,4))
-            if b'API rate limit exceeded' in res.content:
-                print(res.content)
-                print('DONWLOAD FAILED!')
-                print(error_msg)
-                return False
-            jsonDict = res.json()
+        content = g_httpCache.get(url + extension)
+        if content == False:
+            print('DONWLOAD FAILED!')
+            print(error_msg)
+            return False
+        if content != None:
             break # got it
-        except:
-            tries = tries - 1
-            if tries < 0:
-                if res: print(res.content)
-                print(error_msg)
-                return None
+        tries = tries - 1
+    if content == None:
+        print(error_msg)
+        return None
+    try:
+        jsonDict = json.loads(content)
+    except:
+        print(content)
+        print(error_msg)
+        return None
 
     g_jsonCacheDict[url] = copy.deepcopy(jsonDict)
     return jsonDict
 
 
-def requestData(url, error_msg=''):
-    print('* request', url)
-    jsonDict = None
+def requestData(url, error_msg='', store=True):
+    content = None
     tries = 4
     while tries > 0:
-        try:
-            res = requests.get(url, allow_redirects=True, timeout=(2,4))
-            if b'API rate limit exceeded' in res.content:
-                print(res.content)
-                print('DONWLOAD FAILED!')
-                print(error_msg)
-                return False
-            try:
-                jsonDict = res.json()
-            except:
-                data = res.content
+        content = g_httpCache.get(url, store=store)
+        if content == False:
+            print('DONWLOAD FAILED!')
+            print(error_msg)
+            return False
+        if content != None:
             break # got it
-        except:
-            tries = tries - 1
-            if tries < 0:
-                print(res.content)
-                print(error_msg)
-                return None
+        tries = tries - 1
+    if content == None:
+        print(error_msg)
+        return None
+    jsonDict = None
+    try:
+        jsonDict = json.loads(content)
+    except:
+        data = content
     if jsonDict:
         if jsonDict['encoding'] == 'base64':
             data = base64.b64decode(jsonDict['content'])
@@ -552,8 +478,7 @@ def downloadVersionsDict():
 
     # manipulate resDict: add fields versionStr and gitUrl
     for key in list(resDict.keys()):
-        v = key.split('.')
-        patch = int(v[2])
+        patch = fwname.parse_version(key)[2]
         if patch == 0: # .00
             resDict[key]['versionStr'] = key + ' (release)'
         elif patch & 1 == 0: # even
@@ -595,17 +520,15 @@ def downloadVersionsDict():
     # firmware_filename looks like pre-release-stm32/rx-E77-MBLKit-wle5cc-400-tcxo-v1.3.01-@ae667b78.hex
     # find one file with a -@ in the name, and asumme it is representative for all dev versions
     # this means in all firmware/ subfolders only equal -@ must appear
-    # regex to get version and commit
     for key in resMainFirmwareList:
         if '-@' in key['path']: # this is one
             #print('we got one')
-            #print(key)
             #print(key['path'])
-            f = re.search(r'-(v\d\.\d+?\.\d+?-@[A-Za-z0-9]+?)\.', key['path']) # TODO: doesn't correctly parse branch dev versions
-            #print(f, f.group(1))
-            if f:
-                resDict[f.group(1)] = {
-                    'versionStr' : f.group(1) + ' (dev)',
+            name = fwname.parse(key['path']) # TODO: doesn't correctly parse branch dev versions
+            if name.commit:
+                version = name.version_str + '-@' + name.commit
+                resDict[version] = {
+                    'versionStr' : version + ' (dev)',
                     'gitUrl' : url_main_firmware # ??? ok ???
                 }
             break
@@ -614,63 +537,52 @@ def downloadVersionsDict():
     return resDict
 
 
+# the tree of a version is sorted once into a catalog, which then answers all queries for the menus
+# catalogs are keyed by tree url
+g_firmwareCatalogDict = {}
+
+g_deviceFnameList = [
+    d['fname'] for d in list(mlrs_md.g_txModuleExternalDeviceTypeDict.values()) +
+                        list(mlrs_md.g_receiverDeviceTypeDict.values()) +
+                        list(mlrs_md.g_txModuleInternalDeviceTypeDict.values())
+    ]
+
+def getFirmwareCatalog(url):
+    if url in g_firmwareCatalogDict.keys():
+        return g_firmwareCatalogDict[url]
+    res = requestJsonDict(url, '?recursive=true', 'ERROR: getFirmwareCatalog() [1]')
+    if not res:
+        return None
+    catalog = fwcatalog.FirmwareCatalog(res['tree'], g_deviceFnameList)
+    g_firmwareCatalogDict[url] = catalog
+    return catalog
+
+
+# API for app
+# Fetch the trees of all versions concurrently, so that later requests are served from the cache.
+# callback(url, res) is called from the worker threads as results arrive, res is False/None on failure.
+def prefetchFilesTrees(urls, callback=None, max_workers=4):
+    def _prefetch(url):
+        catalog = getFirmwareCatalog(url) # also builds the catalog, so the menus don't need to
+        if callback:
+            callback(url, catalog != None)
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+    for url in urls:
+        executor.submit(_prefetch, url)
+    executor.shutdown(wait=False) # worker threads finish in the background
+    return executor
+
+
 # API for app
 # Get files list from github repo, for a specifc tree, and filter according to what we want.
 # pass in a GitHub tree URL like https://api.github.com/repos/olliw42/mLRS/git/trees/f12d680?recursive=true
 # this is needed to get the list of files from the location which is specific to the version
 def downloadFilesListFromTree(txrxlua, url, device='', version=''):
-    res = requestJsonDict(url, '?recursive=true', 'ERROR: downloadFilesListFromTree() [1]')
-    if not res:
+    catalog = getFirmwareCatalog(url)
+    if not catalog:
         return None
-    resList = res['tree'] # it's a list of dictionaries
-    if txrxlua == 'lua': # 'lua'
-        for key in resList[:]: # creates a copy of the list, so we can easily remove
-            if 'lua/' not in key['path']:
-                resList.remove(key)
-            elif key['type'] != 'blob': # seems to not be needed, as all 'lua/' seem to be blob
-                resList.remove(key)
-            elif '.lua' not in key['path']: # only accept files with '.lua' extension
-                resList.remove(key)
-    elif txrxlua == 'txint': # 'tx int'
-        if device == '' or version == '': print('ERROR: downloadFilesListFromTree() [2]')
-        #print(url, device, version)
-        #print(resList)
-        for key in resList[:]: # creates a copy of the list, so we can easily remove
-            #if 'firmware/' not in key['path']:
-            #    resList.remove(key)
-            if key['type'] != 'blob':
-                resList.remove(key)
-            elif '-stm32' in key['path']: # remove all files with '-stm32'
-                resList.remove(key)
-            elif '-esp' not in key['path']: # only accept files with '-esp', should be redundant
-                resList.remove(key)
-            elif '-internal-' not in key['path']:
-                resList.remove(key)
-            elif version not in key['path']: # ensure we only have the desired firmware version
-                resList.remove(key)
-            elif device not in key['path']: # only accept tx-device-internal
-                resList.remove(key)
-    else: # 'tx' or 'rx'
-        if device == '' or version == '': print('ERROR: downloadFilesListFromTree() [3]')
-        #print(url, device, version)
-        #print(resList)
-        for key in resList[:]: # creates a copy of the list, so we can easily remove
-            #if 'firmware/' not in key['path']:
-            #    resList.remove(key)
-            if key['type'] != 'blob': # seems to not be needed, as all 'firmware/' seem to be blob
-                resList.remove(key)
-            #elif '-esp' in key['path']: # remove all files with '-esp'
-            #    resList.remove(key)
-            #elif '-stm32' not in key['path']: # only accept files with '-stm32', should be redundant
-            #    resList.remove(key)
-            elif '-internal-' in key['path']:
-                resList.remove(key)
-            elif '-stm32' not in key['path'] and '-esp' not in key['path']: # only accept files with '-stm32' or '-esp'
-                resList.remove(key)
-            elif version not in key['path']: # ensure we only have the desired firmware version
-                resList.remove(key)
-            elif device not in key['path']: # only accept tx-device-xxx or rx-device-xxx
-                resList.remove(key)
+    if txrxlua != 'lua' and (device == '' or version == ''): print('ERROR: downloadFilesListFromTree() [2]')
+    resList = catalog.files(txrxlua, device, version)
 
     ''' import pprint
     F = open('filesfromtree-'+txorrxortxintorlua+'.txt', 'w')
@@ -686,48 +598,175 @@ def downloadFileAndWriteToDisk(url, filename):
     #url = 'https://api.github.com/repos/olliw42/mLRS/git/blobs/9cfb92d2de3f0582b6b33279abecd941885681d4'
     #filename = 'rx-matek-mr24-30-g431kb-can-v1.3.04.hex'
     data = requestData(url, 'ERROR: downloadFileAndWriteToDisk()')
+    if not data:
+        return False
+    F = open(filename, 'wb')
+    F.write(data)
+    F.close()
+    return True
+
+
+# sha is the git blob sha from the tree entry, if given the file is served from the firmware store if possible
+def downloadFirmwareAndWriteToDisk(url, sha, filename):
+    if not sha:
+        return downloadFileAndWriteToDisk(url, filename)
+    data = g_firmwareStore.get(sha)
+    if data:
+        print('* stored', sha)
+    else:
+        report_progress(text='downloading '+os.path.basename(filename)+'...')
+        tstart = time.time()
+        # no need to keep it also in the http cache
+        data = requestData(url, 'ERROR: downloadFirmwareAndWriteToDisk() [1]', store=False)
+        if not data:
+            return False
+        dt = max(time.time() - tstart, 0.001)
+        report_progress(text='downloaded %.1f kB in %.1f s (%.1f kB/s)' % (len(data)/1024, dt, len(data)/1024/dt))
+        if not g_firmwareStore.put(sha, data):
+            print('ERROR: downloadFirmwareAndWriteToDisk() [2]')
+            return False
     F = open(filename, 'wb')
     F.write(data)
     F.close()
     return True
 
 
+# the target metadata is compiled once into a trie, which resolves a firmware filename by its longest target
+g_targetMetadataResolver = targetmd.TargetMetadataResolver(mlrs_md.g_targetDict)
+
+# helper
+# returns the metadata of the target, found by device fname and firmware filename
+def get_target_metadata(device_type_f, firmware_filename):
+    return g_targetMetadataResolver.resolve(device_type_f, firmware_filename)
+
+
+g_deviceTypeDicts = {
+    'tx' : mlrs_md.g_txModuleExternalDeviceTypeDict,
+    'rx' : mlrs_md.g_receiverDeviceTypeDict,
+    'txint' : mlrs_md.g_txModuleInternalDeviceTypeDict,
+    }
+
+# API for app
+# returns chipset, flashmethod, description, wireless for a device type and firmware filename
+def get_device_metadata(txrx, device_type, firmware_filename):
+    device_type_f = g_deviceTypeDicts[txrx][device_type]['fname']
+    chipset = g_deviceTypeDicts[txrx][device_type]['chipset']
+    #print(txrx, device_type_f, chipset)
+    chipset2, flashmethod, description, wireless = get_target_metadata(device_type_f, firmware_filename)
+    if chipset2:
+        chipset = chipset2
+    if 'xx' in chipset.lower():
+        print("ERROR: Something wrong in get_device_metadata()")
+    return chipset, flashmethod, description, wireless
+
+
+# API for app
+# returns the programmer string and baudrate to be passed to flashDevice()
+# a comport is needed only if baudrate is not None
+# returns None, None if chipset and flashmethod can't be handled
+def get_programmer(txrx, chipset, flashmethod, serialx=None):
+    if not flashmethod: flashmethod = 'default' # can be None
+    if txrx == 'txint':
+        if chipset != 'esp32': # currently must be esp32
+            return None, None
+        return 'esp32 internal', None
+    if 'stm32' in chipset:
+        if txrx == 'tx':
+            if 'dfu' in flashmethod:
+                return chipset + ' dfu', None
+            return chipset + ' stlink', None
+        if 'dfu' in flashmethod:
+            return 'stm32 dfu', None
+        elif 'appassthru' in flashmethod:
+            return 'stm32 appassthru ' + str(serialx).lower(), None
+        elif 'uart' in flashmethod:
+            return 'stm32 uart', 115200
+        return 'stm32 stlink', None # STLink is default
+    if txrx == 'tx':
+        if 'esp32' in chipset:
+            return chipset, 921600
+        return None, None
+    if 'esp' in chipset:
+        # VSCODE/Platformio does 'no dtr', so we do too, seems not be critical
+        # VSCODE/Platformio uses for esp32 --flash_freq 80m, we do --flash_freq 40m
+        if 'appassthru' in flashmethod:
+            return chipset + ' no dtr appassthru ' + str(serialx).lower(), None
+        return chipset + ' no dtr', 921600 # 'esptool'
+    return None, None
+
+
+# helper
+# the file type must fit the programmer, esp firmwares are .bin, stm32 firmwares .hex or .bin
+def firmware_fits_programmer(programmer, filename):
+    name = fwname.parse(filename)
+    if 'stm32' in programmer:
+        return name.extension in ['hex', 'bin']
+    if 'esp' in programmer:
+        return name.extension == 'bin'
+    return True
+
+
 # API for app
-def flashDevice(programmer, url, filename, comport=None, baudrate=None):
+# returns True on success, False on failure, None if the result is not known (flashing was run as script)
+def flashDevice(programmer, url, filename, comport=None, baudrate=None, sha=None):
     #print('flashDevice()',programmer)
     #print(url)
     #print(filename)
+    if not firmware_fits_programmer(programmer, filename):
+        print('ERROR: flashDevice() [3] wrong file type for', programmer)
+        return False
     create_dir('temp')
-    res = downloadFileAndWriteToDisk(url, os.path.join('temp',filename))
+    res = downloadFirmwareAndWriteToDisk(url, sha, os.path.join('temp',filename))
     if not res:
         print('ERROR: flashDevice() [1]')
-        return
+        return False
     #print(os.path.dirname(os.path.abspath(__file__)))
     filepath = os.path.join(os.path.dirname(os.path.abspath(__file__)),'temp',filename)
     #print(filepath)
+    report_progress(text='flashing '+filename+'...')
     if 'wirelessbridge' in programmer:
         # handle WirelessBridge
         if 'internal' in programmer:
             if ('esp8266' in programmer or 'esp8285' in programmer):
-                flashInternalElrsTxModuleWirelessBridge(programmer, filepath)
-                return
+                return flashInternalElrsTxModuleWirelessBridge(programmer, filepath)
         else:
             if ('esp8266' in programmer or 'esp8285' in programmer):
-                flashEspToolProgrammer(programmer, filepath, comport, baudrate)
-                return
+                return flashEspToolProgrammer(programmer, filepath, comport, baudrate)
     elif 'stm32' in programmer:
         # STM32
-        flashSTM32CubeProgrammer(programmer, filepath, comport, baudrate)
-        return
+        return flashSTM32CubeProgrammer(programmer, filepath, comport, baudrate)
     elif 'esp' in programmer: # 'esp32'
         # ESP
         if 'internal' in programmer:
-            flashInternalElrsTxModule(programmer, filepath)
-            return
+            return flashInternalElrsTxModule(programmer, filepath)
         else:
-            flashEspToolProgrammer(programmer, filepath, comport, baudrate)
-            return
+            return flashEspToolProgrammer(programmer, filepath, comport, baudrate)
     print('ERROR: flashDevice() [2]')
+    return False
+
+
+# API for app
+# flashes the same firmware to several devices at once, currently only for esp devices using esptool
+# returns a dict comport -> True/False, or None if it could not be started
+def flashDeviceMultiPort(programmer, url, filename, comports, baudrate, sha=None):
+    if ('esp' not in programmer and programmer != 'stm32 uart') or 'wirelessbridge' in programmer:
+        print('ERROR: flashDeviceMultiPort() [1]')
+        return None
+    if not firmware_fits_programmer(programmer, filename):
+        print('ERROR: flashDeviceMultiPort() [3] wrong file type for', programmer)
+        return None
+    create_dir('temp')
+    res = downloadFirmwareAndWriteToDisk(url, sha, os.path.join('temp',filename))
+    if not res:
+        print('ERROR: flashDeviceMultiPort() [2]')
+        return None
+    filepath = os.path.join(os.path.dirname(os.path.abspath(__file__)),'temp',filename)
+    report_progress(text='flashing '+filename+' on '+str(len(comports))+' ports...')
+    if 'stm32' in programmer:
+        ok, resDict = flashSTM32UartMultiPort(filepath, comports, baudrate)
+    else:
+        ok, resDict = flashEspToolProgrammerMultiPort(programmer, filepath, comports, baudrate)
+    return resDict
 
 
 '''
@@ -737,9 +776,50 @@ Miscellaneous utils
 '''
 
 def version_str_to_int(v_str):
-    if v_str[0] != 'v':
+    version = fwname.parse_version(v_str)
+    if not version:
         return 0
-    return int(v_str[1]+'0'+v_str[3]+v_str[5:7])
+    return version[0] * 10000 + version[1] * 100 + version[2]
+
+
+'''
+--------------------------------------------------
+Background Worker
+--------------------------------------------------
+'''
+
+# Runs tasks one after the other in a worker thread, so that the Tk event loop is not blocked.
+# Results are put as ('done', on_done, res) into the events queue, which the app polls from the
+# Tk event loop, so on_done(res) can safely access widgets.
+class BackgroundWorker:
+    def __init__(self, events):
+        self.events = events
+        self.tasks = queue.Queue()
+        self.pending = 0 # tasks queued or running
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, func, args=(), on_done=None):
+        with self.lock:
+            self.pending += 1
+        self.tasks.put((func, args, on_done))
+
+    def busy(self):
+        return self.pending > 0
+
+    def _run(self):
+        while True:
+            func, args, on_done = self.tasks.get()
+            try:
+                res = func(*args)
+            except (Exception, SystemExit) as e: # do_error() of the passthrough tools calls sys.exit()
+                print('ERROR: BackgroundWorker', repr(e))
+                res = False
+            with self.lock:
+                self.pending -= 1
+            if on_done:
+                self.events.put(('done', on_done, res))
 
 
 '''
@@ -829,9 +909,16 @@ class App(ctk.CTk):
         self.fTxModuleInternal_DeviceType_menu.set(keys[0])
 
     # needs to be called only once at startup
-    # calls downloadVersionsDict(), and updates the Firmware Version' widgets accordingly
-    def updateFirmwareVersions(self):
-        self.firmwareVersionDict = downloadVersionsDict()
+    # calls downloadVersionsDict() in the background, and updates the Firmware Version' widgets accordingly
+    def updateFirmwareVersions(self, on_done=None):
+        def done(res):
+            ok = self._set_firmware_versions(res)
+            if on_done: on_done(ok)
+        self.netWorker.submit(downloadVersionsDict, (), done)
+
+    # helper
+    def _set_firmware_versions(self, firmwareVersionDict):
+        self.firmwareVersionDict = firmwareVersionDict
         if self.firmwareVersionDict:
             keys = []
             for key in list(self.firmwareVersionDict.keys()): # we assume here it cannot be empty
@@ -862,110 +949,143 @@ class App(ctk.CTk):
         return 'failed' not in keys[0]
 
     # helper
+    # runs in the background worker, so must not touch any widgets
+    # returns the keys for the 'Firmware Files' widget, and the list of firmware files
     def _download_firmware_files(self, txrx, device_type, firmware_version):
         if txrx == 'tx':
             if self.txDeviceTypeDict == None or self.firmwareVersionDict == None:
-                return ['download failed...']
+                return ['download failed...'], None
             device_type_f = self.txDeviceTypeDict[device_type]['fname'] # that's the name of the device in the filename
         elif txrx == 'rx':
             if self.rxDeviceTypeDict == None or self.firmwareVersionDict == None:
-                return ['download failed...']
+                return ['download failed...'], None
             device_type_f = self.rxDeviceTypeDict[device_type]['fname'] # that's the name of the device in the filename
         elif txrx == 'txint':
             if self.txIntDeviceTypeDict == None or self.firmwareVersionDict == None:
-                return ['download failed...']
+                return ['download failed...'], None
             device_type_f = self.txIntDeviceTypeDict[device_type]['fname'] # that's the name of the device in the filename
+        else:
+            print('ERROR: _download_firmware_files() [2]')
+            return ['download failed...'], None
         firmware_version_gitUrl = self.firmwareVersionDict[firmware_version]['gitUrl']
         #print(device_type, device_type_f)
         #print(firmware_version, firmware_version_gitUrl)
-        res = downloadFilesListFromTree(txrx, firmware_version_gitUrl, device_type_f, firmware_version)
-        if res == None:
+        firmwareFilesList = downloadFilesListFromTree(txrx, firmware_version_gitUrl, device_type_f, firmware_version)
+        if firmwareFilesList == None:
             print('ERROR: _download_firmware_files() [1]')
-            return ['download failed...']
-        if txrx == 'tx':
-            self.txFirmwareFilesList = res # must be self as list is needed later also
-            firmwareFilesList = self.txFirmwareFilesList
-        elif txrx == 'rx':
-            self.rxFirmwareFilesList = res # must be self as list is needed later also
-            firmwareFilesList = self.rxFirmwareFilesList
-        elif txrx == 'txint':
-            self.txIntFirmwareFilesList = res # must be self as list is needed later also
-            firmwareFilesList = self.txIntFirmwareFilesList
-        else:
-            print('ERROR: _download_firmware_files() [2]')
-            return ['download failed...']
+            return ['download failed...'], None
         #print(firmwareFilesList)
-        if firmwareFilesList == None:
-            return ['download failed...']
         keys = []
         for key in firmwareFilesList:
-            fpath, fname = os.path.split(key['path'])
-            keys.append(fname)
+            keys.append(fwname.parse(key['path']).filename)
         if not keys:
             keys.append('not available') # can happen
         #print(keys)
-        return keys
+        return keys, firmwareFilesList
+
+    # helper
+    # calls _download_firmware_files() in the background, and calls set_func(keys, firmwareFilesList) with the result
+    def _update_firmware_files(self, txrx, device_type_menu, firmware_version_menu, firmware_file_menu, set_func, on_done):
+        device_type = device_type_menu.get()
+        firmware_version = firmware_version_menu.get().split()[0] # remove the added ' (...)' from the version
+        def done(res):
+            if not res: # worker failed
+                res = (['download failed...'], None)
+            keys, firmwareFilesList = res
+            firmware_file_menu.configure(values=keys)
+            firmware_file_menu.set(keys[0])
+            set_func(keys, firmwareFilesList)
+            if on_done: on_done('failed' not in keys[0])
+        firmware_file_menu.set('downloading...')
+        self.netWorker.submit(self._download_firmware_files, (txrx, device_type, firmware_version), done)
 
     # needs to be called whenever device type or firmware version changes
     # calls _download_firmware_files() to get the 'tx' file names in the tree, and updates TxModuleExternal 'Firmware Files' widget
-    def updateTxModuleExternalFirmwareFiles(self):
-        device_type = self.fTxModuleExternal_DeviceType_menu.get()
-        firmware_version = self.fTxModuleExternal_FirmwareVersion_menu.get().split()[0] # remove the added ' (...)' from the version
-        keys = self._download_firmware_files('tx', device_type, firmware_version)
-        self.fTxModuleExternal_FirmwareFile_menu.configure(values=keys)
-        self.fTxModuleExternal_FirmwareFile_menu.set(keys[0])
-        return 'failed' not in keys[0]
+    def updateTxModuleExternalFirmwareFiles(self, on_done=None):
+        def set_func(keys, firmwareFilesList):
+            self.txFirmwareFilesList = firmwareFilesList # must be self as list is needed later also
+            self.fTxModuleExternal_UpdateWidgets()
+        self._update_firmware_files('tx',
+            self.fTxModuleExternal_DeviceType_menu,
+            self.fTxModuleExternal_FirmwareVersion_menu,
+            self.fTxModuleExternal_FirmwareFile_menu,
+            set_func, on_done)
 
     # needs to be called whenever device type or firmware version changes
     # calls _download_firmware_files() to get the 'rx' file names in the tree, and updates Receiver 'Firmware Files' widget
-    def updateReceiverFirmwareFiles(self):
-        device_type = self.fReceiver_DeviceType_menu.get()
-        firmware_version = self.fReceiver_FirmwareVersion_menu.get().split()[0] # remove the added ' (...)' from the version
-        keys = self._download_firmware_files('rx', device_type, firmware_version)
-        self.fReceiver_FirmwareFile_menu.configure(values=keys)
-        self.fReceiver_FirmwareFile_menu.set(keys[0])
-        return 'failed' not in keys[0]
+    def updateReceiverFirmwareFiles(self, on_done=None):
+        def set_func(keys, firmwareFilesList):
+            self.rxFirmwareFilesList = firmwareFilesList # must be self as list is needed later also
+            self.fReceiver_UpdateWidgets()
+        self._update_firmware_files('rx',
+            self.fReceiver_DeviceType_menu,
+            self.fReceiver_FirmwareVersion_menu,
+            self.fReceiver_FirmwareFile_menu,
+            set_func, on_done)
 
     # needs to be called whenever device type or firmware version changes
     # calls _download_firmware_files() to get the 'txint' file names in the tree, and updates TxModuleInternal 'Firmware Files' widget
-    def updateTxModuleInternalFirmwareFiles(self):
-        device_type = self.fTxModuleInternal_DeviceType_menu.get()
-        firmware_version = self.fTxModuleInternal_FirmwareVersion_menu.get().split()[0] # remove the added ' (...)' from the version
-        keys = self._download_firmware_files('txint', device_type, firmware_version)
-        self.fTxModuleInternal_FirmwareFile_menu.configure(values=keys)
-        self.fTxModuleInternal_FirmwareFile_menu.set(keys[0])
-        return 'failed' not in keys[0]
+    def updateTxModuleInternalFirmwareFiles(self, on_done=None):
+        def set_func(keys, firmwareFilesList):
+            self.txIntFirmwareFilesList = firmwareFilesList # must be self as list is needed later also
+            self.fTxModuleInternal_UpdateWidgets()
+        self._update_firmware_files('txint',
+            self.fTxModuleInternal_DeviceType_menu,
+            self.fTxModuleInternal_FirmwareVersion_menu,
+            self.fTxModuleInternal_FirmwareFile_menu,
+            set_func, on_done)
 
     # helper
+    # runs in the background worker, so must not touch any widgets
     def _download_luascript_files(self, firmware_version):
         if self.firmwareVersionDict == None:
-            return ['download failed...']
+            return ['download failed...'], None
         firmware_version_gitUrl = self.firmwareVersionDict[firmware_version]['gitUrl']
         #print(firmware_version, firmware_version_gitUrl)
-        self.luaScriptFilesList = downloadFilesListFromTree('lua', firmware_version_gitUrl) # must be self as list is needed later also
-        #print(self.luaScriptFilesList)
-        if self.luaScriptFilesList == None:
-            return ['download failed...']
+        luaScriptFilesList = downloadFilesListFromTree('lua', firmware_version_gitUrl)
+        #print(luaScriptFilesList)
+        if luaScriptFilesList == None:
+            return ['download failed...'], None
         keys = []
-        for key in self.luaScriptFilesList:
+        for key in luaScriptFilesList:
             if 'mLRS.lua' in key['path']: keys.append('color screen (mLRS.lua)')
-        for key in self.luaScriptFilesList:
+        for key in luaScriptFilesList:
             if 'mLRS-bw.lua' in key['path']: keys.append('bw screen (mLRS-bw.lua)')
-        for key in self.luaScriptFilesList:
+        for key in luaScriptFilesList:
             if 'mLRS-bw-luac.lua' in key['path']: keys.append('bw screen compiled (mLRS-bw-luac.lua)')
         if not keys:
             keys.append('not available') # can happen
         #print(keys)
-        return keys
+        return keys, luaScriptFilesList
 
     # needs to be called whenever device type or firmware version changes
     # calls _download_luascript_files() to get the '.lua' file names in the tree, and updates LuaScript 'Radio Screen Type' widget
-    def updateLuaScriptFiles(self):
+    def updateLuaScriptFiles(self, on_done=None):
         firmware_version = self.fLuaScript_FirmwareVersion_menu.get().split()[0] # remove the added ' (...)' from the version
-        keys = self._download_luascript_files(firmware_version)
-        self.fLuaScript_RadioScreen_menu.configure(values=keys)
-        self.fLuaScript_RadioScreen_menu.set(keys[0])
-        return 'failed' not in keys
+        def done(res):
+            if not res: # worker failed
+                res = (['download failed...'], None)
+            keys, self.luaScriptFilesList = res # must be self as list is needed later also
+            self.fLuaScript_RadioScreen_menu.configure(values=keys)
+            self.fLuaScript_RadioScreen_menu.set(keys[0])
+            if on_done: on_done('failed' not in keys[0])
+        self.fLuaScript_RadioScreen_menu.set('downloading...')
+        self.netWorker.submit(self._download_luascript_files, (firmware_version,), done)
+
+    # runs flashDevice() in the background, so that the app stays responsive while flashing
+    def startFlashDevice(self, programmer, url, filename, comport=None, baudrate=None, sha=None):
+        if self.flashWorker.busy():
+            print('Flashing in progress, please wait until it has finished.')
+            return
+        self.flashStartTime = time.time()
+        self.fStatus_label.configure(text='preparing to flash...')
+        self.flashWorker.submit(flashDevice, (programmer, url, filename, comport, baudrate, sha), self.flashDevice_done)
+
+    def flashDevice_done(self, res):
+        if res == False:
+            self.fStatus_label.configure(text='flashing FAILED after %.0f secs' % (time.time() - self.flashStartTime))
+            return
+        self.fStatus_label.configure(text='flashing finished after %.0f secs' % (time.time() - self.flashStartTime))
 
 
     # calls flashDevice() for the selected device, firmware url, and filename, to initiate flashing
@@ -979,22 +1099,17 @@ class App(ctk.CTk):
         #print(device_type, self.txDeviceTypeDict[device_type])
         #print(firmware_filename)
         chipset, flashmethod, description, wireless = self.get_metadata('tx', device_type, firmware_filename)
-        if not flashmethod: flashmethod = 'default' # can be None
         #print(self.txFirmwareFilesList)
         #print(chipset)
+        programmer, baudrate = get_programmer('tx', chipset, flashmethod)
         for key in self.txFirmwareFilesList:
-            if firmware_filename in key['path']: # that's our firmware entry
-                if 'stm32' in chipset:
-                    if 'dfu' in flashmethod:
-                        flashDevice(chipset + ' dfu', key['url'], firmware_filename)
-                    else:
-                        flashDevice(chipset + ' stlink', key['url'], firmware_filename)
-                    return
-                elif 'esp32' in chipset:
+            if programmer and firmware_filename in key['path']: # that's our firmware entry
+                comport = None
+                if baudrate:
                     comport = self.fTxModuleExternal_ComPort_menu.get()
                     print('--->',comport)
-                    flashDevice(chipset, key['url'], firmware_filename, comport=comport, baudrate=921600)
-                    return
+                self.startFlashDevice(programmer, key['url'], firmware_filename, comport=comport, baudrate=baudrate, sha=key['sha'])
+                return
         print('ERROR: flashTxModuleExternalFirmware() [2]')
 
     def flashTxModuleExternalWirelessBridgeFirmware(self):
@@ -1024,7 +1139,7 @@ class App(ctk.CTk):
         #url = 'https://raw.githubusercontent.com/olliw42/mLRS/refs/heads/main/firmware/wirelessbridge-esp8266/mlrs-wireless-bridge-esp8266.ino.bin'
         firmware_filename = 'mlrs-wireless-bridge-esp8266.ino.bin'
         url = g_wirelessbridge_path_url + firmware_filename
-        flashDevice(programmer, url, firmware_filename, comport, baudrate)
+        self.startFlashDevice(programmer, url, firmware_filename, comport, baudrate)
 
     # calls flashDevice() for the selected device, firmware url, and filename, to initiate flashing
     def flashReceiverFirmware(self):
@@ -1042,32 +1157,15 @@ class App(ctk.CTk):
         #print('--->',flashmethod)
         #print(chipset)
         #print(self.rxFirmwareFilesList)
+        programmer, baudrate = get_programmer('rx', chipset, flashmethod, self.fReceiver_Serialx_menu.get())
         for key in self.rxFirmwareFilesList:
-            if firmware_filename in key['path']: # that's our firmware entry
-                if 'stm32' in chipset:
-                    if 'dfu' in flashmethod:
-                        flashDevice('stm32 dfu', key['url'], firmware_filename)
-                    elif 'appassthru' in flashmethod:
-                        serialx = self.fReceiver_Serialx_menu.get().lower()
-                        flashDevice('stm32 appassthru '+serialx, key['url'], firmware_filename)
-                    elif 'uart' in flashmethod:
-                        comport = self.fReceiver_ComPort_menu.get()
-                        print('--->',comport)
-                        flashDevice('stm32 uart', key['url'], firmware_filename, comport=comport, baudrate=115200)
-                    else:
-                        flashDevice('stm32 stlink', key['url'], firmware_filename) # STLink is default
-                    return
-                elif 'esp' in chipset:
-                    # VSCODE/Platformio does 'no dtr', so we do too, seems not be critical
-                    # VSCODE/Platformio uses for esp32 --flash_freq 80m, we do --flash_freq 40m
-                    if 'appassthru' in flashmethod:
-                        serialx = self.fReceiver_Serialx_menu.get().lower()
-                        flashDevice(chipset + ' no dtr appassthru ' + serialx, key['url'], firmware_filename)
-                    else: # 'esptool'
-                        comport = self.fReceiver_ComPort_menu.get()
-                        print('--->',comport)
-                        flashDevice(chipset + ' no dtr', key['url'], firmware_filename, comport=comport, baudrate=921600)
-                    return
+            if programmer and firmware_filename in key['path']: # that's our firmware entry
+                comport = None
+                if baudrate:
+                    comport = self.fReceiver_ComPort_menu.get()
+                    print('--->',comport)
+                self.startFlashDevice(programmer, key['url'], firmware_filename, comport=comport, baudrate=baudrate, sha=key['sha'])
+                return
         print('ERROR: flashReceiverFirmware() [2]')
 
     def flashTxModuleInternalFirmware(self):
@@ -1077,12 +1175,13 @@ class App(ctk.CTk):
             print('ERROR: flashTxModuleInternalFirmware() [1]')
             return
         chipset, flashmethod, description, wireless = self.get_metadata('txint', device_type, firmware_filename)
-        if chipset != 'esp32': # currently must be esp32
+        programmer, _ = get_programmer('txint', chipset, flashmethod)
+        if not programmer: # currently must be esp32
             print('ERROR: flashTxModuleInternalFirmware() [3]')
             sys.exit(1)
         for key in self.txIntFirmwareFilesList:
             if firmware_filename in key['path']: # that's our firmware entry
-                flashDevice('esp32 internal', key['url'], firmware_filename)
+                self.startFlashDevice(programmer, key['url'], firmware_filename, sha=key['sha'])
                 return
         print('ERROR: flashTxModuleInternalFirmware() [2]')
 
@@ -1090,7 +1189,7 @@ class App(ctk.CTk):
         #url = 'https://raw.githubusercontent.com/olliw42/mLRS/refs/heads/main/firmware/wirelessbridge-esp8266/mlrs-wireless-bridge-esp8266.ino.bin'
         firmware_filename = 'mlrs-wireless-bridge-esp8266.ino.bin'
         url = g_wirelessbridge_path_url + firmware_filename
-        flashDevice('wirelessbridge internal esp8285', url, firmware_filename)
+        self.startFlashDevice('wirelessbridge internal esp8285', url, firmware_filename)
 
 
     # calls downloadFileAndWriteToDisk() for the selected filename, and saves it
@@ -1109,7 +1208,7 @@ class App(ctk.CTk):
         for key in self.luaScriptFilesList        :
             fpath, fname = os.path.split(key['path'])
             if fname.lower() in filename.lower():
-                downloadFileAndWriteToDisk(key['url'], filename)
+                self.netWorker.submit(downloadFileAndWriteToDisk, (key['url'], filename))
                 return
         print('ERROR: saveLuaScript() [2]')
 
@@ -1138,6 +1237,17 @@ class App(ctk.CTk):
         self.initTxModuleInternalFrame()
         self.initLuaScriptFrame()
 
+        #-- status bar
+        self.fStatus_label = ctk.CTkLabel(self, text='', anchor='w')
+        self.fStatus_label.grid(row=1, column=0, columnspan=2, padx=20, sticky='ew')
+
+        #-- background workers, network and flashing are done there so the app stays responsive
+        self.workerEvents = queue.Queue()
+        self.netWorker = BackgroundWorker(self.workerEvents)
+        self.flashWorker = BackgroundWorker(self.workerEvents)
+        set_progress_callback(lambda progress: self.workerEvents.put(('progress', progress)))
+        self.worker_poll()
+
         #-- finalize
         # select default frame
         self.fNavigation_select_frame_by_name('tx_module_ext')
@@ -1151,13 +1261,71 @@ class App(ctk.CTk):
         self.updateDeviceTypes()
 
     def after_startup(self):
+        serialports.start_watcher() # keeps the port list up to date, so port menus open without enumerating
         print('downloading metadata from github repository...')
-        res1 = self.updateFirmwareVersions()
-        res2 = self.fTxModuleExternal_Startup()
-        res3 = self.fReceiver_Startup()
-        res4 = self.fTxModuleInternal_Startup()
-        res5 = self.fLuaScript_Startup()
-        if (res1 and res2 and res3 and res4 and res5): print('... ok')
+        self.updateFirmwareVersions(on_done=self.after_startup_versions_done)
+
+    def after_startup_versions_done(self, res):
+        self.startup_res = res
+        # the frames are filled in as the trees of their selected versions arrive
+        self.startupPendingFrames = {
+            'tx' : (self.fTxModuleExternal_FirmwareVersion_menu, self.fTxModuleExternal_Startup),
+            'rx' : (self.fReceiver_FirmwareVersion_menu, self.fReceiver_Startup),
+            'txint' : (self.fTxModuleInternal_FirmwareVersion_menu, self.fTxModuleInternal_Startup),
+            'lua' : (self.fLuaScript_FirmwareVersion_menu, self.fLuaScript_Startup),
+        }
+        self.startupFramesCnt = len(self.startupPendingFrames)
+        self.prefetchDoneQueue = queue.Queue()
+        self.prefetchDoneUrls = set()
+        if self.firmwareVersionDict:
+            urls = []
+            for key in self.firmwareVersionDict.keys():
+                if self.firmwareVersionDict[key]['gitUrl'] not in urls:
+                    urls.append(self.firmwareVersionDict[key]['gitUrl'])
+            prefetchFilesTrees(urls, callback=lambda url, res: self.prefetchDoneQueue.put(url))
+        self.after_startup_poll()
+
+    # is called periodically until all frames are filled in, runs in the Tk event loop
+    def after_startup_poll(self):
+        while not self.prefetchDoneQueue.empty():
+            self.prefetchDoneUrls.add(self.prefetchDoneQueue.get())
+        for name in list(self.startupPendingFrames.keys()):
+            version_menu, startup_func = self.startupPendingFrames[name]
+            if self.firmwareVersionDict:
+                firmware_version = version_menu.get().split()[0] # remove the added ' (...)' from the version
+                if firmware_version in self.firmwareVersionDict.keys():
+                    if self.firmwareVersionDict[firmware_version]['gitUrl'] not in self.prefetchDoneUrls:
+                        continue # not yet there
+            startup_func(on_done=self.after_startup_frame_done)
+            del self.startupPendingFrames[name]
+        if self.startupPendingFrames:
+            self.after(20, self.after_startup_poll)
+
+    def after_startup_frame_done(self, res):
+        self.startup_res = self.startup_res and res
+        self.startupFramesCnt -= 1
+        if self.startupFramesCnt == 0 and self.startup_res:
+            print('... ok')
+
+    # is called periodically, handles the events from the background workers in the Tk event loop
+    def worker_poll(self):
+        while not self.workerEvents.empty():
+            event = self.workerEvents.get()
+            if event[0] == 'done':
+                on_done, res = event[1], event[2]
+                on_done(res)
+            elif event[0] == 'progress':
+                self.handle_progress(event[1])
+        self.after(50, self.worker_poll)
+
+    def handle_progress(self, progress):
+        if 'text' in progress:
+            self.fStatus_label.configure(text=progress['text'])
+        elif 'percent' in progress and 'port' not in progress:
+            text = 'flashing... %d %%, %.1f kB/s' % (progress['percent'], progress['rate']/1024)
+            if progress.get('eta'):
+                text += ', %.0f secs left' % progress['eta']
+            self.fStatus_label.configure(text=text)
 
     def ini_open(self):
         self.ini_config = configparser.ConfigParser()
@@ -1172,6 +1340,8 @@ class App(ctk.CTk):
         ctk.set_appearance_mode(self.fNavigation_SetAppearanceMode_menu.get()) # it seems the event loop is not yet running
 
     def closed(self):
+        if os_run_cancel(): # don't leave a programmer running without us
+            print('flashing cancelled')
         print('Thanks for using mLRS.')
         self.ini_config.set('app', 'appearance', self.fNavigation_SetAppearanceMode_menu.get())
         try:
@@ -1186,56 +1356,8 @@ class App(ctk.CTk):
     #-- Miscellaneous
     #--------------------------------------------------
 
-    def _get_metadata(self, device_type_f, firmware_filename):
-        chipset = None
-        flashmethod = None
-        description = None
-        wireless = None
-        if device_type_f in mlrs_md.g_targetDict.keys():
-            device_type_dict = mlrs_md.g_targetDict[device_type_f]
-            if 'chipset' in device_type_dict.keys():
-                chipset = device_type_dict['chipset']
-            if 'flashmethod' in device_type_dict.keys():
-                flashmethod = device_type_dict['flashmethod']
-            if 'description' in device_type_dict.keys():
-                description = device_type_dict['description']
-            if 'wireless' in device_type_dict.keys():
-                wireless = device_type_dict['wireless']
-            #print("XXXX",device_type_dict)
-            #print(firmware_filename)
-            if not 'failed' in firmware_filename:
-                for key in device_type_dict.keys(): # search for target entry
-                    if key in firmware_filename:
-                        target_dict = device_type_dict[key]
-                        #print("found", target_dict)
-                        if 'chipset' in target_dict.keys():
-                            chipset = target_dict['chipset']
-                        if 'flashmethod' in target_dict.keys():
-                            flashmethod = target_dict['flashmethod']
-                        if 'description' in target_dict.keys():
-                            description = target_dict['description']
-                        if 'wireless' in target_dict.keys():
-                            wireless = target_dict['wireless']
-                        break
-        return chipset, flashmethod, description, wireless
-
     def get_metadata(self, txrx, device_type, firmware_filename):
-        if txrx == 'tx':
-            device_type_f = self.txDeviceTypeDict[device_type]['fname']
-            chipset = self.txDeviceTypeDict[device_type]['chipset']
-        elif txrx == 'rx':
-            device_type_f = self.rxDeviceTypeDict[device_type]['fname']
-            chipset = self.rxDeviceTypeDict[device_type]['chipset']
-        elif txrx == 'txint':
-            device_type_f = self.txIntDeviceTypeDict[device_type]['fname']
-            chipset = self.txIntDeviceTypeDict[device_type]['chipset']
-        #print(txrx, device_type_f, chipset)
-        chipset2, flashmethod, description, wireless = self._get_metadata(device_type_f, firmware_filename)
-        if chipset2:
-            chipset = chipset2
-        if 'xx' in chipset.lower():
-            print("ERROR: Something wrong in get_metadata()")
-        return chipset, flashmethod, description, wireless
+        return get_device_metadata(txrx, device_type, firmware_filename)
 
     def get_flashmethod_list_for_menu(self, flashmethod_str):
         flashmethod_list = flashmethod_str.split(',')
@@ -1525,20 +1647,17 @@ class App(ctk.CTk):
         else:
             self.fTxModuleExternal_Description_textbox.grid_remove()
 
-    def fTxModuleExternal_Startup(self):
-        res = self.updateTxModuleExternalFirmwareFiles()
+    # widgets are updated when the firmware files have arrived
+    def fTxModuleExternal_Startup(self, on_done=None):
         self.fTxModuleExternal_ComPort_HandleIt()
-        self.fTxModuleExternal_UpdateWidgets()
-        return res
+        self.updateTxModuleExternalFirmwareFiles(on_done=on_done)
 
     def fTxModuleExternal_DeviceType_menu_event(self, opt):
-        self.updateTxModuleExternalFirmwareFiles()
         self.fTxModuleExternal_ComPort_HandleIt()
-        self.fTxModuleExternal_UpdateWidgets()
+        self.updateTxModuleExternalFirmwareFiles()
 
     def fTxModuleExternal_FirmwareVersion_menu_event(self, opt):
         self.updateTxModuleExternalFirmwareFiles()
-        self.fTxModuleExternal_UpdateWidgets()
 
     def fTxModuleExternal_FirmwareFile_menu_event(self, opt):
         self.fTxModuleExternal_UpdateWidgets()
@@ -1694,20 +1813,17 @@ class App(ctk.CTk):
         #chipset, _, _, _ = self.get_metadata('rx', device_type, firmware_filename)
         self.fReceiver_ComPort_menu.update()
 
-    def fReceiver_Startup(self):
-        res = self.updateReceiverFirmwareFiles()
+    # widgets are updated when the firmware files have arrived
+    def fReceiver_Startup(self, on_done=None):
         self.fReceiver_ComPort_HandleIt()
-        self.fReceiver_UpdateWidgets()
-        return res
+        self.updateReceiverFirmwareFiles(on_done=on_done)
 
     def fReceiver_DeviceType_menu_event(self, opt):
-        self.updateReceiverFirmwareFiles()
         self.fReceiver_ComPort_HandleIt()
-        self.fReceiver_UpdateWidgets()
+        self.updateReceiverFirmwareFiles()
 
     def fReceiver_FirmwareVersion_menu_event(self, opt):
         self.updateReceiverFirmwareFiles()
-        self.fReceiver_UpdateWidgets()
 
     def fReceiver_FirmwareFile_menu_event(self, opt):
         self.fReceiver_UpdateWidgets()
@@ -1820,18 +1936,15 @@ class App(ctk.CTk):
         else:
             self.fTxModuleInternal_Description_textbox.grid_remove()
 
-    def fTxModuleInternal_Startup(self):
-        res = self.updateTxModuleInternalFirmwareFiles()
-        self.fTxModuleInternal_UpdateWidgets()
-        return res
+    # widgets are updated when the firmware files have arrived
+    def fTxModuleInternal_Startup(self, on_done=None):
+        self.updateTxModuleInternalFirmwareFiles(on_done=on_done)
 
     def fTxModuleInternal_DeviceType_menu_event(self, opt):
         self.updateTxModuleInternalFirmwareFiles()
-        self.fTxModuleInternal_UpdateWidgets()
 
     def fTxModuleInternal_FirmwareVersion_menu_event(self, opt):
         self.updateTxModuleInternalFirmwareFiles()
-        self.fTxModuleInternal_UpdateWidgets()
 
     def fTxModuleInternal_FirmwareFile_menu_event(self, opt):
         self.fTxModuleInternal_UpdateWidgets()
@@ -1884,8 +1997,8 @@ class App(ctk.CTk):
         self.fLuaScript_Download_button.grid(row=wrow, column=0, columnspan=2, padx=20, pady=20)
         wrow += 1
 
-    def fLuaScript_Startup(self):
-        return self.updateLuaScriptFiles()
+    def fLuaScript_Startup(self, on_done=None):
+        self.updateLuaScriptFiles(on_done=on_done)
 
     def fLuaScript_FirmwareVersion_menu_event(self, opt):
         self.updateLuaScriptFiles()
@@ -1914,9 +2027,10 @@ class App(ctk.CTk):
 #--------------------------------------------------
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support() # worker processes of the multi port flasher
     app = App()
     app.update()
-    app.after(10,app.after_startup())
+    app.after(10, app.after_startup)
     app.mainloop()
     app.closed()
 
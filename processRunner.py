@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+#************************************************************
+# Copyright (c) MLRS project
+# GPL3
+# https://www.gnu.org/licenses/gpl-3.0.de.html
+# OlliW @ www.olliw.eu
+#************************************************************
+# Supervised process runner
+# 18. Oct. 2026
+#************************************************************
+# Does this:
+# - starts a programmer like STM32_Programmer_CLI or esptool as a child process, with its output piped to us
+# - a reader thread splits the output into lines as they come, also at '\r', as progress bars are redrawn so
+# - parses the progress lines of esptool and STM32_Programmer_CLI, and reports percentage, throughput and time left
+# - stops the process when it takes too long in total, or says nothing for too long before it started to write, or
+#   when cancelled
+# - prints the output, progress lines only at each 10 %, as progress bars are redrawn many times
+# - can also run a process in its own console window on Windows, for when someone has to interact with it, it then
+#   is supervised in the same way, but its output can't be seen by us
+#************************************************************
+
+import os, time
+import subprocess
+import threading
+import re
+
+
+#--------------------------------------------------
+#-- Progress parser
+#--------------------------------------------------
+
+# esptool: 'Writing at 0x00012000... (45 %)', each region goes from 0 to 100 %
+g_esptool_regex = re.compile(r'Writing at 0x([0-9a-fA-F]+)\.*\s*\((\d+) ?%\)')
+
+# STM32_Programmer_CLI: '  Size          : 61.50 KB', a progress bar like '██████████      45%' or '[=====     ]  45%',
+# which comes after 'Download in Progress:', and again after 'Read progress:' when verifying
+g_stm32_size_regex = re.compile(r'^\s*Size\s*:\s*([0-9.]+)\s*(B|KB|MB)', re.IGNORECASE)
+g_stm32_bar_regex = re.compile(r'^\s*(?:\[[=\s>]*\]|[█░▒#=\s]*)\s*(\d{1,3})\s?%\s*$')
+
+STM32_PHASES = [
+    ('Erasing', 'erasing...'),
+    ('Download in Progress', None), # the percentage tells
+    ('Read progress', 'verifying...'),
+    ('Verifying', 'verifying...'),
+    ]
+
+
+# turns the output lines of a programmer into progress dicts, with fields 'text' or 'percent', 'rate', 'eta'
+# rate is in bytes/sec, eta in secs, both are 0.0 if not yet known
+class ProgressParser:
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.tstart = None
+        self.addr_start = None
+        self.addr_last = None
+        self.size = None
+        self.downloading = False
+        self.writing = False # the programmer started to write, it must not be stopped for being silent then
+        self.line_percent = None # the percentage of the last line, if it was a progress line
+
+    def _progress(self, percent, done_bytes, tnow):
+        rate = eta = 0.0
+        if tnow > self.tstart:
+            rate = done_bytes / (tnow - self.tstart)
+            if percent > 0:
+                eta = (tnow - self.tstart) * (100 - percent) / percent
+        return {'percent': percent, 'rate': rate, 'eta': eta}
+
+    # returns a progress dict, or None if the line tells nothing
+    def update(self, line):
+        tnow = time.time()
+        self.line_percent = None
+        f = g_esptool_regex.search(line)
+        if f:
+            addr = int(f.group(1), 16)
+            percent = int(f.group(2))
+            self.writing = True
+            self.line_percent = percent
+            if self.tstart == None or addr < self.addr_last: # new region
+                self.tstart = tnow
+                self.addr_start = addr
+            self.addr_last = addr
+            return self._progress(percent, addr - self.addr_start, tnow)
+        f = g_stm32_size_regex.match(line)
+        if f:
+            self.size = float(f.group(1)) * {'B': 1, 'KB': 1024, 'MB': 1024*1024}[f.group(2).upper()]
+            return None
+        for key, text in STM32_PHASES:
+            if key in line:
+                self.downloading = (text == None)
+                self.writing = True # erasing is writing too
+                self.tstart = tnow
+                return {'text': text} if text else None
+        f = g_stm32_bar_regex.match(line)
+        if f:
+            percent = min(int(f.group(1)), 100)
+            self.line_percent = percent
+            if self.downloading:
+                done_bytes = self.size * percent / 100 if self.size else 0
+                return self._progress(percent, done_bytes, tnow)
+        return None
+
+
+#--------------------------------------------------
+#-- Runner
+#--------------------------------------------------
+
+# args: list of the program and its arguments
+# callback(progress): is called from the reader thread with the parsed progress dicts
+# timeout: max secs the process may run, None for no limit
+# idle_timeout: max secs it may be silent, None for no limit, only until it starts to erase or write, as stopping it
+# then could leave the target half programmed, and a native program may hold back its output in a buffer when it
+# writes to a pipe
+# console: run it in a new console window on Windows, its output is then not seen, and no progress is reported
+class ProcessRunner:
+
+    def __init__(self, args, callback=None, timeout=None, idle_timeout=None, console=False, cwd=None):
+        self.args = args
+        self.callback = callback
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.console = console and os.name == 'nt'
+        self.cwd = cwd
+        self.parser = ProgressParser()
+        self.proc = None
+        self.reader = None
+        self.tstart = None
+        self.last_output = None
+        self.cancelled = False
+        self.print_step = None
+
+    def start(self):
+        self.tstart = self.last_output = time.time()
+        try:
+            if self.console:
+                self.proc = subprocess.Popen(self.args, cwd=self.cwd, creationflags=subprocess.CREATE_NEW_CONSOLE)
+                return True
+            self.proc = subprocess.Popen(
+                self.args, cwd=self.cwd, bufsize=0,
+                stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        except OSError as e:
+            print('ERROR: ProcessRunner.start()', e)
+            return False
+        self.reader = threading.Thread(target=self._read, daemon=True)
+        self.reader.start()
+        return True
+
+    def _line(self, line):
+        line = line.decode('utf-8', errors='replace')
+        progress = self.parser.update(line)
+        if self.parser.line_percent == None:
+            print(line)
+        elif self.parser.line_percent // 10 != self.print_step:
+            print(line)
+            self.print_step = self.parser.line_percent // 10
+        if progress and self.callback:
+            self.callback(progress)
+
+    # reads whatever is there, so a line which is redrawn with '\r' is seen each time
+    def _read(self):
+        fd = self.proc.stdout.fileno()
+        buf = b''
+        while True:
+            try:
+                chunk = os.read(fd, 4096)
+            except OSError:
+                break
+            if not chunk:
+                break
+            self.last_output = time.time()
+            buf += chunk
+            lineList = re.split(rb'[\r\n]', buf)
+            buf = lineList.pop()
+            for line in lineList:
+                if line.strip():
+                    self._line(line)
+        if buf.strip():
+            self._line(buf)
+
+    # terminates the process, and kills it if it does not go
+    def _stop(self):
+        if self.proc == None or self.proc.poll() != None:
+            return
+        try:
+            self.proc.terminate()
+            self.proc.wait(timeout=2.0)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+        except OSError:
+            pass
+
+    # can be called from any thread
+    def cancel(self):
+        self.cancelled = True
+        self._stop()
+
+    def running(self):
+        return self.proc != None and self.proc.poll() == None
+
+    # waits for the process to end, and returns a dict with fields 'ok', 'returncode', 'error', 'time'
+    def wait(self):
+        error = None
+        while self.proc.poll() == None:
+            tnow = time.time()
+            if self.cancelled:
+                error = 'cancelled'
+            elif self.timeout != None and tnow - self.tstart > self.timeout:
+                error = 'timeout after %.0f secs' % self.timeout
+            elif (self.idle_timeout != None and not self.console and not self.parser.writing and
+                  tnow - self.last_output > self.idle_timeout):
+                error = 'no output for %.0f secs' % self.idle_timeout
+            if error:
+                self._stop()
+                break
+            time.sleep(0.05)
+        if self.reader:
+            self.reader.join(timeout=2.0)
+        if self.cancelled and not error:
+            error = 'cancelled'
+        returncode = self.proc.returncode
+        if not error and returncode != 0:
+            error = 'exit code ' + str(returncode)
+        return {'ok': error == None, 'returncode': returncode, 'error': error, 'time': time.time() - self.tstart}
+
+
+#--------------------------------------------------
+#-- API
+#--------------------------------------------------
+
+# the runners which are running, so they can all be cancelled, e.g. when the app closes
+g_runnerList = []
+g_runnerLock = threading.Lock()
+
+# runs the process to its end, returns the result dict of ProcessRunner.wait(), the error is printed
+def run(args, callback=None, timeout=None, idle_timeout=None, console=False, cwd=None):
+    runner = ProcessRunner(args, callback, timeout, idle_timeout, console, cwd)
+    if not runner.start():
+        return {'ok': False, 'returncode': None, 'error': 'could not start ' + str(args[0]), 'time': 0.0}
+    with g_runnerLock:
+        g_runnerList.append(runner)
+    try:
+        res = runner.wait()
+    finally:
+        with g_runnerLock:
+            g_runnerList.remove(runner)
+    if not res['ok']:
+        print('ERROR: run()', os.path.basename(str(args[0])), res['error'])
+    return res
+
+# cancels all processes which are running, returns how many there were
+def cancel_all():
+    with g_runnerLock:
+        runnerList = list(g_runnerList)
+    for runner in runnerList:
+        runner.cancel()
+    return len(runnerList)
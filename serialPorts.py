@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+#************************************************************
+# Copyright (c) MLRS project
+# GPL3
+# https://www.gnu.org/licenses/gpl-3.0.de.html
+# OlliW @ www.olliw.eu
+#************************************************************
+# Serial port inventory
+# 18. Oct. 2026
+#************************************************************
+# Does this:
+# - keeps one list of the serial ports, with what kind of device each one is, for all modules
+# - the kind is found from the usb vid/pid, manufacturer and description by the rules in assets/mLRS_usbdevices.py
+# - the ports are enumerated again only when the set of device names changed, which is cheap to check, from /dev
+#   on linux and mac, and from the registry on windows
+# - on linux only new ports are looked up in sysfs, on other systems all are enumerated, but only new ones classified
+# - a watcher thread can poll for hotplug, so the list is up to date when a port menu opens
+#************************************************************
+
+import os, sys, time
+import threading
+
+
+# kinds of ports
+KIND_STLINK = 'stlink'
+KIND_EDGETX = 'edgetx'
+KIND_STM32_VCP = 'stm32vcp' # has the vid/pid of EdgeTx/OpenTx radios, but is not known to be one
+KIND_ARDUPILOT = 'ardupilot'
+KIND_ARDUPILOT_OTHER = 'ardupilot-other' # other interface of an ArduPilot flight controller, e.g. SLCAN
+KIND_CP210X = 'cp210x'
+KIND_USBTTL = 'usbttl'
+KIND_SERIAL = 'serial' # not an usb port
+
+KINDS_USBTTL = [KIND_CP210X, KIND_USBTTL]
+
+
+#--------------------------------------------------
+#-- Classification
+#--------------------------------------------------
+
+# the rules are in assets/mLRS_usbdevices.py, they are compiled into a dict by (vid, pid) and one by vid, so
+# finding the rules for a port is one lookup, and only these few are tried
+class UsbClassifier:
+
+    def __init__(self, ruleList):
+        self.vidpidDict = {} # (vid, pid) -> list of rules
+        self.vidDict = {} # vid -> list of rules
+        self.anyList = []
+        for rule in ruleList:
+            if 'kind' not in rule.keys() or 'vid' not in rule.keys():
+                print('ERROR: UsbClassifier() invalid rule', rule)
+                continue
+            rule = dict(rule)
+            for key in ['manufacturer', 'description']:
+                if rule.get(key):
+                    rule[key] = rule[key].lower()
+            if rule['vid'] == None:
+                self.anyList.append(rule)
+            elif rule.get('pid') == None:
+                self.vidDict.setdefault(rule['vid'], []).append(rule)
+            else:
+                self.vidpidDict.setdefault((rule['vid'], rule['pid']), []).append(rule)
+        self.kindDict = {} # memo, (vid, pid, manufacturer, description, usb) -> kind
+
+    def _match(self, ruleList, manufacturer, description):
+        for rule in ruleList:
+            if rule.get('os') and rule['os'] != os.name:
+                continue
+            if rule.get('manufacturer') and rule['manufacturer'] not in manufacturer:
+                continue
+            if rule.get('description') and rule['description'] not in description:
+                continue
+            return rule['kind']
+        return None
+
+    # returns the kind of the port, port is a pyserial ListPortInfo
+    def classify(self, port):
+        manufacturer = port.manufacturer.lower() if port.manufacturer else ''
+        description = port.description.lower() if port.description else ''
+        usb = port.hwid != None and 'USB' in port.hwid.upper()
+        key = (port.vid, port.pid, manufacturer, description, usb)
+        if key in self.kindDict.keys():
+            return self.kindDict[key]
+        kind = None
+        if port.vid != None:
+            kind = self._match(self.vidpidDict.get((port.vid, port.pid), []), manufacturer, description)
+            if kind == None:
+                kind = self._match(self.vidDict.get(port.vid, []), manufacturer, description)
+        if kind == None and usb:
+            kind = self._match(self.anyList, manufacturer, description)
+        if kind == None:
+            kind = KIND_USBTTL if usb else KIND_SERIAL
+        self.kindDict[key] = kind
+        return kind
+
+
+def _load_classifier():
+    try:
+        import assets.mLRS_usbdevices as usbdevices
+        return UsbClassifier(usbdevices.g_usbDeviceList)
+    except:
+        print('ERROR: _load_classifier() assets/mLRS_usbdevices.py missing or broken')
+        return UsbClassifier([])
+
+g_classifier = _load_classifier()
+
+
+# returns the kind of the port, port is a pyserial ListPortInfo
+def classify(port):
+    return g_classifier.classify(port)
+
+
+#--------------------------------------------------
+#-- Hotplug detection
+#--------------------------------------------------
+
+# prefixes of the device names which pyserial enumerates
+LINUX_PREFIXES = ('ttyS', 'ttyUSB', 'ttyXRUSB', 'ttyACM', 'ttyAMA', 'rfcomm', 'ttyAP')
+MAC_PREFIXES = ('cu.',)
+
+
+# returns what identifies the present ports, it changes when a port comes or goes, or None if this can't be told
+# a device node which is created anew gets a new ctime, so unplugging and plugging in between two polls is seen too
+def _signature():
+    try:
+        if sys.platform.startswith('linux') or sys.platform == 'darwin':
+            prefixes = LINUX_PREFIXES if sys.platform.startswith('linux') else MAC_PREFIXES
+            sigList = []
+            for name in sorted(os.listdir('/dev')):
+                if name.startswith(prefixes):
+                    sigList.append((os.path.join('/dev', name), os.stat(os.path.join('/dev', name)).st_ctime))
+            return tuple(sigList)
+        if os.name == 'nt':
+            import winreg
+            sigList = []
+            try:
+                key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r'HARDWARE\DEVICEMAP\SERIALCOMM')
+            except OSError: # there is no such key if there are no ports
+                return ()
+            i = 0
+            while True:
+                try:
+                    name, device, _ = winreg.EnumValue(key, i)
+                except OSError:
+                    break
+                sigList.append((device, name))
+                i += 1
+            winreg.CloseKey(key)
+            return tuple(sorted(sigList))
+    except:
+        pass
+    return None
+
+
+#--------------------------------------------------
+#-- Inventory
+#--------------------------------------------------
+
+class PortInventory:
+
+    def __init__(self, max_age=1.0):
+        self.lock = threading.Lock()
+        self.portList = [] # pyserial ListPortInfo, in the order pyserial gives them
+        self.kindDict = {} # (device, hwid) -> kind
+        self.signature = None
+        self.refreshed_at = None
+        self.max_age = max_age # for when changes can't be seen, the list is then enumerated again after this time
+        self.watcher = None
+        self.watcher_running = False
+
+    def _enumerate(self, signature):
+        from serial.tools.list_ports import comports
+        if signature != None and sys.platform.startswith('linux') and self.refreshed_at != None:
+            # look up only the new ones
+            from serial.tools.list_ports_linux import SysFS
+            portDict = {port.device: port for port in self.portList}
+            oldSigDict = dict(self.signature) if self.signature else {}
+            portList = []
+            for device, ctime in signature:
+                if device in portDict.keys() and oldSigDict.get(device) == ctime:
+                    portList.append(portDict[device])
+                    continue
+                info = SysFS(device)
+                if info.subsystem != 'platform': # as pyserial does, hides non-present internal serial ports
+                    portList.append(info)
+            return portList
+        return list(comports())
+
+    # enumerates the ports again if they have changed, returns True if the list changed
+    def refresh(self, force=False):
+        signature = _signature()
+        with self.lock:
+            if not force and self.refreshed_at != None:
+                if signature != None and signature == self.signature:
+                    return False
+                if signature == None and time.time() - self.refreshed_at < self.max_age:
+                    return False
+            try:
+                portList = self._enumerate(signature)
+            except:
+                print('ERROR: PortInventory.refresh() (pyserial missing?) [1]')
+                return False
+            kindDict = {}
+            for port in portList:
+                key = (port.device, port.hwid)
+                kindDict[key] = self.kindDict[key] if key in self.kindDict.keys() else classify(port)
+            changed = [(port.device, port.hwid) for port in portList] != [(port.device, port.hwid) for port in self.portList]
+            self.portList = portList
+            self.kindDict = kindDict
+            self.signature = signature
+            self.refreshed_at = time.time()
+        return changed
+
+    # returns the list of the devices of the given kinds, or of all ports
+    def devices(self, kinds=None):
+        self.refresh()
+        with self.lock:
+            return [port.device for port in self.portList
+                    if kinds == None or self.kindDict[(port.device, port.hwid)] in kinds]
+
+    # returns list of (ListPortInfo, kind)
+    def ports(self):
+        self.refresh()
+        with self.lock:
+            return [(port, self.kindDict[(port.device, port.hwid)]) for port in self.portList]
+
+    # returns the ListPortInfo of the device, or None
+    def info(self, device):
+        for port, _ in self.ports():
+            if port.device == device:
+                return port
+        return None
+
+    def kind(self, device):
+        for port, kind in self.ports():
+            if port.device == device:
+                return kind
+        return None
+
+    # polls for hotplug in a thread, callback is called from this thread when the list changed
+    def start_watcher(self, interval=1.0, callback=None):
+        if self.watcher:
+            return
+        self.watcher_running = True
+        def run():
+            while self.watcher_running:
+                if self.refresh() and callback:
+                    callback()
+                time.sleep(interval)
+        self.watcher = threading.Thread(target=run, daemon=True)
+        self.watcher.start()
+
+    def stop_watcher(self):
+        self.watcher_running = False
+        if self.watcher:
+            self.watcher.join(timeout=2.0)
+        self.watcher = None
+
+
+#--------------------------------------------------
+#-- API
+#--------------------------------------------------
+
+g_inventory = PortInventory()
+
+# returns the devices of the given kinds, or of all ports, None if the ports can't be enumerated
+def find_ports(kinds=None):
+    g_inventory.refresh()
+    if g_inventory.refreshed_at == None:
+        return None
+    return g_inventory.devices(kinds)
+
+def port_info(device):
+    return g_inventory.info(device)
+
+def port_kind(device):
+    return g_inventory.kind(device)
+
+def start_watcher(interval=1.0, callback=None):
+    g_inventory.start_watcher(interval, callback)
+
+def stop_watcher():
+    g_inventory.stop_watcher()
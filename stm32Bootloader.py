@@ -0,0 +1,494 @@
+#!/usr/bin/env python
+#************************************************************
+# Copyright (c) MLRS project
+# GPL3
+# https://www.gnu.org/licenses/gpl-3.0.de.html
+# OlliW @ www.olliw.eu
+#************************************************************
+# Flash STM32 devices through the UART system bootloader
+# 18. Oct. 2026
+#************************************************************
+# Does this:
+# - talks the USART bootloader protocol of ST's AN3155, so STM32_Programmer_CLI is not needed for uart flashing
+# - syncs, reads the chip id, erases only the pages which are written, writes in 256 byte blocks,
+#   verifies, and starts the firmware
+# - verifies with the CRC computed by the chip if the bootloader has the get checksum command, else by reading back
+#   a sample of the blocks, as a full read back takes as long as writing
+# - sends command and address of a read or write at once, instead of waiting for the ACK of each, the data follows
+#   only after the address was acked
+# - reports progress as dicts through a callback, and returns a result dict like espFlasher does
+#************************************************************
+
+import time
+import serial
+
+import intelHex as intelhex
+
+
+ACK = 0x79
+NACK = 0x1F
+
+CMD_GET = 0x00
+CMD_GET_ID = 0x02
+CMD_READ_MEMORY = 0x11
+CMD_GO = 0x21
+CMD_WRITE_MEMORY = 0x31
+CMD_ERASE = 0x43
+CMD_EXTENDED_ERASE = 0x44
+CMD_GET_CHECKSUM = 0xA1
+
+CRC_POLYNOMIAL = 0x04C11DB7 # of the STM32 CRC unit
+CRC_INIT = 0xFFFFFFFF
+
+FLASH_BASE = 0x08000000
+BLOCK_SIZE = 256
+WRITE_ALIGN = 8 # newer chips program flash in double words
+
+# if a command is nacked, the bootloader takes the address bytes which were sent with it as commands
+# the commands of AN3155 are 0x00-0x02, 0x11, 0x21, 0x31, 0x43, 0x44, 0x63, 0x73, 0x82, 0x92, 0xA1, so
+# - the first address byte 0x08 of flash is no command, and the second one can't then be its complement
+# - an address aligned to 8 has a last byte whose complement ends in 0b111, which no command does, whereas
+#   e.g. 0x0800738C would send 0x73 0x8C, which is write unprotect
+# so command and address are sent at once only for such addresses
+PIPELINE_ALIGN = 8
+
+# page size of the flash per product id, as reported by the get id command, see AN2606
+# F4 have sectors of different size, these are given as list of (number of sectors, size)
+g_stm32PageSizeDict = {
+    0x410 : 1024, # F10xx8/B
+    0x412 : 1024, # F10xx4/6
+    0x420 : 1024, # F100xx4/6/8/B
+    0x414 : 2048, # F10xxC/D/E
+    0x430 : 2048, # F10xxF/G
+    0x440 : 1024, # F03xx8, F05x
+    0x445 : 1024, # F04x, F070x6
+    0x448 : 2048, # F07x
+    0x442 : 2048, # F09x, F030xC
+    0x422 : 2048, # F30xxB/C
+    0x438 : 2048, # F303x4/6/8, F334
+    0x446 : 2048, # F30xxD/E
+    0x466 : 2048, # G03x, G04x
+    0x460 : 2048, # G07x, G08x
+    0x467 : 2048, # G0Bx, G0Cx
+    0x468 : 2048, # G431, G441
+    0x469 : 2048, # G47x, G48x, dual bank
+    0x479 : 2048, # G491, G4A1
+    0x435 : 2048, # L43x, L44x
+    0x462 : 2048, # L45x, L46x
+    0x415 : 2048, # L47x, L48x
+    0x461 : 2048, # L496, L4A6
+    0x497 : 2048, # WLE5, WL55
+    0x495 : 4096, # WB55
+    0x413 : [(4, 16*1024), (1, 64*1024), (7, 128*1024)], # F40x, F41x
+    0x419 : [(4, 16*1024), (1, 64*1024), (7, 128*1024)], # F42x, F43x, first bank
+    0x431 : [(4, 16*1024), (1, 64*1024), (3, 128*1024)], # F411
+}
+
+# erase time, the worst case is about 4 secs for a 128 KB sector of the F4, small pages are dominated by the
+# overhead per page
+ERASE_SECS_PER_16KB = 0.5
+ERASE_SECS_PER_PAGE_MIN = 0.1
+
+
+class Stm32BootloaderError(Exception):
+    pass
+
+
+# the chip answered, but flash does not hold the image
+class Stm32VerifyError(Stm32BootloaderError):
+    pass
+
+
+#--------------------------------------------------
+#-- Helper
+#--------------------------------------------------
+
+def _xor(data):
+    x = 0
+    for b in data:
+        x ^= b
+    return x
+
+
+def _with_xor(data):
+    return bytes(data) + bytes([_xor(data)])
+
+
+def _make_crc_table():
+    table = []
+    for i in range(256):
+        crc = i << 24
+        for j in range(8):
+            crc = ((crc << 1) ^ CRC_POLYNOMIAL) if crc & 0x80000000 else (crc << 1)
+        table.append(crc & 0xFFFFFFFF)
+    return table
+
+g_crcTable = _make_crc_table()
+
+
+# CRC as the STM32 CRC unit computes it over memory, i.e. over little endian 32 bit words, msb first
+# len(data) must be a multiple of 4
+def crc32_stm32(data, crc=CRC_INIT):
+    table = g_crcTable
+    for i in range(0, len(data), 4):
+        for b in (data[i+3], data[i+2], data[i+1], data[i]):
+            crc = ((crc << 8) & 0xFFFFFFFF) ^ table[(crc >> 24) ^ b]
+    return crc
+
+
+# returns the image of a .hex or .bin firmware file, .bin goes to the start of flash
+def read_firmware(filename):
+    try:
+        return intelhex.load(filename, FLASH_BASE)
+    except intelhex.IntelHexError as e:
+        raise Stm32BootloaderError(str(e))
+
+
+# returns the sorted list of flash page numbers which are touched by the image
+def _pages_to_erase(pid, image):
+    if pid not in g_stm32PageSizeDict.keys():
+        raise Stm32BootloaderError('unknown chip id 0x%03X' % pid)
+    layout = g_stm32PageSizeDict[pid]
+    if image.min_address() < FLASH_BASE:
+        raise Stm32BootloaderError('address 0x%08X not in flash' % image.min_address())
+    if isinstance(layout, int):
+        return image.pages(FLASH_BASE, layout)
+    pageSet = set()
+    for address, data in image.segments():
+        start = address - FLASH_BASE
+        end = start + len(data)
+        page = 0
+        page_start = 0
+        for count, size in layout:
+            for i in range(count):
+                if page_start < end and page_start + size > start:
+                    pageSet.add(page)
+                page += 1
+                page_start += size
+        if page_start < end:
+            raise Stm32BootloaderError('address 0x%08X not in flash' % (address + len(data) - 1))
+    return sorted(pageSet)
+
+
+# see PIPELINE_ALIGN
+def _pipeline_safe(address):
+    return address % PIPELINE_ALIGN == 0 and (address >> 24) == (FLASH_BASE >> 24)
+
+
+# returns the size of each page in pageList
+def _page_sizes(pid, pageList):
+    layout = g_stm32PageSizeDict[pid]
+    if isinstance(layout, int):
+        return [layout] * len(pageList)
+    sizeList = []
+    for count, size in layout:
+        sizeList += [size] * count
+    return [sizeList[page] for page in pageList]
+
+
+#--------------------------------------------------
+#-- Bootloader protocol
+#--------------------------------------------------
+
+class Stm32Bootloader:
+
+    def __init__(self, port, baudrate=115200, timeout=1.0):
+        # the port timeout is kept short and is never changed, reconfiguring the port is slow on some drivers
+        self.ser = serial.Serial(port, baudrate, parity=serial.PARITY_EVEN, timeout=0.1)
+        self.timeout = timeout
+        self.commandList = []
+        self.version = None
+
+    def close(self):
+        self.ser.close()
+
+    def _read(self, n, timeout=None):
+        tend = time.time() + (timeout if timeout else self.timeout)
+        data = b''
+        while len(data) < n:
+            data += self.ser.read(n - len(data))
+            if len(data) < n and time.time() > tend:
+                raise Stm32BootloaderError('timeout')
+        return data
+
+    def _wait_ack(self, what, timeout=None):
+        b = self._read(1, timeout)[0]
+        if b == NACK:
+            raise Stm32BootloaderError(what + ' NACK')
+        if b != ACK:
+            raise Stm32BootloaderError(what + ' unexpected response 0x%02X' % b)
+
+    def _command(self, cmd):
+        self.ser.write(bytes([cmd, cmd ^ 0xFF]))
+        self._wait_ack('command 0x%02X' % cmd)
+
+    def _address(self, address):
+        return _with_xor(address.to_bytes(4, 'big'))
+
+    def sync(self, retries=10):
+        self.ser.reset_input_buffer()
+        for i in range(retries):
+            self.ser.write(bytes([0x7F]))
+            data = self.ser.read(1)
+            if len(data) and data[0] in [ACK, NACK]: # NACK: bootloader was already synced before
+                return
+        raise Stm32BootloaderError('no answer to sync')
+
+    # reads bootloader version and supported commands
+    def get(self):
+        self._command(CMD_GET)
+        n = self._read(1)[0]
+        data = self._read(n + 1)
+        self._wait_ack('get')
+        self.version = data[0]
+        self.commandList = list(data[1:])
+        return self.version, self.commandList
+
+    def get_id(self):
+        self._command(CMD_GET_ID)
+        n = self._read(1)[0]
+        data = self._read(n + 1)
+        self._wait_ack('get id')
+        return int.from_bytes(data, 'big')
+
+    def read_memory(self, address, size, pipeline=True):
+        if pipeline and _pipeline_safe(address): # send command and address at once, and then collect the answers
+            # the size is sent only after the address was acked, it is a byte and its complement, so it would be
+            # taken as a command if the address were nacked
+            self.ser.write(bytes([CMD_READ_MEMORY, CMD_READ_MEMORY ^ 0xFF]) + self._address(address))
+            for what in ['read', 'read address']:
+                self._wait_ack(what)
+            self.ser.write(bytes([size - 1, (size - 1) ^ 0xFF]))
+            self._wait_ack('read size')
+            return self._read(size)
+        self._command(CMD_READ_MEMORY)
+        self.ser.write(self._address(address))
+        self._wait_ack('read address')
+        self.ser.write(bytes([size - 1, (size - 1) ^ 0xFF]))
+        self._wait_ack('read size')
+        return self._read(size)
+
+    def write_memory(self, address, data, pipeline=True):
+        if len(data) % 4:
+            data = data + b'\xFF' * (4 - len(data) % 4)
+        payload = _with_xor(bytes([len(data) - 1]) + data)
+        if pipeline and _pipeline_safe(address): # send command and address at once, and then collect the answers
+            # the data is sent only after the address was acked, if the address were nacked the bootloader would take
+            # the data bytes as commands, and two of them could happen to be a valid command, like an erase
+            self.ser.write(bytes([CMD_WRITE_MEMORY, CMD_WRITE_MEMORY ^ 0xFF]) + self._address(address))
+            for what in ['write', 'write address']:
+                self._wait_ack(what)
+            self.ser.write(payload)
+            self._wait_ack('write data', timeout=self.timeout + 1.0)
+            return
+        self._command(CMD_WRITE_MEMORY)
+        self.ser.write(self._address(address))
+        self._wait_ack('write address')
+        self.ser.write(payload)
+        self._wait_ack('write data', timeout=self.timeout + 1.0)
+
+    # erases the pages, page erase can take long, so the timeout is by the size of each page
+    # sizeList: the size of each page in bytes, as given by _page_sizes()
+    def erase_pages(self, pageList, sizeList):
+        timeout = self.timeout + 5.0
+        for size in sizeList:
+            timeout += max(ERASE_SECS_PER_PAGE_MIN, ERASE_SECS_PER_16KB * size / (16*1024))
+        if CMD_EXTENDED_ERASE in self.commandList:
+            self._command(CMD_EXTENDED_ERASE)
+            data = (len(pageList) - 1).to_bytes(2, 'big')
+            for page in pageList:
+                data += page.to_bytes(2, 'big')
+            self.ser.write(_with_xor(data))
+        else:
+            self._command(CMD_ERASE)
+            self.ser.write(_with_xor(bytes([len(pageList) - 1] + pageList)))
+        self._wait_ack('erase', timeout=timeout)
+
+    # returns the CRC of the memory area computed by the chip, size must be a multiple of 4
+    def get_checksum(self, address, size, polynomial=CRC_POLYNOMIAL, init=CRC_INIT):
+        self._command(CMD_GET_CHECKSUM)
+        self.ser.write(self._address(address))
+        self._wait_ack('checksum address')
+        self.ser.write(_with_xor((size // 4).to_bytes(4, 'big'))) # in 32 bit words
+        self._wait_ack('checksum size')
+        self.ser.write(_with_xor(polynomial.to_bytes(4, 'big')))
+        self._wait_ack('checksum polynomial')
+        self.ser.write(_with_xor(init.to_bytes(4, 'big')))
+        self._wait_ack('checksum init')
+        self._wait_ack('checksum', timeout=self.timeout + size / 100000.0) # when the CRC is computed
+        data = self._read(5)
+        if _xor(data) != 0:
+            raise Stm32BootloaderError('checksum response corrupted')
+        return int.from_bytes(data[:4], 'big')
+
+    def go(self, address=FLASH_BASE):
+        self._command(CMD_GO)
+        self.ser.write(self._address(address))
+        self._wait_ack('go address')
+
+    # brings the bootloader back into a known state after a failed pipelined command
+    # the address bytes which were sent after a NACK of the command are taken by the bootloader as commands, and get
+    # NACKs
+    def resync(self):
+        time.sleep(0.1)
+        self.ser.reset_input_buffer()
+        self.get()
+
+
+#--------------------------------------------------
+#-- Verify
+#--------------------------------------------------
+
+# merges blocks which follow each other into ranges, returns list of (address, size)
+def _block_ranges(blockList):
+    rangeList = []
+    for address, block in blockList:
+        if rangeList and rangeList[-1][0] + rangeList[-1][1] == address:
+            rangeList[-1][1] += len(block)
+        else:
+            rangeList.append([address, len(block)])
+    return [(address, size) for address, size in rangeList]
+
+
+# compares the CRC computed by the chip with the CRC computed from the image, one command per contiguous range
+def _verify_checksum(bl, image, blockList):
+    for address, size in _block_ranges(blockList):
+        crc = bl.get_checksum(address, size)
+        if crc != crc32_stm32(image.read(address, size)):
+            raise Stm32VerifyError('verify failed in 0x%08X - 0x%08X' % (address, address + size - 1))
+
+
+# reads back every stride-th block, and the first and last block of each range
+# each written block was already acked by the bootloader after it checked the block's xor checksum
+def _verify_sampled(bl, blockList, pipeline, stride=8):
+    sampleSet = set(range(0, len(blockList), stride))
+    sampleSet.add(len(blockList) - 1)
+    for i in range(1, len(blockList)):
+        if blockList[i-1][0] + len(blockList[i-1][1]) != blockList[i][0]: # block i starts a new range
+            sampleSet.update([i - 1, i])
+    print('Reading back %d of %d blocks' % (len(sampleSet), len(blockList)))
+    for i in sorted(sampleSet):
+        address, block = blockList[i]
+        if bl.read_memory(address, len(block), pipeline) != block:
+            raise Stm32VerifyError('verify failed at 0x%08X' % address)
+
+
+def _verify_full(bl, blockList, pipeline):
+    for address, block in blockList:
+        if bl.read_memory(address, len(block), pipeline) != block:
+            raise Stm32VerifyError('verify failed at 0x%08X' % address)
+
+
+# mode: 'auto', 'checksum', 'sampled', 'full'
+# returns the mode which was used
+def _verify(bl, image, blockList, mode, pipeline):
+    if mode == True:
+        mode = 'auto'
+    if mode in ['auto', 'checksum']:
+        if CMD_GET_CHECKSUM in bl.commandList:
+            try:
+                _verify_checksum(bl, image, blockList)
+                return 'checksum'
+            except Stm32VerifyError:
+                raise
+            except Stm32BootloaderError as e: # bootloader does not do it as we expect
+                if mode == 'checksum':
+                    raise
+                print('WARNING: get checksum failed,', e, ', reading back instead')
+                bl.resync()
+        elif mode == 'checksum':
+            raise Stm32BootloaderError('bootloader has no get checksum command')
+    if mode == 'full':
+        _verify_full(bl, blockList, pipeline)
+        return 'full'
+    _verify_sampled(bl, blockList, pipeline)
+    return 'sampled'
+
+
+#--------------------------------------------------
+#-- API
+#--------------------------------------------------
+
+# firmware: filename of a .hex or .bin file, intelHex image, or list of (address, data)
+# verify: 'auto' uses the chip's checksum if available, else reads back a sample, 'checksum', 'sampled', 'full', or None
+# callback(progress) is called with a dict, with fields 'text' or 'address', 'written', 'size', 'percent', 'rate'
+# returns a dict with the fields:
+#   'ok' : True/False, 'error' : error message or None, 'chip' : product id, 'time' : secs, 'size' : bytes written,
+#   'verify' : how it was verified
+def flash(port, baudrate, firmware, verify='auto', go=True, pipeline=True, callback=None):
+    def report(**kwargs):
+        if callback:
+            callback(kwargs)
+
+    result = { 'ok' : False, 'error' : None, 'chip' : None, 'time' : 0.0, 'size' : 0, 'verify' : None }
+    tstart = time.time()
+    bl = None
+    try:
+        if isinstance(firmware, str):
+            image = read_firmware(firmware)
+        elif isinstance(firmware, intelhex.HexImage):
+            image = firmware
+        else:
+            image = intelhex.HexImage()
+            for address, data in firmware:
+                image.add(address, data)
+        if image.size() == 0:
+            raise Stm32BootloaderError('empty firmware')
+        blockList = image.blocks(BLOCK_SIZE, WRITE_ALIGN)
+        size = sum([len(block) for _, block in blockList])
+        result['size'] = size
+
+        report(text='connecting...')
+        bl = Stm32Bootloader(port, baudrate)
+        bl.sync()
+        version, commandList = bl.get()
+        pid = bl.get_id()
+        result['chip'] = pid
+        print('Bootloader version %d.%d, chip id 0x%03X' % (version >> 4, version & 0x0F, pid))
+
+        pageList = _pages_to_erase(pid, image)
+        sizeList = _page_sizes(pid, pageList)
+        report(text='erasing...')
+        print('Erasing %d pages...' % len(pageList))
+        for i in range(0, len(pageList), 32): # in chunks, to keep the timeout of one erase command sane
+            bl.erase_pages(pageList[i:i+32], sizeList[i:i+32])
+
+        written = 0
+        tstart_write = time.time()
+        pipelined = False # the first block is written step by step, this checks that writing works at all
+        for address, block in blockList:
+            try:
+                bl.write_memory(address, block, pipelined)
+            except Stm32BootloaderError as e:
+                if not pipelined:
+                    raise
+                print('WARNING: pipelined write failed,', e, ', retrying')
+                bl.resync()
+                bl.write_memory(address, block, False)
+            pipelined = pipeline
+            written += len(block)
+            dt = max(time.time() - tstart_write, 0.001)
+            report(address=address, written=written, size=size, percent=100 * written // size, rate=written / dt)
+        print('Wrote %d bytes in %.1f seconds' % (written, time.time() - tstart_write))
+
+        if verify:
+            report(text='verifying...')
+            tstart_verify = time.time()
+            result['verify'] = _verify(bl, image, blockList, verify, pipeline)
+            print('Verified (%s) in %.1f seconds.' % (result['verify'], time.time() - tstart_verify))
+
+        if go:
+            bl.go(FLASH_BASE)
+            print('Started firmware.')
+        result['ok'] = True
+    except (Stm32BootloaderError, serial.SerialException, OSError) as e:
+        print('ERROR: stm32Bootloader.flash()', e)
+        result['error'] = str(e)
+    finally:
+        if bl:
+            try:
+                bl.close()
+            except:
+                pass
+    result['time'] = time.time() - tstart
+    return result
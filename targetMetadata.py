@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+#************************************************************
+# Copyright (c) MLRS project
+# GPL3
+# https://www.gnu.org/licenses/gpl-3.0.de.html
+# OlliW @ www.olliw.eu
+#************************************************************
+# Target metadata resolver
+# 18. Oct. 2026
+#************************************************************
+# Does this:
+# - compiles g_targetDict of assets/mLRS_metadata.py once into a prefix trie per device, whose nodes hold the
+#   metadata of the device merged with that of the target
+# - resolves chipset, flashmethod, description, wireless of a firmware file by the longest target which the file
+#   name starts with, so the order of the targets in the dict does not matter
+# - checks for targets which would be ambiguous, or can't be matched
+# - keeps the results per file name
+#************************************************************
+
+import os
+
+
+FIELDS = ['chipset', 'flashmethod', 'description', 'wireless']
+
+VALUE = None # key of the value in a trie node, all other keys are characters
+
+
+class TargetMetadataResolver:
+
+    # targetDict: device fname -> dict of the fields, and of targets, target fname -> dict of the fields
+    def __init__(self, targetDict):
+        self.trieDict = {} # device fname -> trie
+        self.resultDict = {} # (device fname, firmware filename) -> result
+        for device, device_dict in targetDict.items():
+            self.trieDict[device] = self._compile(device, device_dict)
+
+    def _compile(self, device, device_dict):
+        device_value = tuple([device_dict.get(field) for field in FIELDS])
+        root = {VALUE: device_value}
+        targetList = [key for key in device_dict.keys() if key not in FIELDS]
+        self._validate(device, targetList)
+        for target in targetList:
+            target_dict = device_dict[target]
+            value = tuple([target_dict[field] if field in target_dict.keys() else device_value[i]
+                           for i, field in enumerate(FIELDS)])
+            node = root
+            for c in target:
+                node = node.setdefault(c, {})
+            node[VALUE] = value
+        return root
+
+    # a target must start with the device, as the firmware file names do
+    # a target which is inside another but not at its start would have matched first or not depending on the order
+    # of the dict with a substring search, this is reported, as it's likely not what was meant
+    def _validate(self, device, targetList):
+        ok = True
+        for target in targetList:
+            if not target.startswith(device):
+                print('ERROR: TargetMetadataResolver() target', target, 'does not start with', device)
+                ok = False
+            for other in targetList:
+                if other != target and target in other and not other.startswith(target):
+                    print('ERROR: TargetMetadataResolver() target', target, 'is ambiguous with', other)
+                    ok = False
+        return ok
+
+    # returns chipset, flashmethod, description, wireless, fields which are not given are None
+    def resolve(self, device, firmware_filename):
+        key = (device, firmware_filename)
+        if key in self.resultDict.keys():
+            return self.resultDict[key]
+        if device not in self.trieDict.keys():
+            return None, None, None, None
+        node = self.trieDict[device]
+        res = node[VALUE]
+        if not 'failed' in firmware_filename:
+            for c in os.path.basename(firmware_filename):
+                if c not in node.keys():
+                    break
+                node = node[c]
+                if VALUE in node.keys():
+                    res = node[VALUE]
+        self.resultDict[key] = res
+        return res
@@ -611,7 +611,6 @@ def write_flash(esp, args):
         if compress:
             uncimage = image
             image = zlib.compress(uncimage, 9)
-        original_image = image  # Save the whole image in case retry is needed
         # Try again if reconnect was successful
         for attempt in range(1, esp.WRITE_FLASH_ATTEMPTS + 1):
             try:
@@ -626,19 +625,22 @@ def write_flash(esp, args):
                     )
                 argfile.seek(0)  # in case we need it again
                 seq = 0
+                # mLRS: image is walked with an offset instead of cutting off each sent
+                # block, which copied the whole remaining image per block (quadratic)
+                offset = 0
                 bytes_sent = 0  # bytes sent on wire
                 bytes_written = 0  # bytes written to flash
                 t = time.time()
 
                 timeout = DEFAULT_TIMEOUT
 
-                while len(image) > 0:
+                while offset < len(image):
                     print_overwrite(
                         "Writing at 0x%08x... (%d %%)"
                         % (address + bytes_written, 100 * (seq + 1) // blocks)
                     )
                     sys.stdout.flush()
-                    block = image[0 : esp.FLASH_WRITE_SIZE]
+                    block = image[offset : offset + esp.FLASH_WRITE_SIZE]
                     if compress:
                         # feeding each compressed block into the decompressor lets us
                         # see block-by-block how much will be written
@@ -666,7 +668,7 @@ def write_flash(esp, args):
                             esp.flash_block(block, seq)
                         bytes_written += len(block)
                     bytes_sent += len(block)
-                    image = image[esp.FLASH_WRITE_SIZE :]
+                    offset += esp.FLASH_WRITE_SIZE
                     seq += 1
                 break
             except SerialException:
@@ -687,7 +689,6 @@ def write_flash(esp, args):
                             esp.IS_STUB = False
                             # Reflash stub because chip was reset
                             esp = esp.run_stub()
-                        image = original_image
                         break
                     except SerialException:
                         print(".", end="")
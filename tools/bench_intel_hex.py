@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+#************************************************************
+# Copyright (c) MLRS project
+# GPL3
+# https://www.gnu.org/licenses/gpl-3.0.de.html
+# OlliW @ www.olliw.eu
+#************************************************************
+# benchmark the Intel hex parser
+# 18. Oct. 2026
+#************************************************************
+# Does this:
+# - parses hex files with intelHex, and with a simple parser which reads all lines and keeps a list of segments
+# - without files, uses generated hex files of the size of the largest mLRS firmwares, with 16 byte records
+#   and a gap between code and data, as gcc's objcopy writes them
+# - also times the cached load(), and computing pages and blocks of an image
+# run from the main folder: python tools/bench_intel_hex.py [files]
+#************************************************************
+
+import os, sys, time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+import intelHex as intelhex
+
+
+def write_hex(filename, segmentList):
+    F = open(filename, 'w')
+    for address, data in segmentList:
+        upper = None
+        for offset in range(0, len(data), 16):
+            a = address + offset
+            if a >> 16 != upper:
+                upper = a >> 16
+                record = bytes([2, 0, 0, 4, upper >> 8, upper & 0xFF])
+                F.write(':' + (record + bytes([(-sum(record)) & 0xFF])).hex().upper() + '\n')
+            chunk = data[offset : offset + 16]
+            record = bytes([len(chunk), (a >> 8) & 0xFF, a & 0xFF, 0]) + chunk
+            F.write(':' + (record + bytes([(-sum(record)) & 0xFF])).hex().upper() + '\n')
+    F.write(':00000001FF\n')
+    F.close()
+
+
+# the parser this replaces, reads all lines at once, and keeps a list of segments
+def parse_simple(filename):
+    F = open(filename, 'r')
+    lines = F.readlines()
+    F.close()
+    segmentList = []
+    base = 0
+    for line in lines:
+        line = line.strip()
+        if not line.startswith(':'):
+            continue
+        record = bytes.fromhex(line[1:])
+        if (sum(record) & 0xFF) != 0:
+            raise ValueError('checksum')
+        count, offset, rectype = record[0], (record[1] << 8) + record[2], record[3]
+        data = record[4:4+count]
+        if rectype == 0x00:
+            address = base + offset
+            if segmentList and segmentList[-1][0] + len(segmentList[-1][1]) == address:
+                segmentList[-1][1].extend(data)
+            else:
+                segmentList.append((address, bytearray(data)))
+        elif rectype == 0x01:
+            break
+        elif rectype == 0x04:
+            base = ((data[0] << 8) + data[1]) << 16
+    return segmentList
+
+
+def best_of(func, n=5):
+    t = None
+    for i in range(n):
+        tstart = time.perf_counter()
+        func()
+        dt = time.perf_counter() - tstart
+        t = dt if t == None else min(t, dt)
+    return t
+
+
+if __name__ == '__main__':
+    fileList = sys.argv[1:]
+    tmpdir = None
+    if not fileList:
+        tmpdir = tempfile.mkdtemp()
+        for size in [64*1024, 128*1024, 240*1024, 480*1024]:
+            filename = os.path.join(tmpdir, 'fw-%dk.hex' % (size // 1024))
+            code = os.urandom(size - 2048)
+            data = os.urandom(2048)
+            write_hex(filename, [(0x08000000, code), (0x08000000 + size + 4096, data)])
+            fileList.append(filename)
+
+    print('times in ms, best of 5')
+    print('%-28s %8s %8s %8s %8s %8s %8s' % ('file', 'kB', 'simple', 'parse', 'load', 'pages', 'blocks'))
+    for filename in fileList:
+        t_simple = best_of(lambda: parse_simple(filename))
+        def parse():
+            F = open(filename, 'rb')
+            intelhex.parse(F)
+            F.close()
+        t_parse = best_of(parse)
+        intelhex.load(filename)
+        t_load = best_of(lambda: intelhex.load(filename))
+        image = intelhex.load(filename)
+        def pages():
+            image.pageDict = {} # time computing them, not the lookup
+            image.pages(0x08000000, 2048)
+        t_pages = best_of(pages)
+        def blocks():
+            image.blockDict = {}
+            image.blocks(256, 8)
+        t_blocks = best_of(blocks)
+        print('%-28s %8d %8.2f %8.2f %8.3f %8.3f %8.3f' % (os.path.basename(filename)[:28], image.size() // 1024,
+              1000 * t_simple, 1000 * t_parse, 1000 * t_load, 1000 * t_pages, 1000 * t_blocks))
+
+    if tmpdir:
+        for filename in fileList:
+            os.remove(filename)
+        os.rmdir(tmpdir)
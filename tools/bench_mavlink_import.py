@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+#************************************************************
+# Copyright (c) MLRS project
+# GPL3
+# https://www.gnu.org/licenses/gpl-3.0.de.html
+# OlliW @ www.olliw.eu
+#************************************************************
+# benchmark the startup time of pymavlink
+# 18. Oct. 2026
+#************************************************************
+# Does this:
+# - times in fresh python processes, as on a fresh install:
+#   - generating the dialects ardupilotmega for MAVLink 1 and all for MAVLink 2 from the xml files and importing them,
+#     as importing mavutil and set_dialect("all") did on the first start
+#   - importing the generated modules, as on later starts
+#   - importing apInitPassthru, which does not load pymavlink anymore
+#   - loading pymavlink with the pregenerated slim dialect
+# - generated modules go into a temporary folder, so the dialects folder of pymavlink is not touched
+# run from the main folder: python tools/bench_mavlink_import.py
+#************************************************************
+
+import os, sys, time
+import subprocess
+import tempfile
+import shutil
+
+
+MAIN_PATH = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+MAVLINK_PATH = os.path.join(MAIN_PATH, 'thirdparty', 'mavlink')
+
+
+GENERATE = '''
+import sys
+sys.path.insert(0, {mavlink!r})
+from pymavlink.generator import mavgen, mavparse
+opts = mavgen.Opts({py_apm!r}, mavparse.PROTOCOL_1_0, language='Python3')
+mavgen.mavgen(opts, [{xml_apm!r}])
+opts = mavgen.Opts({py!r}, mavparse.PROTOCOL_2_0, language='Python3')
+mavgen.mavgen(opts, [{xml!r}])
+sys.path.insert(0, {tmpdir!r})
+import ardupilotmega
+import all
+'''
+
+IMPORT_GENERATED = '''
+import sys
+sys.path.insert(0, {mavlink!r})
+sys.path.insert(0, {tmpdir!r})
+import ardupilotmega
+import all
+'''
+
+IMPORT_PASSTHRU = '''
+import apInitPassthru
+'''
+
+LOAD_SLIM = '''
+import apInitPassthru
+apInitPassthru.load_mavlink()
+'''
+
+
+def run(code, n=1):
+    t = None
+    for i in range(n):
+        tstart = time.perf_counter()
+        res = subprocess.run([sys.executable, '-c', code], cwd=MAIN_PATH, stdout=subprocess.DEVNULL)
+        dt = time.perf_counter() - tstart
+        if res.returncode != 0:
+            print('ERROR: run() failed')
+            return None
+        t = dt if t == None else min(t, dt)
+    return t
+
+
+if __name__ == '__main__':
+    tmpdir = tempfile.mkdtemp()
+    paramsDict = {
+        'mavlink' : MAVLINK_PATH,
+        'py' : os.path.join(tmpdir, 'all.py'),
+        'xml' : os.path.join(MAVLINK_PATH, 'message_definitions', 'v1.0', 'all.xml'),
+        'py_apm' : os.path.join(tmpdir, 'ardupilotmega.py'),
+        'xml_apm' : os.path.join(MAVLINK_PATH, 'message_definitions', 'v1.0', 'ardupilotmega.xml'),
+        'tmpdir' : tmpdir,
+    }
+
+    t_python = run('pass', 5)
+    print('times in secs, python startup of %.3f secs subtracted' % t_python)
+    print('  generate and import        %8.3f' % (run(GENERATE.format(**paramsDict)) - t_python))
+    print('  import generated           %8.3f' % (run(IMPORT_GENERATED.format(**paramsDict), 5) - t_python))
+    print('  import apInitPassthru      %8.3f' % (run(IMPORT_PASSTHRU, 5) - t_python))
+    print('  load slim dialect          %8.3f' % (run(LOAD_SLIM, 5) - t_python))
+
+    shutil.rmtree(tmpdir)
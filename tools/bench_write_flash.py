@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+#************************************************************
+# Copyright (c) MLRS project
+# GPL3
+# https://www.gnu.org/licenses/gpl-3.0.de.html
+# OlliW @ www.olliw.eu
+#************************************************************
+# benchmark host side cpu time of esptool write_flash
+# 18. Oct. 2026
+#************************************************************
+# Does this:
+# - runs the vendored esptool write_flash() against a dummy chip, which accepts everything at once,
+#   so that only the host side cpu time is measured
+# - compares the old block loop, which cut off each block from the image, with the offset loop
+# run from the main folder: python tools/bench_write_flash.py
+#************************************************************
+
+import os, sys, time
+import io
+import zlib
+import hashlib
+import types
+import contextlib
+
+sys.path.insert(0, os.path.join('thirdparty','esptool'))
+from esptool import cmds
+
+
+class DummyEsp:
+    CHIP_NAME = 'ESP32'
+    IS_STUB = True
+    FLASH_WRITE_SIZE = 0x4000
+    FLASH_SECTOR_SIZE = 0x1000
+    FLASH_ENCRYPTED_WRITE_ALIGN = 32
+    BOOTLOADER_FLASH_OFFSET = 0x1000
+    ESP_IMAGE_MAGIC = 0xE9
+    WRITE_FLASH_ATTEMPTS = 2
+    secure_download_mode = False
+
+    def get_secure_boot_enabled(self): return False
+    def flash_id(self): return 0x184020 # 16MB
+    def flash_begin(self, size, offset, begin_rom_encrypted=False):
+        self.data = bytearray()
+        self.offset = offset
+        return (size + self.FLASH_WRITE_SIZE - 1) // self.FLASH_WRITE_SIZE
+    def flash_block(self, data, seq, timeout=None): self.data += data
+    def flash_defl_begin(self, size, compsize, offset):
+        self.decompress = zlib.decompressobj()
+        self.data = bytearray()
+        self.offset = offset
+        return (compsize + self.FLASH_WRITE_SIZE - 1) // self.FLASH_WRITE_SIZE
+    def flash_defl_block(self, data, seq, timeout=None): self.data += self.decompress.decompress(data)
+    def flash_defl_finish(self, reboot=False): pass
+    def flash_finish(self, reboot=False): pass
+    def read_reg(self, addr, timeout=None): return 0
+    def flash_md5sum(self, addr, size): return hashlib.md5(bytes(self.data[:size])).hexdigest()
+
+
+def write_flash(image, compress):
+    argfile = io.BytesIO(image)
+    argfile.name = 'firmware.bin'
+    args = types.SimpleNamespace(
+        addr_filename = [(0x10000, argfile)], compress = compress, no_compress = not compress, no_stub = False,
+        force = True, encrypt = False, encrypt_files = None, ignore_flash_encryption_efuse_setting = False,
+        flash_mode = 'keep', flash_freq = 'keep', flash_size = 'keep', erase_all = False, verify = False,
+        chip = 'esp32')
+    tstart = time.process_time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        cmds.write_flash(DummyEsp(), args)
+    return time.process_time() - tstart
+
+
+def block_loop_old(image, block_size):
+    tstart = time.process_time()
+    while len(image) > 0:
+        image[0:block_size] # the copy of the block is what is timed
+        image = image[block_size:]
+    return time.process_time() - tstart
+
+
+def block_loop_offset(image, block_size):
+    tstart = time.process_time()
+    offset = 0
+    while offset < len(image):
+        image[offset:offset + block_size]
+        offset += block_size
+    return time.process_time() - tstart
+
+
+if __name__ == '__main__':
+    print('cpu time in secs')
+    print('size      old loop  offset loop  write_flash -z  write_flash -u  zlib level 9')
+    for size in [256*1024, 1024*1024, 2*1024*1024, 4*1024*1024]:
+        # firmware like data, compresses to about 60%
+        image = (os.urandom(size // 2) + bytes(size // 2))
+        old = block_loop_old(image, 0x4000)
+        new = block_loop_offset(image, 0x4000)
+        wz = write_flash(image, True)
+        wu = write_flash(image, False)
+        tstart = time.process_time()
+        zlib.compress(image, 9)
+        tz = time.process_time() - tstart
+        print('%-8s  %8.4f  %11.4f  %14.4f  %14.4f  %12.4f' % (str(size//1024)+'k', old, new, wz, wu, tz))
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+#************************************************************
+# Copyright (c) MLRS project
+# GPL3
+# https://www.gnu.org/licenses/gpl-3.0.de.html
+# OlliW @ www.olliw.eu
+#************************************************************
+# build the slim MAVLink dialect of the flasher
+# 18. Oct. 2026
+#************************************************************
+# Does this:
+# - picks the messages the flasher uses from common.xml and its includes, and the enums which these and
+#   pymavlink's mavutil need, and writes them into mlrs_flasher.xml
+# - generates the python module pymavlink/dialects/v20/mlrs_flasher.py from it with mavgen
+# - message ids and crc extras are those of common.xml, so the flasher talks to any MAVLink 2 system
+# the generated module is committed, so run this only when the list of messages changes
+# run from the main folder: python tools/build_mavlink_dialect.py
+#************************************************************
+
+import os, sys
+import xml.etree.ElementTree as ET
+
+MAVLINK_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'thirdparty', 'mavlink')
+sys.path.insert(0, MAVLINK_PATH)
+from pymavlink.generator import mavgen, mavparse
+
+
+DIALECT = 'mlrs_flasher'
+
+MESSAGES = [
+    'HEARTBEAT',
+    'PARAM_REQUEST_READ', 'PARAM_REQUEST_LIST', 'PARAM_VALUE', 'PARAM_SET',
+    'COMMAND_LONG', 'COMMAND_ACK',
+    # mavutil's mavfile_state needs these classes
+    'GPS_RAW_INT', 'MISSION_ITEM',
+]
+
+# enums used by mavutil when handling heartbeats, modes, and params, in addition to those of the message fields
+ENUMS = [
+    'MAV_AUTOPILOT', 'MAV_TYPE', 'MAV_MODE_FLAG', 'MAV_MODE', 'MAV_STATE', 'MAV_COMPONENT',
+    'MAV_CMD', 'MAV_RESULT', 'MAV_PARAM_TYPE',
+]
+
+# of these enums only the listed entries are taken, MAV_CMD alone would be more than half of the module
+ENUM_ENTRIES = {
+    'MAV_CMD' : [
+        'MAV_CMD_PREFLIGHT_REBOOT_SHUTDOWN',
+        # used by mavutil's helpers
+        'MAV_CMD_NAV_LOITER_UNLIM', 'MAV_CMD_NAV_RETURN_TO_LAUNCH', 'MAV_CMD_DO_SET_MODE', 'MAV_CMD_DO_SET_SERVO',
+        'MAV_CMD_DO_SET_RELAY', 'MAV_CMD_MISSION_START', 'MAV_CMD_COMPONENT_ARM_DISARM',
+        'MAV_CMD_PREFLIGHT_CALIBRATION',
+    ],
+}
+
+SOURCES = ['minimal.xml', 'standard.xml', 'common.xml']
+
+
+def load_definitions(xml_path):
+    messageDict = {}
+    enumDict = {}
+    for source in SOURCES:
+        root = ET.parse(os.path.join(xml_path, source)).getroot()
+        for enum in root.iter('enum'):
+            name = enum.get('name')
+            if name in enumDict.keys(): # enums can be extended by later files
+                enumDict[name].extend(enum.findall('entry'))
+            else:
+                enumDict[name] = enum
+        for message in root.iter('message'):
+            messageDict[message.get('name')] = message
+    return messageDict, enumDict
+
+
+def build_xml(xml_path, filename):
+    messageDict, enumDict = load_definitions(xml_path)
+    enumList = list(ENUMS)
+    for name in MESSAGES:
+        if name not in messageDict.keys():
+            print('ERROR: build_xml() message', name, 'not found')
+            return False
+        for field in messageDict[name].iter('field'):
+            enum = field.get('enum')
+            if enum and enum not in enumList:
+                enumList.append(enum)
+    root = ET.Element('mavlink')
+    ET.SubElement(root, 'version').text = '3'
+    ET.SubElement(root, 'dialect').text = '0'
+    enums = ET.SubElement(root, 'enums')
+    for name in enumList:
+        if name not in enumDict.keys():
+            print('ERROR: build_xml() enum', name, 'not found')
+            return False
+        enum = enumDict[name]
+        if name in ENUM_ENTRIES.keys():
+            for entry in enum.findall('entry'):
+                if entry.get('name') not in ENUM_ENTRIES[name]:
+                    enum.remove(entry)
+            if len(enum.findall('entry')) != len(ENUM_ENTRIES[name]):
+                print('ERROR: build_xml() entries of enum', name, 'not found')
+                return False
+        enums.append(enum)
+    messages = ET.SubElement(root, 'messages')
+    for name in MESSAGES:
+        messages.append(messageDict[name])
+    if hasattr(ET, 'indent'):
+        ET.indent(root, '  ')
+    F = open(filename, 'wb')
+    F.write(b'<?xml version="1.0"?>\n')
+    F.write(b'<!-- generated by tools/build_mavlink_dialect.py from ' + ', '.join(SOURCES).encode() + b', do not edit -->\n')
+    F.write(ET.tostring(root))
+    F.write(b'\n')
+    F.close()
+    return True
+
+
+if __name__ == '__main__':
+    xml_path = os.path.join(MAVLINK_PATH, 'message_definitions', 'v1.0')
+    xml_file = os.path.join(xml_path, DIALECT + '.xml')
+    py_file = os.path.join(MAVLINK_PATH, 'pymavlink', 'dialects', 'v20', DIALECT + '.py')
+
+    if not build_xml(xml_path, xml_file):
+        sys.exit(1)
+    print('written', os.path.relpath(xml_file))
+
+    opts = mavgen.Opts(py_file, mavparse.PROTOCOL_2_0, language='Python3')
+    if not mavgen.mavgen(opts, [xml_file]):
+        print('ERROR: mavgen failed')
+        sys.exit(1)
+    print('written', os.path.relpath(py_file))
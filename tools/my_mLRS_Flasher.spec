@@ -14,7 +14,7 @@ block_cipher = None
 
 a = Analysis(
     [path + appname+'.py'],
-    pathex=[],
+    pathex=[path + 'thirdparty/esptool'], # so that the esptool package imported by espFlasher gets bundled
     binaries=[],
     datas=[
         (path + 'assets' , 'assets'),
@@ -23,6 +23,18 @@ a = Analysis(
         (path + appname+'.py' , '.'),
         (path + 'edgetxInitPassthru.py' , '.'),
         (path + 'apInitPassthru.py' , '.'),
+        (path + 'httpCache.py' , '.'),
+        (path + 'firmwareStore.py' , '.'),
+        (path + 'firmwareCatalog.py' , '.'),
+        (path + 'espFlasher.py' , '.'),
+        (path + 'deflateCache.py' , '.'),
+        (path + 'espMultiFlasher.py' , '.'),
+        (path + 'stm32Bootloader.py' , '.'),
+        (path + 'intelHex.py' , '.'),
+        (path + 'serialPorts.py' , '.'),
+        (path + 'targetMetadata.py' , '.'),
+        (path + 'firmwareName.py' , '.'),
+        (path + 'processRunner.py' , '.'),
         (path + 'thirdparty/STM32CubeProgrammer/win' , 'thirdparty/STM32CubeProgrammer/win'),
         # https://github.com/TomSchimansky/CustomTkinter/wiki/Packaging
         ('c:\winpython3-10-5\wpy64-31050\python-3.10.5.amd64\lib\site-packages\customtkinter' , 'customtkinter'),
@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+#************************************************************
+# Copyright (c) MLRS project
+# GPL3
+# https://www.gnu.org/licenses/gpl-3.0.de.html
+# OlliW @ www.olliw.eu
+#************************************************************
+# simulated STM32 UART system bootloader on a pty
+# 18. Oct. 2026
+#************************************************************
+# Does this:
+# - opens a pty, and answers on it like the AN3155 bootloader of a STM32G431 with 128 KB flash does
+# - flash must be erased before it can be written, like on the chip
+# - has the get checksum command of newer bootloaders, unless -nochecksum is given
+# - with -selftest, flashes a firmware with stm32Bootloader through the pty, and checks the result
+# linux and mac only
+# run from the main folder: python tools/stm32_bootloader_sim.py -selftest
+#************************************************************
+
+import os, sys, time
+import argparse
+import threading
+import tty
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+import stm32Bootloader as stm32boot
+
+
+ACK = bytes([stm32boot.ACK])
+NACK = bytes([stm32boot.NACK])
+
+
+def _with_xor_ack(value):
+    return ACK + stm32boot._with_xor(value.to_bytes(4, 'big'))
+
+
+class SimulatedBootloader:
+
+    def __init__(self, pid=0x468, flash_size=128*1024, page_size=2048, extended_erase=True, checksum=True):
+        self.pid = pid
+        self.page_size = page_size
+        self.flash = bytearray(b'\xFF' * flash_size)
+        self.extended_erase = extended_erase
+        self.checksum = checksum
+        self.started_at = None
+        self.master, slave = os.openpty()
+        tty.setraw(slave)
+        self.port = os.ttyname(slave)
+        self.slave = slave # keep open, so the pty does not go away when the flasher closes it
+
+    def _read(self, n):
+        data = b''
+        while len(data) < n:
+            data += os.read(self.master, n - len(data))
+        return data
+
+    def _write(self, data):
+        os.write(self.master, data)
+
+    def _read_checked(self, n):
+        data = self._read(n + 1)
+        if stm32boot._xor(data) != 0:
+            return None
+        return data[:n]
+
+    def _read_address(self):
+        data = self._read_checked(4)
+        if data == None:
+            return None
+        address = int.from_bytes(data, 'big')
+        if address < stm32boot.FLASH_BASE or address >= stm32boot.FLASH_BASE + len(self.flash):
+            return None
+        return address - stm32boot.FLASH_BASE
+
+    def _get(self):
+        commandList = [0x00, 0x01, 0x02, 0x11, 0x21, 0x31, 0x44 if self.extended_erase else 0x43, 0x63, 0x73, 0x82, 0x92]
+        if self.checksum:
+            commandList.append(0xA1)
+        self._write(ACK + bytes([len(commandList), 0x31] + commandList) + ACK)
+
+    def _get_id(self):
+        self._write(ACK + bytes([1]) + self.pid.to_bytes(2, 'big') + ACK)
+
+    def _read_memory(self):
+        self._write(ACK)
+        offset = self._read_address()
+        if offset == None:
+            self._write(NACK)
+            return
+        self._write(ACK)
+        data = self._read(2)
+        if data[0] ^ data[1] != 0xFF:
+            self._write(NACK)
+            return
+        self._write(ACK + bytes(self.flash[offset : offset + data[0] + 1]))
+
+    def _write_memory(self):
+        self._write(ACK)
+        offset = self._read_address()
+        if offset == None:
+            self._write(NACK)
+            return
+        self._write(ACK)
+        n = self._read(1)[0] + 1
+        data = self._read(n + 1)
+        if stm32boot._xor(bytes([n - 1]) + data) != 0 or offset + n > len(self.flash):
+            self._write(NACK)
+            return
+        for i in range(n):
+            if self.flash[offset + i] != 0xFF and data[i] != 0xFF: # not erased
+                self._write(NACK)
+                return
+        self.flash[offset : offset + n] = data[:n]
+        self._write(ACK)
+
+    def _erase_page(self, page):
+        self.flash[page * self.page_size : (page + 1) * self.page_size] = b'\xFF' * self.page_size
+
+    def _erase(self):
+        self._write(ACK)
+        n = self._read(1)[0] + 1
+        data = self._read(n + 1)
+        if stm32boot._xor(bytes([n - 1]) + data) != 0:
+            self._write(NACK)
+            return
+        for page in data[:n]:
+            self._erase_page(page)
+        self._write(ACK)
+
+    def _extended_erase(self):
+        self._write(ACK)
+        data = self._read(2)
+        n = int.from_bytes(data, 'big') + 1
+        if n > 0xFFF0: # special erase, mass erase or bank erase
+            self._read(1)
+            self.flash[:] = b'\xFF' * len(self.flash)
+            self._write(ACK)
+            return
+        data += self._read(2 * n + 1)
+        if stm32boot._xor(data) != 0:
+            self._write(NACK)
+            return
+        for i in range(n):
+            self._erase_page(int.from_bytes(data[2 + 2*i : 4 + 2*i], 'big'))
+        time.sleep(0.001 * n) # erasing takes time
+        self._write(ACK)
+
+    def _get_checksum(self):
+        self._write(ACK)
+        offset = self._read_address()
+        if offset == None:
+            self._write(NACK)
+            return
+        self._write(ACK)
+        valueList = []
+        for i in range(3): # size in words, polynomial, init
+            data = self._read_checked(4)
+            if data == None:
+                self._write(NACK)
+                return
+            valueList.append(int.from_bytes(data, 'big'))
+            self._write(ACK)
+        size, polynomial, init = valueList
+        if polynomial != stm32boot.CRC_POLYNOMIAL or offset + 4 * size > len(self.flash):
+            self._write(NACK)
+            return
+        crc = stm32boot.crc32_stm32(self.flash[offset : offset + 4 * size], init)
+        self._write(_with_xor_ack(crc))
+
+    def _go(self):
+        self._write(ACK)
+        offset = self._read_address()
+        if offset == None:
+            self._write(NACK)
+            return
+        self.started_at = stm32boot.FLASH_BASE + offset
+        self._write(ACK)
+
+    def run(self):
+        while self._read(1) != b'\x7F':
+            pass
+        self._write(ACK)
+        commandDict = {
+            0x00 : self._get, 0x02 : self._get_id, 0x11 : self._read_memory, 0x31 : self._write_memory,
+            0x21 : self._go, 0xA1 : self._get_checksum,
+            0x44 if self.extended_erase else 0x43 : self._extended_erase if self.extended_erase else self._erase,
+        }
+        while True:
+            cmd = self._read(1)[0]
+            if cmd not in commandDict.keys(): # also 0x7F, bootloader is already synced
+                self._write(NACK)
+                continue
+            if self._read(1)[0] != cmd ^ 0xFF:
+                self._write(NACK)
+                continue
+            commandDict[cmd]()
+
+
+def selftest(firmware, extended_erase, pipeline, checksum, verify):
+    sim = SimulatedBootloader(extended_erase=extended_erase, checksum=checksum)
+    threading.Thread(target=sim.run, daemon=True).start()
+    if firmware:
+        image = stm32boot.read_firmware(firmware)
+    else:
+        image = stm32boot.intelhex.from_bin(os.urandom(50*1024 + 12), stm32boot.FLASH_BASE)
+    # settings in the last page must survive
+    sim.flash[-sim.page_size:] = b'\x5A' * sim.page_size
+    res = stm32boot.flash(sim.port, 115200, image, verify=verify, pipeline=pipeline)
+    ok = res['ok']
+    for address, data in image.segments():
+        offset = address - stm32boot.FLASH_BASE
+        ok = ok and sim.flash[offset : offset + len(data)] == data
+    ok = ok and sim.flash[-sim.page_size:] == b'\x5A' * sim.page_size
+    ok = ok and sim.started_at == stm32boot.FLASH_BASE
+    print('selftest', 'ok' if ok else 'FAILED', '%.2f secs' % res['time'], 'verified', res['verify'])
+    return ok
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description = 'Simulated STM32 UART bootloader on a pty'
+        )
+    parser.add_argument("-selftest", action='store_true', help = 'Flash a firmware into the simulated chip, and check it')
+    parser.add_argument("-firmware", help = 'Firmware .hex or .bin for -selftest, default is random data')
+    parser.add_argument("-noext", action='store_true', help = 'Support only the standard erase command')
+    parser.add_argument("-nopipeline", action='store_true', help = 'Wait for each ACK in -selftest')
+    parser.add_argument("-nochecksum", action='store_true', help = 'No get checksum command')
+    parser.add_argument("-verify", default='auto', help = 'Verify mode for -selftest, auto, checksum, sampled or full')
+    args = parser.parse_args()
+
+    if args.selftest:
+        sys.exit(0 if selftest(args.firmware, not args.noext, not args.nopipeline, not args.nochecksum, args.verify) else 1)
+
+    sim = SimulatedBootloader(extended_erase=not args.noext, checksum=not args.nochecksum)
+    print('simulated bootloader on', sim.port)
+    sim.run()